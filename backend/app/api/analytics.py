@@ -1,108 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_, desc, extract
+from sqlalchemy.engine import Engine
 from typing import List, Optional, Dict, Any
 from datetime import date, datetime, timedelta
 from uuid import UUID
 from decimal import Decimal
 
-from app.database import get_db
-from app.models.patient import Patient, Admission, Discharge
-from app.models.outcome import PatientOutcome, Readmission, SatisfactionScore
+from app.database import get_db, get_read_db, request_tenant, tenant_registry
+from app.models.patient import Patient, Admission, Discharge, AdmissionType
+from app.models.outcome import PatientOutcome, Readmission
 from app.models.resource import Department, Bed, Staff, Equipment
 from app.models.analytics import AnalyticsEvent, CostAnalysis
+from app.models.diagnosis import DiagnosisCode, DiagnosisField
 from app.schemas.analytics import (
     DashboardMetrics, TrendData, DepartmentPerformance,
-    PatientOutcomeSummary, ResourceUtilization
+    PatientOutcomeSummary, ResourceUtilization,
+    NetworkDashboardMetrics, NetworkDepartmentPerformance, NetworkDepartmentPerformanceReport,
+    CostAnalysisGenerationResult, AdmissionCostGenerationResult,
+    LengthOfStayReport, LengthOfStayDistribution, LengthOfStaySketchRebuildResult,
+    DistinctPatientReport, DistinctPatientCount, DistinctPatientSketchRebuildResult,
+    CohortReport, CohortMetrics
+)
+from app.services.hospital_metrics import (
+    dashboard_totals, dashboard_metrics, department_performance_totals,
+    department_performance, merge_totals
+)
+from app.core.security import get_current_active_user, require_network_admin, require_role
+from app.core.tenancy import fan_out
+from app.services.cost_analysis import generate_admission_costs, generate_cost_analyses, month_start, next_month
+from app.services.los_sketches import GROUPINGS, los_distribution, rebuild_los_sketches
+from app.services import patient_counts
+from app.services.cohorts import DEFAULT_MONTHS, DIMENSIONS, CohortDefinition, cohort_engine_for
+from app.services import diagnosis_index
+from app.schemas.diagnosis import (
+    DiagnosisCodeCreate, DiagnosisCodeResponse, DiagnosisSearchResult, DiagnosisIndexRebuildResult
 )
-from app.core.security import get_current_active_user
 from app.models.user import User
 
 router = APIRouter()
 
 @router.get("/dashboard", response_model=DashboardMetrics)
 async def get_dashboard_metrics(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get key dashboard metrics"""
-    
-    # Total patients
-    total_patients = db.query(Patient).filter(Patient.is_deleted == 0).count()
-    
-    # Total admissions
-    total_admissions = db.query(Admission).filter(Admission.is_deleted == 0).count()
-    
-    # Current occupancy rate
-    total_beds = db.query(Bed).filter(Bed.is_deleted == 0).count()
-    occupied_beds = db.query(Bed).filter(
-        and_(Bed.is_deleted == 0, Bed.status == "occupied")
-    ).count()
-    current_occupancy_rate = (occupied_beds / total_beds * 100) if total_beds > 0 else 0
-    
-    # Average length of stay
-    avg_los_result = db.query(func.avg(Discharge.length_of_stay)).filter(
-        Discharge.is_deleted == 0
-    ).scalar()
-    average_length_of_stay = float(avg_los_result) if avg_los_result else 0
-    
-    # Readmission rate (30-day)
-    thirty_days_ago = date.today() - timedelta(days=30)
-    total_discharges = db.query(Discharge).filter(
-        and_(
-            Discharge.is_deleted == 0,
-            Discharge.discharge_date >= thirty_days_ago
-        )
-    ).count()
-    
-    readmissions_count = db.query(Readmission).filter(
-        and_(
-            Readmission.is_deleted == 0,
-            Readmission.readmission_date >= thirty_days_ago,
-            Readmission.days_since_discharge <= 30
-        )
-    ).count()
-    
-    readmission_rate = (readmissions_count / total_discharges * 100) if total_discharges > 0 else 0
-    
-    # Patient satisfaction score
-    satisfaction_result = db.query(func.avg(SatisfactionScore.overall_satisfaction)).filter(
-        SatisfactionScore.is_deleted == 0
-    ).scalar()
-    patient_satisfaction_score = float(satisfaction_result) if satisfaction_result else 0
-    
-    # Revenue and costs
-    total_revenue_result = db.query(func.sum(Discharge.total_cost)).filter(
-        Discharge.is_deleted == 0
-    ).scalar()
-    total_revenue = Decimal(str(total_revenue_result)) if total_revenue_result else Decimal('0')
-    
-    total_costs_result = db.query(func.sum(CostAnalysis.total_cost)).filter(
-        CostAnalysis.is_deleted == 0
-    ).scalar()
-    total_costs = Decimal(str(total_costs_result)) if total_costs_result else Decimal('0')
-    
-    # Profit margin
-    profit_margin = 0
-    if total_revenue > 0:
-        profit_margin = float((total_revenue - total_costs) / total_revenue * 100)
-    
-    return DashboardMetrics(
-        total_patients=total_patients,
-        total_admissions=total_admissions,
-        current_occupancy_rate=round(current_occupancy_rate, 2),
-        average_length_of_stay=round(average_length_of_stay, 2),
-        readmission_rate=round(readmission_rate, 2),
-        patient_satisfaction_score=round(patient_satisfaction_score, 2),
-        total_revenue=total_revenue,
-        total_costs=total_costs,
-        profit_margin=round(profit_margin, 2)
-    )
+    return dashboard_metrics(dashboard_totals(db))
 
 @router.get("/trends/occupancy", response_model=List[TrendData])
 async def get_occupancy_trends(
     days: int = Query(30, ge=1, le=365),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get bed occupancy trends over time"""
@@ -146,7 +96,7 @@ async def get_occupancy_trends(
 @router.get("/trends/readmissions", response_model=List[TrendData])
 async def get_readmission_trends(
     days: int = Query(30, ge=1, le=365),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get readmission trends over time"""
@@ -175,100 +125,42 @@ async def get_readmission_trends(
 
 @router.get("/departments/performance", response_model=List[DepartmentPerformance])
 async def get_department_performance(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get performance metrics by department"""
-    departments = db.query(Department).filter(Department.is_deleted == 0).all()
-    performance_data = []
-    
-    for dept in departments:
-        # Occupancy rate
-        dept_beds = db.query(Bed).filter(
-            and_(Bed.department_id == dept.id, Bed.is_deleted == 0)
-        ).count()
-        occupied_beds = db.query(Bed).filter(
-            and_(
-                Bed.department_id == dept.id,
-                Bed.is_deleted == 0,
-                Bed.status == "occupied"
-            )
-        ).count()
-        occupancy_rate = (occupied_beds / dept_beds * 100) if dept_beds > 0 else 0
-        
-        # Average length of stay
-        avg_los_result = db.query(func.avg(Discharge.length_of_stay)).join(Admission).filter(
-            and_(
-                Admission.department_id == dept.id,
-                Discharge.is_deleted == 0
-            )
-        ).scalar()
-        avg_los = float(avg_los_result) if avg_los_result else 0
-        
-        # Readmission rate
-        dept_discharges = db.query(Discharge).join(Admission).filter(
-            and_(
-                Admission.department_id == dept.id,
-                Discharge.is_deleted == 0
-            )
-        ).count()
-        
-        dept_readmissions = db.query(Readmission).filter(
-            and_(
-                Readmission.readmission_department_id == dept.id,
-                Readmission.is_deleted == 0
-            )
-        ).count()
-        
-        readmission_rate = (dept_readmissions / dept_discharges * 100) if dept_discharges > 0 else 0
-        
-        # Patient satisfaction
-        satisfaction_result = db.query(func.avg(SatisfactionScore.overall_satisfaction)).join(Admission).filter(
-            and_(
-                Admission.department_id == dept.id,
-                SatisfactionScore.is_deleted == 0
-            )
-        ).scalar()
-        patient_satisfaction = float(satisfaction_result) if satisfaction_result else 0
-        
-        # Cost efficiency (simplified)
-        total_costs = db.query(func.sum(CostAnalysis.total_cost)).filter(
-            and_(
-                CostAnalysis.department_id == dept.id,
-                CostAnalysis.is_deleted == 0
-            )
-        ).scalar()
-        cost_efficiency = float(total_costs) if total_costs else 0
-        
-        # Staff utilization
-        total_staff = db.query(Staff).filter(
-            and_(Staff.department_id == dept.id, Staff.is_deleted == 0)
-        ).count()
-        active_staff = db.query(Staff).filter(
-            and_(
-                Staff.department_id == dept.id,
-                Staff.is_deleted == 0,
-                Staff.is_active == True
-            )
-        ).count()
-        staff_utilization = (active_staff / total_staff * 100) if total_staff > 0 else 0
-        
-        performance_data.append(DepartmentPerformance(
-            department_id=dept.id,
-            department_name=dept.name,
-            occupancy_rate=round(occupancy_rate, 2),
-            average_length_of_stay=round(avg_los, 2),
-            readmission_rate=round(readmission_rate, 2),
-            patient_satisfaction=round(patient_satisfaction, 2),
-            cost_efficiency=round(cost_efficiency, 2),
-            staff_utilization=round(staff_utilization, 2)
-        ))
-    
-    return performance_data
+    return [department_performance(totals) for totals in department_performance_totals(db)]
+
+# Network-wide analytics across all hospitals (tenants)
+@router.get("/network/dashboard", response_model=NetworkDashboardMetrics)
+async def get_network_dashboard_metrics(
+    current_user: User = Depends(require_network_admin)
+):
+    """Get dashboard metrics for every hospital and for the network as a whole"""
+    totals, unavailable = await fan_out(dashboard_totals)
+    return NetworkDashboardMetrics(
+        network=dashboard_metrics(merge_totals(totals.values())),
+        hospitals={tenant: dashboard_metrics(hospital) for tenant, hospital in totals.items()},
+        unavailable=unavailable
+    )
+
+@router.get("/network/departments/performance", response_model=NetworkDepartmentPerformanceReport)
+async def get_network_department_performance(
+    current_user: User = Depends(require_network_admin)
+):
+    """Get department performance metrics across every hospital"""
+    rows, unavailable = await fan_out(department_performance_totals)
+    return NetworkDepartmentPerformanceReport(
+        departments=[
+            NetworkDepartmentPerformance(tenant=tenant, **department_performance(totals).dict())
+            for tenant, departments in rows.items() for totals in departments
+        ],
+        unavailable=unavailable
+    )
 
 @router.get("/patient-outcomes", response_model=PatientOutcomeSummary)
 async def get_patient_outcome_summary(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get patient outcome summary statistics"""
@@ -332,7 +224,7 @@ async def get_patient_outcome_summary(
 
 @router.get("/resource-utilization", response_model=ResourceUtilization)
 async def get_resource_utilization(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get resource utilization metrics"""
@@ -384,7 +276,8 @@ async def get_cost_analysis(
     start_date: date = Query(...),
     end_date: date = Query(...),
     department_id: Optional[UUID] = Query(None),
-    db: Session = Depends(get_db),
+    per_admission: bool = Query(False, description="Per-admission analyses instead of department-level ones"),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get cost analysis for a specific period"""
@@ -393,7 +286,8 @@ async def get_cost_analysis(
         and_(
             CostAnalysis.is_deleted == 0,
             CostAnalysis.period_start >= start_date,
-            CostAnalysis.period_end <= end_date
+            CostAnalysis.period_end <= end_date,
+            CostAnalysis.admission_id.isnot(None) if per_admission else CostAnalysis.admission_id.is_(None)
         )
     )
     
@@ -420,5 +314,289 @@ async def get_cost_analysis(
         "cost_analyses": cost_analyses
     }
 
+def _generate_cost_analyses(db_engine: Engine, start_date: date, end_date: date, department_id: Optional[UUID]) -> dict:
+    with db_engine.begin() as conn:
+        return generate_cost_analyses(conn, start_date, end_date, department_id)
+
+@router.post("/cost-analysis/generate", response_model=CostAnalysisGenerationResult)
+async def generate_cost_analysis(
+    request: Request,
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    department_id: Optional[UUID] = Query(None),
+    current_user: User = Depends(require_role("admin"))
+):
+    """Regenerate monthly department cost analyses from admissions, staff, equipment and discharges"""
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must not be before start_date"
+        )
+    
+    shard = tenant_registry.shard(request_tenant(request))
+    result = await run_in_threadpool(shard.run_write, _generate_cost_analyses, shard.engine, start_date, end_date, department_id)
+    return CostAnalysisGenerationResult(**result)
+
+def _generate_admission_costs(db_engine: Engine, start_date: date, end_date: date, department_id: Optional[UUID]) -> dict:
+    with db_engine.begin() as conn:
+        return generate_admission_costs(conn, start_date, end_date, department_id)
+
+@router.post("/cost-analysis/admissions/generate", response_model=AdmissionCostGenerationResult)
+async def generate_admission_cost_analysis(
+    request: Request,
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    department_id: Optional[UUID] = Query(None),
+    current_user: User = Depends(require_role("admin"))
+):
+    """Regenerate per-admission cost analyses for stays overlapping the period"""
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must not be before start_date"
+        )
+    
+    shard = tenant_registry.shard(request_tenant(request))
+    result = await run_in_threadpool(shard.run_write, _generate_admission_costs, shard.engine, start_date, end_date, department_id)
+    return AdmissionCostGenerationResult(**result)
+
+@router.get("/length-of-stay/distribution", response_model=LengthOfStayReport)
+async def get_length_of_stay_distribution(
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    department_id: Optional[UUID] = Query(None),
+    admission_type: Optional[AdmissionType] = Query(None),
+    group_by: str = Query("department", description="none, department, admission_type or both"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get length-of-stay percentiles and histograms for discharges in the months of a period"""
+    if group_by not in GROUPINGS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"group_by must be one of: {', '.join(GROUPINGS)}"
+        )
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must not be before start_date"
+        )
+    
+    distributions = los_distribution(db, start_date, end_date, department_id, admission_type, group_by)
+    return LengthOfStayReport(
+        period_start=month_start(start_date),
+        # Sketches are monthly, so the period is widened to whole months
+        period_end=next_month(month_start(end_date)) - timedelta(days=1),
+        group_by=group_by,
+        distributions=[LengthOfStayDistribution(**distribution) for distribution in distributions]
+    )
+
+def _rebuild_los_sketches(db_engine: Engine) -> dict:
+    with db_engine.begin() as conn:
+        return rebuild_los_sketches(conn)
+
+@router.post("/length-of-stay/rebuild", response_model=LengthOfStaySketchRebuildResult)
+async def rebuild_length_of_stay_sketches(
+    request: Request,
+    current_user: User = Depends(require_role("admin"))
+):
+    """Recompute the length-of-stay sketches from all discharges"""
+    shard = tenant_registry.shard(request_tenant(request))
+    result = await run_in_threadpool(shard.run_write, _rebuild_los_sketches, shard.engine)
+    return LengthOfStaySketchRebuildResult(**result)
+
+@router.get("/distinct-patients", response_model=DistinctPatientReport)
+async def get_distinct_patients(
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    department_id: Optional[List[UUID]] = Query(None, description="Repeat to merge several departments"),
+    group_by: str = Query("none", description="none or department"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get the estimated number of distinct patients admitted in a period"""
+    if group_by not in patient_counts.GROUPINGS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"group_by must be one of: {', '.join(patient_counts.GROUPINGS)}"
+        )
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must not be before start_date"
+        )
+    
+    counts = patient_counts.distinct_patients(db, start_date, end_date, department_id, group_by)
+    return DistinctPatientReport(
+        start_date=start_date,
+        end_date=end_date,
+        group_by=group_by,
+        counts=[DistinctPatientCount(**count) for count in counts]
+    )
+
+def _rebuild_patient_count_sketches(db_engine: Engine) -> dict:
+    with db_engine.begin() as conn:
+        return patient_counts.rebuild_patient_count_sketches(conn)
+
+@router.post("/distinct-patients/rebuild", response_model=DistinctPatientSketchRebuildResult)
+async def rebuild_distinct_patient_sketches(
+    request: Request,
+    current_user: User = Depends(require_role("admin"))
+):
+    """Recompute the distinct-patient sketches from all admissions"""
+    shard = tenant_registry.shard(request_tenant(request))
+    result = await run_in_threadpool(shard.run_write, _rebuild_patient_count_sketches, shard.engine)
+    return DistinctPatientSketchRebuildResult(**result)
+
+@router.get("/cohorts", response_model=CohortReport)
+async def get_cohorts(
+    request: Request,
+    group_by: str = Query("month", description="Comma-separated: month, department, admission_type, diagnosis; none for one cohort"),
+    start_date: Optional[date] = Query(None, description="Admissions from; defaults to 36 months before end_date"),
+    end_date: Optional[date] = Query(None, description="Admissions until; defaults to today"),
+    horizon_days: int = Query(30, ge=1, le=365, description="Length of the curves and the window of the rates"),
+    department_id: Optional[UUID] = Query(None),
+    admission_type: Optional[AdmissionType] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get readmission, mortality, length-of-stay and satisfaction curves per admission cohort"""
+    dimensions = tuple(name.strip() for name in group_by.split(",") if name.strip() and name.strip() != "none")
+    unknown = [name for name in dimensions if name not in DIMENSIONS]
+    if unknown or len(set(dimensions)) != len(dimensions):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"group_by must list distinct values of: {', '.join(DIMENSIONS)}"
+        )
+    end_date = end_date or date.today()
+    if start_date is None:
+        start_date = month_start(end_date)
+        for _ in range(DEFAULT_MONTHS - 1):
+            start_date = month_start(start_date - timedelta(days=1))
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must not be before start_date"
+        )
+    
+    definition = CohortDefinition(
+        group_by=dimensions,
+        start=start_date,
+        end=end_date,
+        horizon_days=horizon_days,
+        department_id=department_id,
+        admission_type=admission_type
+    )
+    cohort_engine = cohort_engine_for(request_tenant(request))
+    cohorts, version, cached = await run_in_threadpool(cohort_engine.cohorts, db, definition)
+    return CohortReport(
+        group_by=list(dimensions),
+        start_date=start_date,
+        end_date=end_date,
+        horizon_days=horizon_days,
+        data_version=version,
+        cached=cached,
+        cohorts=[CohortMetrics(**cohort) for cohort in cohorts]
+    )
+
+@router.get("/diagnoses/search", response_model=DiagnosisSearchResult)
+async def search_diagnoses(
+    q: Optional[str] = Query(None, description="Diagnosis text; every term must occur in the same field"),
+    code: Optional[str] = Query(None, description="Code from the diagnosis code table, e.g. A41.9"),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    department_id: Optional[UUID] = Query(None),
+    field: Optional[List[DiagnosisField]] = Query(None, description="Repeat to search several fields; all by default"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Find admissions by diagnosis text or code through the diagnosis index"""
+    phrase_groups = []
+    if code:
+        diagnosis_code = diagnosis_index.find_code(db, code)
+        # Unknown codes still match where the code itself was written in a diagnosis
+        phrase_groups.append(diagnosis_index.code_phrases(diagnosis_code) if diagnosis_code
+                             else [[diagnosis_index.CODE_PREFIX + diagnosis_index.normalize_code(code)]])
+    if q:
+        terms = diagnosis_index.tokenize(q)
+        if not terms:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="q has no searchable terms"
+            )
+        phrase_groups.append([terms])
+    if not phrase_groups:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide q or code"
+        )
+    if start_date and end_date and end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must not be before start_date"
+        )
+    
+    result = diagnosis_index.search_admissions(
+        db, phrase_groups, start_date, end_date, department_id, field, skip=skip, limit=limit
+    )
+    return DiagnosisSearchResult(
+        q=q,
+        code=code,
+        phrases=[phrase for phrases in phrase_groups for phrase in phrases],
+        **result
+    )
+
+@router.get("/diagnoses/codes", response_model=List[DiagnosisCodeResponse])
+async def get_diagnosis_codes(
+    search: Optional[str] = Query(None, description="Filter by code or description"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get the diagnosis code table"""
+    query = db.query(DiagnosisCode).filter(DiagnosisCode.is_deleted == 0)
+    if search:
+        query = query.filter(or_(
+            DiagnosisCode.code.ilike(f"{search}%"),
+            DiagnosisCode.description.ilike(f"%{search}%")
+        ))
+    return query.order_by(DiagnosisCode.code).offset(skip).limit(limit).all()
+
+@router.post("/diagnoses/codes", response_model=DiagnosisCodeResponse, status_code=status.HTTP_201_CREATED)
+async def create_diagnosis_code(
+    code_data: DiagnosisCodeCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role("admin"))
+):
+    """Add a code to the diagnosis code table"""
+    code_dict = code_data.dict()
+    code_dict["code"] = diagnosis_index.normalize_code(code_dict["code"])
+    if db.query(DiagnosisCode).filter(DiagnosisCode.code == code_dict["code"]).first():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Diagnosis code already exists"
+        )
+    
+    db_code = DiagnosisCode(**code_dict)
+    db.add(db_code)
+    await run_in_threadpool(db.commit)
+    db.refresh(db_code)
+    
+    return db_code
 
+def _rebuild_diagnosis_index(db_engine: Engine) -> dict:
+    with db_engine.begin() as conn:
+        return diagnosis_index.rebuild_diagnosis_index(conn)
 
+@router.post("/diagnoses/reindex", response_model=DiagnosisIndexRebuildResult)
+async def rebuild_diagnosis_index(
+    request: Request,
+    current_user: User = Depends(require_role("admin"))
+):
+    """Recompute the diagnosis index from all admissions and discharges"""
+    shard = tenant_registry.shard(request_tenant(request))
+    result = await run_in_threadpool(shard.run_write, _rebuild_diagnosis_index, shard.engine)
+    return DiagnosisIndexRebuildResult(**result)
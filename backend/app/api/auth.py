@@ -1,15 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordRequestForm
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.security import OAuth2PasswordRequestForm, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from datetime import timedelta
+from datetime import datetime, timedelta
+from uuid import UUID
 
-from app.database import get_db
+from app.database import get_db, request_tenant
 from app.models.user import User
 from app.schemas.user import UserCreate, UserResponse, Token, PasswordChange
 from app.core.security import (
-    verify_password, get_password_hash, create_access_token,
-    get_current_active_user, require_role
+    password_hasher, create_access_token, verify_token, security,
+    get_current_active_user, require_role, TENANT_CLAIM
 )
+from app.core.revocation import revocation_list_for
 from app.core.config import settings
 
 router = APIRouter()
@@ -36,7 +39,7 @@ async def register(
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await password_hasher.hash(user_data.password)
     db_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -49,20 +52,28 @@ async def register(
     )
     
     db.add(db_user)
-    db.commit()
+    await run_in_threadpool(db.commit)
     db.refresh(db_user)
     
     return db_user
 
 @router.post("/login", response_model=Token)
 async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
-    """Authenticate user and return access token"""
+    """Authenticate user and return access token; send X-Tenant to sign in to another hospital"""
     user = db.query(User).filter(User.username == form_data.username).first()
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    # Hand the connection back to the pool while bcrypt runs, so a login storm cannot exhaust it
+    db.close()
+    
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await password_hasher.verify_and_update(form_data.password, user.hashed_password)
+    
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -76,12 +87,20 @@ async def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Transparently upgrade hashes made with a different bcrypt cost
+    if new_hash:
+        def upgrade_hash():
+            db.query(User).filter(User.id == user.id).update({"hashed_password": new_hash})
+            db.commit()
+        await run_in_threadpool(upgrade_hash)
+    
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={
             "sub": user.username,
             "user_id": str(user.id),
-            "role": user.role.value
+            "role": user.role.value,
+            TENANT_CLAIM: request_tenant(request)
         },
         expires_delta=access_token_expires
     )
@@ -92,6 +111,46 @@ async def login(
         "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
     }
 
+@router.post("/logout", status_code=status.HTTP_200_OK)
+async def logout(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Revoke the access token used for this request"""
+    token_data = verify_token(credentials.credentials)
+    revocation_list = revocation_list_for(request_tenant(request))
+    if token_data.jti is None:
+        # Tokens issued before revocation support can only be revoked per user
+        await run_in_threadpool(revocation_list.revoke_user, db, current_user.id, reason="logout")
+    else:
+        expires_at = token_data.expires_at or datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        await run_in_threadpool(revocation_list.revoke, db, token_data.jti, current_user.id, expires_at, reason="logout")
+    
+    return {"message": "Logged out successfully"}
+
+@router.post("/users/{user_id}/revoke-tokens", status_code=status.HTTP_200_OK)
+async def revoke_user_tokens(
+    user_id: UUID,
+    request: Request,
+    current_user: User = Depends(require_role("admin")),
+    db: Session = Depends(get_db)
+):
+    """Force sign-out of a user by revoking every token issued to them so far (admin only)"""
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    await run_in_threadpool(
+        revocation_list_for(request_tenant(request)).revoke_user, db, user.id, reason=f"forced by {current_user.username}"
+    )
+    
+    return {"message": "User tokens revoked successfully"}
+
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
     current_user: User = Depends(get_current_active_user)
@@ -107,15 +166,15 @@ async def change_password(
 ):
     """Change user password"""
     # Verify current password
-    if not verify_password(password_data.current_password, current_user.hashed_password):
+    if not await password_hasher.verify(password_data.current_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
         )
     
     # Update password
-    current_user.hashed_password = get_password_hash(password_data.new_password)
-    db.commit()
+    current_user.hashed_password = await password_hasher.hash(password_data.new_password)
+    await run_in_threadpool(db.commit)
     
     return {"message": "Password changed successfully"}
 
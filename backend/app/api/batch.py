@@ -0,0 +1,201 @@
+"""
+Batch endpoint: several API calls in one round-trip.
+
+POST /api/batch runs each operation through the application itself, so
+sub-requests hit the same routes, validation and role checks as standalone
+calls. The caller is authenticated once; sub-requests reuse that user instead
+of each repeating token decoding, the revocation check and the user lookup.
+
+Consecutive GETs run in parallel, at most BATCH_READ_CONCURRENCY at a time
+across all batches. Most handlers query the database on the event loop, so
+each read is dispatched on an event loop of its own in a worker thread, with
+its own sessions (a Session must never be shared between threads). Any other
+method is a barrier: the operations before it finish first, and it runs on
+its own on the batch's primary session. Later reads use the primary
+database, so they see its changes.
+"""
+
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+from urllib.parse import urlencode
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.security import BATCH_USER_STATE, get_current_active_user
+from app.database import BATCH_DB_STATE, BATCH_READ_DB_STATE, get_db, request_read_session, request_tenant, tenant_registry
+from app.models.user import User
+from app.schemas.batch import BatchRequest, BatchOperation, BatchOperationResult, BatchResponse
+
+router = APIRouter()
+
+BATCH_PATH = "/api/batch"
+BATCH_METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE"}
+# Set by the batch itself: credentials come from the batch, bodies stay uncompressed
+RESERVED_HEADERS = {"authorization", "accept-encoding", "content-length", "content-type", "host"}
+# Transport headers of the sub-response that mean nothing inside the batch body
+DROPPED_RESPONSE_HEADERS = {"content-length", "content-encoding", "vary"}
+
+_read_executor = ThreadPoolExecutor(max_workers=settings.BATCH_READ_CONCURRENCY, thread_name_prefix="batch-read")
+# Each read worker keeps one event loop for the reads it dispatches
+_read_loops = threading.local()
+
+def _run_on_worker_loop(coroutine):
+    loop = getattr(_read_loops, "loop", None)
+    if loop is None:
+        loop = _read_loops.loop = asyncio.new_event_loop()
+    return loop.run_until_complete(coroutine)
+
+def _validate(operations: List[BatchOperation]):
+    if not operations:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No operations given"
+        )
+    if len(operations) > settings.BATCH_MAX_OPERATIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.BATCH_MAX_OPERATIONS} operations per batch"
+        )
+    for index, operation in enumerate(operations):
+        path = operation.path.partition("?")[0]
+        if operation.method.upper() not in BATCH_METHODS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Operation {index}: unsupported method {operation.method}"
+            )
+        if not path.startswith("/api/") or path.rstrip("/") == BATCH_PATH:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Operation {index}: path must be an /api/ route other than {BATCH_PATH}"
+            )
+
+async def _dispatch(request: Request, operation: BatchOperation, state: dict) -> BatchOperationResult:
+    """Run one operation through the ASGI app and capture its response"""
+    path, _, query_string = operation.path.partition("?")
+    if operation.params:
+        extra = urlencode(operation.params, doseq=True)
+        query_string = f"{query_string}&{extra}" if query_string else extra
+
+    body = json.dumps(operation.body).encode() if operation.body is not None else b""
+    headers = [
+        (b"authorization", request.headers.get("authorization", "").encode("latin-1")),
+        (b"accept-encoding", b"identity"),
+    ]
+    if operation.body is not None:
+        headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    for name, value in (operation.headers or {}).items():
+        if name.lower() not in RESERVED_HEADERS:
+            headers.append((name.lower().encode("latin-1"), value.encode("latin-1")))
+
+    scope = {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": request.scope.get("http_version", "1.1"),
+        "scheme": request.scope.get("scheme", "http"),
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": request.scope.get("root_path", ""),
+        "method": operation.method.upper(),
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query_string.encode(),
+        "headers": headers,
+        "state": {**request.scope.get("state", {}), **state},
+    }
+
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return {"type": "http.disconnect"}
+
+    response = {"status": None, "headers": {}, "body": b""}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {
+                name.decode("latin-1"): value.decode("latin-1") for name, value in message.get("headers", [])
+            }
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception:
+        # The error handler has already produced a 500; leave the shared sessions usable
+        for db in (state[BATCH_DB_STATE], state[BATCH_READ_DB_STATE]):
+            db.rollback()
+        if response["status"] is None:
+            response.update(status=status.HTTP_500_INTERNAL_SERVER_ERROR, body=b"")
+
+    content: Optional[object] = None
+    if response["body"]:
+        if response["headers"].get("content-type", "").startswith("application/json"):
+            content = json.loads(response["body"])
+        else:
+            content = response["body"].decode("utf-8", errors="replace")
+
+    return BatchOperationResult(
+        id=operation.id,
+        status=response["status"],
+        headers={name: value for name, value in response["headers"].items() if name not in DROPPED_RESPONSE_HEADERS},
+        body=content
+    )
+
+@router.post("", response_model=BatchResponse)
+async def run_batch(
+    batch: BatchRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Run several API operations in one request"""
+    operations = batch.operations
+    _validate(operations)
+
+    tenant = request_tenant(request)
+    write_state = {BATCH_USER_STATE: current_user, BATCH_DB_STATE: db, BATCH_READ_DB_STATE: db}
+    results: List[Optional[BatchOperationResult]] = [None] * len(operations)
+    reads: List[int] = []
+    wrote = False
+
+    def run_read(index: int, use_primary: bool) -> BatchOperationResult:
+        primary = tenant_registry.session(tenant)
+        # Read-your-writes: after a write in this batch, reads skip the replica
+        read_db = primary if use_primary else request_read_session(request)
+        try:
+            state = {BATCH_USER_STATE: current_user, BATCH_DB_STATE: primary, BATCH_READ_DB_STATE: read_db}
+            return _run_on_worker_loop(_dispatch(request, operations[index], state))
+        finally:
+            primary.close()
+            if read_db is not primary:
+                read_db.close()
+
+    async def run_reads():
+        loop = asyncio.get_running_loop()
+        outcomes = await asyncio.gather(
+            *(loop.run_in_executor(_read_executor, run_read, index, wrote) for index in reads)
+        )
+        for index, outcome in zip(reads, outcomes):
+            results[index] = outcome
+        reads.clear()
+
+    for index, operation in enumerate(operations):
+        if operation.method.upper() == "GET":
+            reads.append(index)
+            continue
+        await run_reads()
+        results[index] = await _dispatch(request, operation, write_state)
+        wrote = True
+    await run_reads()
+
+    return BatchResponse(results=results)
@@ -0,0 +1,151 @@
+import math
+from datetime import date, timedelta
+from typing import List, Optional, Union
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from sqlalchemy import and_
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.security import get_current_active_user, require_role
+from app.database import get_read_db, request_tenant, tenant_registry
+from app.models.analytics import EventType, RollupGranularity
+from app.models.user import User
+from app.schemas.analytics import (
+    AnalyticsEventCreate, AnalyticsEventResponse, EventIngestResponse, IngestionMetrics,
+    RollupSeries, RollupRunResult, PromotedKeyBackfillResult
+)
+from app.services.event_ingestion import event_buffer
+from app.services.event_keys import key_filter
+from app.services.event_partitions import (
+    rollup_events, apply_retention, query_rollups, event_tables_for_range, backfill_promoted_keys
+)
+
+router = APIRouter()
+
+# Event Ingestion
+@router.post("/", response_model=EventIngestResponse, status_code=status.HTTP_202_ACCEPTED)
+async def ingest_events(
+    events: Union[AnalyticsEventCreate, List[AnalyticsEventCreate]],
+    request: Request,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Accept a single event or a batch of events for buffered writing"""
+    if not isinstance(events, list):
+        events = [events]
+
+    if len(events) > settings.EVENT_MAX_BATCH_REQUEST:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.EVENT_MAX_BATCH_REQUEST} events per request"
+        )
+
+    if not event_buffer.offer(events, request_tenant(request)):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Event buffer is full, retry later",
+            headers={"Retry-After": str(max(1, math.ceil(settings.EVENT_BUFFER_FLUSH_INTERVAL_SECONDS)))}
+        )
+
+    return EventIngestResponse(accepted=len(events), pending=event_buffer.pending)
+
+@router.get("/", response_model=List[AnalyticsEventResponse])
+async def get_events(
+    event_type: Optional[EventType] = Query(None),
+    start_date: Optional[date] = Query(None, description="Defaults to 7 days before end_date"),
+    end_date: Optional[date] = Query(None, description="Defaults to today"),
+    department_id: Optional[UUID] = Query(None),
+    data: List[str] = Query([], description="event_data filters as key:value; promoted keys use indexed columns"),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get raw analytics events, optionally filtered on event_data keys"""
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=7)
+    
+    filters = []
+    for item in data:
+        key, separator, value = item.partition(":")
+        if not separator or not key:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid data filter '{item}', expected key:value"
+            )
+        filters.append((key, value))
+    
+    conn = db.connection()
+    events = []
+    for table in event_tables_for_range(conn, start_date, end_date):
+        conditions = [table.c.is_deleted == 0, table.c.event_date >= start_date, table.c.event_date <= end_date]
+        if event_type:
+            conditions.append(table.c.event_type == event_type)
+        if department_id:
+            conditions.append(table.c.department_id == department_id)
+        conditions.extend(key_filter(table, key, value, event_type) for key, value in filters)
+        
+        query = table.select().where(and_(*conditions)).order_by(table.c.event_date.desc()).limit(limit)
+        events.extend(row._mapping for row in conn.execute(query))
+    
+    events.sort(key=lambda event: (event["event_date"], event["created_at"]), reverse=True)
+    return [dict(event) for event in events[:limit]]
+
+@router.post("/promoted-keys/backfill", response_model=PromotedKeyBackfillResult)
+async def backfill_event_keys(
+    request: Request,
+    current_user: User = Depends(require_role("admin"))
+):
+    """Fill the indexed columns of promoted event_data keys for existing events"""
+    shard = tenant_registry.shard(request_tenant(request))
+    return PromotedKeyBackfillResult(**await run_in_threadpool(backfill_promoted_keys, shard))
+
+@router.get("/metrics", response_model=IngestionMetrics)
+async def get_ingestion_metrics(
+    current_user: User = Depends(require_role("admin"))
+):
+    """Get ingestion throughput and flush latency metrics"""
+    return IngestionMetrics(**event_buffer.metrics())
+
+# Rollups
+@router.get("/rollups", response_model=RollupSeries)
+async def get_event_rollups(
+    event_type: EventType = Query(...),
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    department_id: Optional[UUID] = Query(None),
+    granularity: Optional[RollupGranularity] = Query(None, description="Defaults to the finest tier that suits the range and is still retained"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get a metric_value series for an event type from the rollup tiers"""
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must not be before start_date"
+        )
+    
+    chosen, points = query_rollups(db.connection(), event_type, start_date, end_date, department_id, granularity)
+    return RollupSeries(event_type=event_type, department_id=department_id, granularity=chosen, points=points)
+
+def _run_rollups(db_engine: Engine, start_date: date, end_date: date) -> dict:
+    with db_engine.begin() as conn:
+        result = rollup_events(conn, start_date, end_date)
+        result.update(apply_retention(conn))
+    return result
+
+@router.post("/rollups/run", response_model=RollupRunResult)
+async def run_event_rollups(
+    request: Request,
+    start_date: Optional[date] = Query(None, description="Defaults to yesterday"),
+    end_date: Optional[date] = Query(None, description="Defaults to today"),
+    current_user: User = Depends(require_role("admin"))
+):
+    """Recompute rollups for a date range, then apply partition and rollup retention"""
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=1)
+    shard = tenant_registry.shard(request_tenant(request))
+    return RollupRunResult(**await run_in_threadpool(shard.run_write, _run_rollups, shard.engine, start_date, end_date))
+
@@ -0,0 +1,87 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from sqlalchemy import func, case
+from typing import List
+
+from app.database import get_db
+from app.models.jobs import JobLease, JobRun, JobRunStatus
+from app.schemas.jobs import JobRunResponse, JobStatus
+from app.core.scheduler import scheduler
+from app.core.security import require_role
+from app.models.user import User
+
+router = APIRouter()
+
+def _get_job(name: str):
+    job = scheduler.jobs.get(name)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job
+
+@router.get("/", response_model=List[JobStatus])
+async def get_jobs(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role("admin"))
+):
+    """Get scheduled jobs with their lease, run counts and duration metrics"""
+    leases = {lease.name: lease for lease in db.query(JobLease).all()}
+    stats = {
+        row.job_name: row for row in db.query(
+            JobRun.job_name,
+            func.count(JobRun.id).label("runs"),
+            func.sum(case((JobRun.status == JobRunStatus.FAILED, 1), else_=0)).label("failures"),
+            func.avg(JobRun.duration_ms).label("average_duration_ms"),
+            func.max(JobRun.duration_ms).label("max_duration_ms")
+        ).group_by(JobRun.job_name).all()
+    }
+    
+    jobs = []
+    for job in scheduler.jobs.values():
+        lease = leases.get(job.name)
+        row = stats.get(job.name)
+        last_run = db.query(JobRun).filter(JobRun.job_name == job.name).order_by(JobRun.started_at.desc()).first()
+        jobs.append(JobStatus(
+            name=job.name,
+            schedule=job.schedule.expression,
+            description=job.description,
+            next_run=job.next_run,
+            running_here=scheduler.is_running(job.name),
+            lease_owner=lease.owner if lease and lease.expires_at else None,
+            lease_expires_at=lease.expires_at if lease else None,
+            runs=row.runs if row else 0,
+            failures=int(row.failures or 0) if row else 0,
+            average_duration_ms=round(row.average_duration_ms, 3) if row and row.average_duration_ms is not None else None,
+            max_duration_ms=row.max_duration_ms if row else None,
+            last_run=last_run
+        ))
+    
+    return jobs
+
+@router.get("/{name}/runs", response_model=List[JobRunResponse])
+async def get_job_runs(
+    name: str,
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role("admin"))
+):
+    """Get the run history of a job, newest first"""
+    _get_job(name)
+    return db.query(JobRun).filter(JobRun.job_name == name).order_by(JobRun.started_at.desc()).limit(limit).all()
+
+@router.post("/{name}/run", response_model=JobRunResponse)
+async def run_job(
+    name: str,
+    current_user: User = Depends(require_role("admin"))
+):
+    """Run a job now, outside its schedule (admin only)"""
+    _get_job(name)
+    run = await scheduler.run_now(name)
+    if run is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Job is already running"
+        )
+    return run
@@ -1,27 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional
 from datetime import date, datetime, timedelta
 from uuid import UUID
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.patient import Patient, Admission, Discharge
 from app.models.outcome import PatientOutcome, Readmission, SatisfactionScore
 from app.schemas.patient import (
     PatientCreate, PatientUpdate, PatientResponse,
     AdmissionCreate, AdmissionResponse,
-    DischargeCreate, DischargeResponse
+    DischargeCreate, DischargeResponse,
+    PatientTimelineResponse
 )
 from app.schemas.outcome import (
     PatientOutcomeCreate, PatientOutcomeResponse,
     ReadmissionCreate, ReadmissionResponse,
     SatisfactionScoreCreate, SatisfactionScoreResponse
 )
+from app.schemas.resource import DepartmentResponse, BedResponse
 from app.core.security import get_current_active_user, require_role
+from app.core.etag import detail_etag, list_etag, etag_matches, set_etag, not_modified
+from app.core.fieldsets import parse_fields, parse_includes, apply_fieldset, shaped_response
+from app.services.los_sketches import record_discharge
+from app.services.patient_counts import record_admission
+from app.services.diagnosis_index import index_admission, index_discharge
 from app.models.user import User
 
 router = APIRouter()
 
+# Relationships admission listings can embed with ?include=
+ADMISSION_EXPANSIONS = {
+    "patient": PatientResponse,
+    "department": DepartmentResponse,
+    "bed": BedResponse,
+    "discharge": DischargeResponse
+}
+
 # Patient Management
 @router.post("/", response_model=PatientResponse, status_code=status.HTTP_201_CREATED)
 async def create_patient(
@@ -39,20 +55,24 @@ async def create_patient(
     
     db_patient = Patient(**patient_data.dict())
     db.add(db_patient)
-    db.commit()
+    await run_in_threadpool(db.commit)
     db.refresh(db_patient)
     
     return db_patient
 
 @router.get("/", response_model=List[PatientResponse])
 async def get_patients(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     search: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. first_name,last_name"),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get all patients with optional search"""
+    selected = parse_fields(fields, PatientResponse, Patient)
     query = db.query(Patient).filter(Patient.is_deleted == 0)
     
     if search:
@@ -62,12 +82,64 @@ async def get_patients(
             (Patient.patient_id.ilike(f"%{search}%"))
         )
     
-    patients = query.offset(skip).limit(limit).all()
+    tag = list_etag(request, query, Patient)
+    if etag_matches(request, tag):
+        return not_modified(tag)
+    set_etag(response, tag)
+    
+    patients = apply_fieldset(query, Patient, selected).offset(skip).limit(limit).all()
+    if selected:
+        trimmed = shaped_response(patients, PatientResponse, Patient, selected)
+        set_etag(trimmed, tag)
+        return trimmed
     return patients
 
+@router.get("/admissions", response_model=List[AdmissionResponse])
+async def get_admissions(
+    request: Request,
+    response: Response,
+    department_id: Optional[UUID] = Query(None),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    include: Optional[str] = Query(None, description="Comma-separated relationships to embed: patient,department,bed,discharge"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get admissions across all patients with optional filters"""
+    included = parse_includes(include, ADMISSION_EXPANSIONS)
+    query = db.query(Admission).filter(Admission.is_deleted == 0)
+    
+    if department_id:
+        query = query.filter(Admission.department_id == department_id)
+    
+    if start_date:
+        query = query.filter(Admission.admission_date >= start_date)
+    
+    if end_date:
+        query = query.filter(Admission.admission_date <= end_date)
+    
+    tag = list_etag(request, query, Admission, included)
+    if etag_matches(request, tag):
+        return not_modified(tag)
+    set_etag(response, tag)
+    
+    admissions = apply_fieldset(query, Admission, None, included).order_by(
+        Admission.admission_date.desc()
+    ).offset(skip).limit(limit).all()
+    if included:
+        expanded = shaped_response(admissions, AdmissionResponse, Admission, includes=included,
+                                   expansions=ADMISSION_EXPANSIONS)
+        set_etag(expanded, tag)
+        return expanded
+    return admissions
+
 @router.get("/{patient_id}", response_model=PatientResponse)
 async def get_patient(
     patient_id: UUID,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
@@ -83,6 +155,11 @@ async def get_patient(
             detail="Patient not found"
         )
     
+    tag = detail_etag(patient)
+    if etag_matches(request, tag):
+        return not_modified(tag)
+    set_etag(response, tag)
+    
     return patient
 
 @router.put("/{patient_id}", response_model=PatientResponse)
@@ -108,7 +185,7 @@ async def update_patient(
     for field, value in update_data.items():
         setattr(patient, field, value)
     
-    db.commit()
+    await run_in_threadpool(db.commit)
     db.refresh(patient)
     
     return patient
@@ -133,9 +210,47 @@ async def delete_patient(
     
     patient.is_deleted = 1
     patient.deleted_at = datetime.utcnow()
-    db.commit()
+    await run_in_threadpool(db.commit)
+
+@router.get("/{patient_id}/timeline", response_model=PatientTimelineResponse)
+async def get_patient_timeline(
+    patient_id: UUID,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get a patient with admissions, discharges, outcomes, readmissions and satisfaction scores"""
+    # One query per relationship, however many admissions the patient has
+    patient = db.query(Patient).options(
+        selectinload(Patient.admissions.and_(Admission.is_deleted == 0))
+            .selectinload(Admission.discharge.and_(Discharge.is_deleted == 0)),
+        selectinload(Patient.outcomes.and_(PatientOutcome.is_deleted == 0)),
+        selectinload(Patient.readmissions.and_(Readmission.is_deleted == 0)),
+        selectinload(Patient.satisfaction_scores.and_(SatisfactionScore.is_deleted == 0))
+    ).filter(
+        Patient.id == patient_id,
+        Patient.is_deleted == 0
+    ).first()
+    
+    if not patient:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Patient not found"
+        )
+    
+    timeline = PatientTimelineResponse.model_validate(patient)
+    timeline.admissions.sort(key=lambda admission: admission.admission_date, reverse=True)
+    timeline.outcomes.sort(key=lambda outcome: outcome.outcome_date, reverse=True)
+    timeline.readmissions.sort(key=lambda readmission: readmission.readmission_date, reverse=True)
+    timeline.satisfaction_scores.sort(key=lambda score: score.survey_date, reverse=True)
+    
+    return timeline
 
 # Admission Management
+def _commit_admission(db: Session, admission: Admission):
+    record_admission(db, admission)
+    index_admission(db, admission)
+    db.commit()
+
 @router.post("/{patient_id}/admissions", response_model=AdmissionResponse, status_code=status.HTTP_201_CREATED)
 async def create_admission(
     patient_id: UUID,
@@ -168,7 +283,7 @@ async def create_admission(
     
     db_admission = Admission(**admission_dict)
     db.add(db_admission)
-    db.commit()
+    await run_in_threadpool(_commit_admission, db, db_admission)
     db.refresh(db_admission)
     
     return db_admission
@@ -176,10 +291,12 @@ async def create_admission(
 @router.get("/{patient_id}/admissions", response_model=List[AdmissionResponse])
 async def get_patient_admissions(
     patient_id: UUID,
-    db: Session = Depends(get_db),
+    include: Optional[str] = Query(None, description="Comma-separated relationships to embed: department,bed,discharge"),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get all admissions for a specific patient"""
+    included = parse_includes(include, ADMISSION_EXPANSIONS)
     patient = db.query(Patient).filter(
         Patient.id == patient_id,
         Patient.is_deleted == 0
@@ -191,14 +308,22 @@ async def get_patient_admissions(
             detail="Patient not found"
         )
     
-    admissions = db.query(Admission).filter(
+    admissions = apply_fieldset(db.query(Admission), Admission, None, included).filter(
         Admission.patient_id == patient_id,
         Admission.is_deleted == 0
     ).order_by(Admission.admission_date.desc()).all()
     
+    if included:
+        return shaped_response(admissions, AdmissionResponse, Admission, includes=included,
+                               expansions=ADMISSION_EXPANSIONS)
     return admissions
 
 # Discharge Management
+def _commit_discharge(db: Session, admission: Admission, discharge: Discharge):
+    record_discharge(db, admission, discharge)
+    index_discharge(db, admission, discharge)
+    db.commit()
+
 @router.post("/admissions/{admission_id}/discharge", response_model=DischargeResponse, status_code=status.HTTP_201_CREATED)
 async def create_discharge(
     admission_id: UUID,
@@ -236,7 +361,7 @@ async def create_discharge(
     
     db_discharge = Discharge(**discharge_dict)
     db.add(db_discharge)
-    db.commit()
+    await run_in_threadpool(_commit_discharge, db, admission, db_discharge)
     db.refresh(db_discharge)
     
     return db_discharge
@@ -266,7 +391,7 @@ async def create_patient_outcome(
     
     db_outcome = PatientOutcome(**outcome_dict)
     db.add(db_outcome)
-    db.commit()
+    await run_in_threadpool(db.commit)
     db.refresh(db_outcome)
     
     return db_outcome
@@ -274,7 +399,7 @@ async def create_patient_outcome(
 @router.get("/{patient_id}/outcomes", response_model=List[PatientOutcomeResponse])
 async def get_patient_outcomes(
     patient_id: UUID,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get all outcomes for a specific patient"""
@@ -321,7 +446,7 @@ async def create_readmission(
     
     db_readmission = Readmission(**readmission_dict)
     db.add(db_readmission)
-    db.commit()
+    await run_in_threadpool(db.commit)
     db.refresh(db_readmission)
     
     return db_readmission
@@ -351,7 +476,7 @@ async def create_satisfaction_score(
     
     db_satisfaction = SatisfactionScore(**satisfaction_dict)
     db.add(db_satisfaction)
-    db.commit()
+    await run_in_threadpool(db.commit)
     db.refresh(db_satisfaction)
     
     return db_satisfaction
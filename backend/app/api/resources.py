@@ -1,22 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date, datetime
 from uuid import UUID
 
-from app.database import get_db
-from app.models.resource import Department, Bed, Staff, Equipment
+from app.core.config import settings
+from app.database import get_db, get_read_db, request_tenant, tenant_registry
+from app.models.resource import Department, Bed, Staff, Equipment, ShiftAssignment
 from app.schemas.resource import (
     DepartmentCreate, DepartmentUpdate, DepartmentResponse,
     BedCreate, BedUpdate, BedResponse,
     StaffCreate, StaffUpdate, StaffResponse,
-    EquipmentCreate, EquipmentUpdate, EquipmentResponse
+    EquipmentCreate, EquipmentUpdate, EquipmentResponse,
+    MaintenancePlan, MaintenancePlanItem,
+    ShiftAssignmentResponse, RosterResult
 )
 from app.core.security import get_current_active_user, require_role
+from app.core.etag import detail_etag, list_etag, etag_matches, set_etag, not_modified
+from app.core.fieldsets import parse_fields, parse_includes, apply_fieldset, shaped_response
+from app.services.maintenance import maintenance_planner_for
+from app.services.rostering import build_roster
 from app.models.user import User
 
 router = APIRouter()
 
+# Relationships list endpoints can embed with ?include=
+DEPARTMENT_EXPANSION = {"department": DepartmentResponse}
+
 # Department Management
 @router.post("/departments", response_model=DepartmentResponse, status_code=status.HTTP_201_CREATED)
 async def create_department(
@@ -27,25 +39,36 @@ async def create_department(
     """Create a new department"""
     db_department = Department(**department_data.dict())
     db.add(db_department)
-    db.commit()
+    await run_in_threadpool(db.commit)
     db.refresh(db_department)
     
     return db_department
 
 @router.get("/departments", response_model=List[DepartmentResponse])
 async def get_departments(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get all departments"""
-    departments = db.query(Department).filter(Department.is_deleted == 0).offset(skip).limit(limit).all()
+    query = db.query(Department).filter(Department.is_deleted == 0)
+    
+    tag = list_etag(request, query, Department)
+    if etag_matches(request, tag):
+        return not_modified(tag)
+    set_etag(response, tag)
+    
+    departments = query.offset(skip).limit(limit).all()
     return departments
 
 @router.get("/departments/{department_id}", response_model=DepartmentResponse)
 async def get_department(
     department_id: UUID,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
@@ -61,6 +84,11 @@ async def get_department(
             detail="Department not found"
         )
     
+    tag = detail_etag(department)
+    if etag_matches(request, tag):
+        return not_modified(tag)
+    set_etag(response, tag)
+    
     return department
 
 @router.put("/departments/{department_id}", response_model=DepartmentResponse)
@@ -86,7 +114,7 @@ async def update_department(
     for field, value in update_data.items():
         setattr(department, field, value)
     
-    db.commit()
+    await run_in_threadpool(db.commit)
     db.refresh(department)
     
     return department
@@ -113,21 +141,25 @@ async def create_bed(
     
     db_bed = Bed(**bed_data.dict())
     db.add(db_bed)
-    db.commit()
+    await run_in_threadpool(db.commit)
     db.refresh(db_bed)
     
     return db_bed
 
 @router.get("/beds", response_model=List[BedResponse])
 async def get_beds(
+    request: Request,
+    response: Response,
     department_id: Optional[UUID] = Query(None),
     status: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    include: Optional[str] = Query(None, description="Comma-separated relationships to embed: department"),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get all beds with optional filters"""
+    included = parse_includes(include, DEPARTMENT_EXPANSION)
     query = db.query(Bed).filter(Bed.is_deleted == 0)
     
     if department_id:
@@ -136,12 +168,23 @@ async def get_beds(
     if status:
         query = query.filter(Bed.status == status)
     
-    beds = query.offset(skip).limit(limit).all()
+    tag = list_etag(request, query, Bed, included)
+    if etag_matches(request, tag):
+        return not_modified(tag)
+    set_etag(response, tag)
+    
+    beds = apply_fieldset(query, Bed, None, included).offset(skip).limit(limit).all()
+    if included:
+        expanded = shaped_response(beds, BedResponse, Bed, includes=included, expansions=DEPARTMENT_EXPANSION)
+        set_etag(expanded, tag)
+        return expanded
     return beds
 
 @router.get("/beds/{bed_id}", response_model=BedResponse)
 async def get_bed(
     bed_id: UUID,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
@@ -157,6 +200,11 @@ async def get_bed(
             detail="Bed not found"
         )
     
+    tag = detail_etag(bed)
+    if etag_matches(request, tag):
+        return not_modified(tag)
+    set_etag(response, tag)
+    
     return bed
 
 @router.put("/beds/{bed_id}", response_model=BedResponse)
@@ -182,7 +230,7 @@ async def update_bed(
     for field, value in update_data.items():
         setattr(bed, field, value)
     
-    db.commit()
+    await run_in_threadpool(db.commit)
     db.refresh(bed)
     
     return bed
@@ -223,22 +271,28 @@ async def create_staff(
     
     db_staff = Staff(**staff_data.dict())
     db.add(db_staff)
-    db.commit()
+    await run_in_threadpool(db.commit)
     db.refresh(db_staff)
     
     return db_staff
 
 @router.get("/staff", response_model=List[StaffResponse])
 async def get_staff(
+    request: Request,
+    response: Response,
     department_id: Optional[UUID] = Query(None),
     role: Optional[str] = Query(None),
     is_active: Optional[bool] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    include: Optional[str] = Query(None, description="Comma-separated relationships to embed: department"),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get all staff with optional filters"""
+    selected = parse_fields(fields, StaffResponse, Staff)
+    included = parse_includes(include, DEPARTMENT_EXPANSION)
     query = db.query(Staff).filter(Staff.is_deleted == 0)
     
     if department_id:
@@ -250,12 +304,23 @@ async def get_staff(
     if is_active is not None:
         query = query.filter(Staff.is_active == is_active)
     
-    staff = query.offset(skip).limit(limit).all()
+    tag = list_etag(request, query, Staff, included)
+    if etag_matches(request, tag):
+        return not_modified(tag)
+    set_etag(response, tag)
+    
+    staff = apply_fieldset(query, Staff, selected, included).offset(skip).limit(limit).all()
+    if selected or included:
+        shaped = shaped_response(staff, StaffResponse, Staff, selected, included, DEPARTMENT_EXPANSION)
+        set_etag(shaped, tag)
+        return shaped
     return staff
 
 @router.get("/staff/{staff_id}", response_model=StaffResponse)
 async def get_staff_member(
     staff_id: UUID,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
@@ -271,6 +336,11 @@ async def get_staff_member(
             detail="Staff member not found"
         )
     
+    tag = detail_etag(staff)
+    if etag_matches(request, tag):
+        return not_modified(tag)
+    set_etag(response, tag)
+    
     return staff
 
 @router.put("/staff/{staff_id}", response_model=StaffResponse)
@@ -296,11 +366,56 @@ async def update_staff(
     for field, value in update_data.items():
         setattr(staff, field, value)
     
-    db.commit()
+    await run_in_threadpool(db.commit)
     db.refresh(staff)
     
     return staff
 
+# Rostering
+def _build_roster(db_engine: Engine, start_date: date, days: int, department_id: Optional[UUID]) -> dict:
+    with db_engine.begin() as conn:
+        return build_roster(conn, start_date, days, department_id)
+
+@router.post("/roster/generate", response_model=RosterResult)
+async def generate_roster(
+    request: Request,
+    start_date: date = Query(...),
+    days: int = Query(settings.ROSTER_HORIZON_DAYS, ge=1, le=91),
+    department_id: Optional[UUID] = Query(None),
+    current_user: User = Depends(require_role("admin"))
+):
+    """Build nurse and doctor shift assignments from forecast census, replacing the period's roster"""
+    shard = tenant_registry.shard(request_tenant(request))
+    result = await run_in_threadpool(shard.run_write, _build_roster, shard.engine, start_date, days, department_id)
+    return RosterResult(**result)
+
+@router.get("/roster", response_model=List[ShiftAssignmentResponse])
+async def get_roster(
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    department_id: Optional[UUID] = Query(None),
+    staff_id: Optional[UUID] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get shift assignments in a period"""
+    query = db.query(ShiftAssignment).filter(
+        ShiftAssignment.shift_date >= start_date,
+        ShiftAssignment.shift_date <= end_date
+    )
+    
+    if department_id:
+        query = query.filter(ShiftAssignment.department_id == department_id)
+    
+    if staff_id:
+        query = query.filter(ShiftAssignment.staff_id == staff_id)
+    
+    return query.order_by(
+        ShiftAssignment.shift_date, ShiftAssignment.shift, ShiftAssignment.department_id
+    ).offset(skip).limit(limit).all()
+
 # Equipment Management
 @router.post("/equipment", response_model=EquipmentResponse, status_code=status.HTTP_201_CREATED)
 async def create_equipment(
@@ -330,22 +445,28 @@ async def create_equipment(
     
     db_equipment = Equipment(**equipment_data.dict())
     db.add(db_equipment)
-    db.commit()
+    await run_in_threadpool(db.commit)
     db.refresh(db_equipment)
     
     return db_equipment
 
 @router.get("/equipment", response_model=List[EquipmentResponse])
 async def get_equipment(
+    request: Request,
+    response: Response,
     department_id: Optional[UUID] = Query(None),
     equipment_type: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    include: Optional[str] = Query(None, description="Comma-separated relationships to embed: department"),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get all equipment with optional filters"""
+    selected = parse_fields(fields, EquipmentResponse, Equipment)
+    included = parse_includes(include, DEPARTMENT_EXPANSION)
     query = db.query(Equipment).filter(Equipment.is_deleted == 0)
     
     if department_id:
@@ -357,12 +478,64 @@ async def get_equipment(
     if status:
         query = query.filter(Equipment.status == status)
     
-    equipment = query.offset(skip).limit(limit).all()
+    tag = list_etag(request, query, Equipment, included)
+    if etag_matches(request, tag):
+        return not_modified(tag)
+    set_etag(response, tag)
+    
+    equipment = apply_fieldset(query, Equipment, selected, included).offset(skip).limit(limit).all()
+    if selected or included:
+        shaped = shaped_response(equipment, EquipmentResponse, Equipment, selected, included, DEPARTMENT_EXPANSION)
+        set_etag(shaped, tag)
+        return shaped
     return equipment
 
+@router.get("/equipment/maintenance-plan", response_model=MaintenancePlan)
+async def get_maintenance_plan(
+    request: Request,
+    department_id: Optional[UUID] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get the fleet-wide maintenance schedule and the devices at risk of missing their due date"""
+    # Primary session: the planner's updated_at watermark must not run ahead of a lagging replica
+    planner = maintenance_planner_for(request_tenant(request))
+    plan = planner.plan(db)
+    
+    items = [
+        MaintenancePlanItem(
+            equipment_id=entry.device.id,
+            equipment_code=entry.device.equipment_id,
+            name=entry.device.name,
+            department_id=entry.device.department_id,
+            status=entry.device.status,
+            daily_usage_hours=entry.device.daily_usage_hours,
+            projected_exhaustion_date=entry.device.projected_exhaustion_date,
+            next_maintenance_due=entry.device.next_maintenance_due,
+            due_date=entry.device.due_date,
+            reason=entry.device.reason,
+            scheduled_date=entry.scheduled_date,
+            slack_days=(entry.device.due_date - entry.scheduled_date).days,
+            at_risk=entry.at_risk
+        )
+        for entry in plan
+        if department_id is None or entry.device.department_id == department_id
+    ]
+    
+    return MaintenancePlan(
+        generated_at=planner.generated_at,
+        capacity_per_day=planner.capacity_per_day,
+        lead_days=planner.lead_days,
+        horizon_days=planner.horizon_days,
+        items=items,
+        at_risk=[item for item in items if item.at_risk]
+    )
+
 @router.get("/equipment/{equipment_id}", response_model=EquipmentResponse)
 async def get_equipment_item(
     equipment_id: UUID,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
@@ -378,6 +551,11 @@ async def get_equipment_item(
             detail="Equipment not found"
         )
     
+    tag = detail_etag(equipment)
+    if etag_matches(request, tag):
+        return not_modified(tag)
+    set_etag(response, tag)
+    
     return equipment
 
 @router.put("/equipment/{equipment_id}", response_model=EquipmentResponse)
@@ -403,7 +581,7 @@ async def update_equipment(
     for field, value in update_data.items():
         setattr(equipment, field, value)
     
-    db.commit()
+    await run_in_threadpool(db.commit)
     db.refresh(equipment)
     
     return equipment
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List, Optional
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Mediflow"
@@ -12,14 +12,111 @@ class Settings(BaseSettings):
     # CORS Settings
     ALLOWED_ORIGINS: List[str] = ["http://localhost:3000"]
     
+    # Responses: orjson rendering and gzip/brotli above COMPRESSION_MINIMUM_SIZE bytes
+    ORJSON_RESPONSES: bool = True
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    
     # Database
     DATABASE_URL: str = "sqlite:///./mediflow.db"
-    
+
+    # Multi-hospital routing: tenant name -> database URL (JSON in the environment).
+    # The default tenant uses DATABASE_URL; tokens carry the tenant they were issued for
+    DEFAULT_TENANT: str = "default"
+    TENANT_DATABASE_URLS: Dict[str, str] = {}
+    TENANT_FANOUT_WORKERS: int = 4
+    # Tenants whose admins may read /api/analytics/network/* across every hospital
+    NETWORK_ADMIN_TENANTS: List[str] = ["default"]
+
+    # Read replica for analytics and list endpoints (optional)
+    READ_REPLICA_URL: Optional[str] = None
+    READ_REPLICA_STICKY_SECONDS: int = 5
+    READ_REPLICA_RETRY_SECONDS: int = 30
+
+    # SQLite production profile: WAL, mmap and a single-writer queue
+    SQLITE_PRODUCTION_MODE: bool = False
+    SQLITE_MMAP_SIZE: int = 268435456  # 256 MiB
+    SQLITE_CACHE_SIZE: int = -65536  # negative = KiB, i.e. 64 MiB
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+
+    # Analytics event ingestion buffer
+    EVENT_BUFFER_BATCH_SIZE: int = 1000
+    EVENT_BUFFER_FLUSH_INTERVAL_SECONDS: float = 1.0
+    EVENT_BUFFER_MAX_PENDING: int = 50000
+    EVENT_MAX_BATCH_REQUEST: int = 5000
+    # Failed batches are retried, then split; single events that still fail go to the dead-letter table
+    EVENT_BUFFER_MAX_RETRIES: int = 3
+
+    # Analytics event retention: raw monthly partitions, then hourly and daily rollups
+    EVENT_RAW_RETENTION_MONTHS: int = 3
+    EVENT_HOURLY_RETENTION_DAYS: int = 31
+    EVENT_DAILY_RETENTION_DAYS: int = 730
+
+    # event_data keys copied into indexed columns, per event type (JSON in the environment)
+    PROMOTED_EVENT_KEYS: Dict[str, List[str]] = {
+        "equipment_usage": ["device_id"],
+        "bed_occupancy": ["ward"],
+        "staff_utilization": ["ward"],
+    }
+    EVENT_BACKFILL_BATCH_SIZE: int = 2000
+
+    # Background job scheduler (cron expressions, UTC)
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_SHUTDOWN_TIMEOUT_SECONDS: float = 30.0
+    JOB_RUN_HISTORY_DAYS: int = 30
+    EVENT_ROLLUP_CRON: str = "5 * * * *"
+    EVENT_RETENTION_CRON: str = "30 3 * * *"
+    REVOCATION_PURGE_CRON: str = "*/30 * * * *"
+    COST_ANALYSIS_CRON: str = "15 2 * * *"
+    JOB_RUN_PRUNE_CRON: str = "45 3 * * *"
+
     # JWT
     SECRET_KEY: str = "your-secret-key-here"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Token revocation: Bloom filter sizing and cross-worker refresh interval
+    REVOCATION_BLOOM_CAPACITY: int = 100000
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+    REVOCATION_REFRESH_SECONDS: int = 5
+
+    # Length-of-stay t-digests: centroids kept per sketch (accuracy vs size)
+    LOS_DIGEST_COMPRESSION: int = 100
+
+    # Distinct-patient HyperLogLogs: 2^precision registers per sketch, relative
+    # standard error 1.04 / sqrt(2^precision) (12 -> 1.6%, 14 -> 0.8%)
+    HLL_PRECISION: int = 12
+
+    # Cohort analytics: cached cohort grids per tenant, and how often the source tables
+    # are checked for changes (results may be this many seconds stale)
+    COHORT_CACHE_SIZE: int = 256
+    COHORT_CACHE_REFRESH_SECONDS: int = 30
+
+    # Equipment maintenance plan: services per day across all departments, how early a
+    # device may be serviced before it is due, and how far ahead to plan
+    MAINTENANCE_TECHNICIAN_CAPACITY: int = 4
+    MAINTENANCE_LEAD_DAYS: int = 14
+    MAINTENANCE_HORIZON_DAYS: int = 90
+
+    # Staff rostering: patients per nurse / doctor by department type (JSON in the environment),
+    # weekly shift cap per person and the census history the forecast averages over
+    ROSTER_PATIENTS_PER_NURSE: Dict[str, float] = {"default": 5, "icu": 2, "emergency": 4, "pediatrics": 4}
+    ROSTER_PATIENTS_PER_DOCTOR: Dict[str, float] = {"default": 15, "icu": 8, "emergency": 10}
+    ROSTER_MAX_SHIFTS_PER_WEEK: int = 5
+    ROSTER_HORIZON_DAYS: int = 28
+    ROSTER_CENSUS_HISTORY_WEEKS: int = 4
+
+    # /api/batch: sub-requests accepted per call, and reads run in parallel (worker threads, each with its own sessions)
+    BATCH_MAX_OPERATIONS: int = 20
+    BATCH_READ_CONCURRENCY: int = 4
+
+    # Password hashing: bcrypt cost and the bounded hashing pool
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+
     class Config:
         env_file = ".env"
 
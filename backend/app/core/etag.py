@@ -0,0 +1,59 @@
+"""
+ETags and conditional GETs for list and detail endpoints.
+
+A detail ETag is derived from the row's id and updated_at. A list ETag is
+derived from the path, the query string and an aggregate (row count and
+max(updated_at)) over the same filters as the list, so an unchanged list is
+answered with 304 before its rows are loaded or serialized. Creates and
+updates bump updated_at and soft deletes change the count, which changes the
+tag. updated_at has microsecond resolution (TimestampMixin), so edits within
+the same second still get distinct tags, and a row replaced within a second
+still moves max(updated_at).
+"""
+
+import hashlib
+from typing import Optional, Sequence
+
+from fastapi import Request, Response
+from sqlalchemy import func, inspect
+from sqlalchemy.orm import Query
+
+def _tag(*parts) -> str:
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+def detail_etag(instance) -> str:
+    return _tag(type(instance).__name__, instance.id, instance.updated_at.isoformat() if instance.updated_at else "")
+
+def list_etag(request: Request, query: Query, model, includes: Sequence[str] = ()) -> str:
+    """Tag for a filtered list query; call before offset/limit are applied.
+
+    Embedded relationships (`include=`) contribute their table's count and
+    max(updated_at) as well, so editing a related row changes the tag.
+    """
+    count, last_updated = query.order_by(None).with_entities(func.count(model.id), func.max(model.updated_at)).one()
+    parts = [count, last_updated.isoformat() if last_updated else ""]
+    for name in includes:
+        related = inspect(model).relationships[name].mapper.class_
+        related_count, related_updated = query.session.query(func.count(related.id), func.max(related.updated_at)).one()
+        parts += [name, related_count, related_updated.isoformat() if related_updated else ""]
+    params = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+    return _tag(request.url.path, params, *parts)
+
+def etag_matches(request: Request, tag: str) -> bool:
+    header: Optional[str] = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return "*" in candidates or tag in [candidate.removeprefix("W/") for candidate in candidates]
+
+def set_etag(response: Response, tag: str):
+    response.headers["ETag"] = tag
+    # Clients may keep the payload but must revalidate before reusing it
+    response.headers["Cache-Control"] = "private, no-cache"
+
+def not_modified(tag: str) -> Response:
+    response = Response(status_code=304)
+    set_etag(response, tag)
+    return response
@@ -0,0 +1,91 @@
+"""
+Sparse fieldsets and relationship expansion for list endpoints.
+
+`?fields=id,first_name,last_name` narrows both sides of a list request: the
+query only loads the requested columns (SQLAlchemy `load_only`) and rows are
+serialized with a trimmed copy of the response model, so payload size and
+query I/O scale with the columns actually asked for. `id` is always included.
+
+`?include=department` embeds related entities. Each included relationship is
+batch-loaded with `selectinload`, one extra query per relation however many
+rows are listed, so clients no longer fetch related rows one by one.
+"""
+
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException, status
+from fastapi.responses import Response
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy import inspect
+from sqlalchemy.orm import Query, load_only, selectinload
+
+from app.core.responses import default_response_class
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel], model) -> Optional[List[str]]:
+    """Validate a comma-separated fieldset; None means every field"""
+    if not fields:
+        return None
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    columns = set(inspect(model).columns.keys())
+    unknown = [name for name in requested if name not in schema.model_fields or name not in columns]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    return ["id"] + [name for name in dict.fromkeys(requested) if name != "id"]
+
+def parse_includes(include: Optional[str], expansions: Dict[str, Type[BaseModel]]) -> List[str]:
+    """Validate a comma-separated list of relationships to embed"""
+    if not include:
+        return []
+    requested = list(dict.fromkeys(name.strip() for name in include.split(",") if name.strip()))
+    unknown = [name for name in requested if name not in expansions]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown includes: {', '.join(unknown)}; expected one of {', '.join(expansions)}"
+        )
+    return requested
+
+def apply_fieldset(query: Query, model, fields: Optional[List[str]], includes: Sequence[str] = ()) -> Query:
+    mapper = inspect(model)
+    options = [selectinload(getattr(model, name)) for name in includes]
+    if fields:
+        # Foreign keys of included relationships must be loaded for selectinload to batch on them
+        columns = dict.fromkeys(fields)
+        for name in includes:
+            for column in mapper.relationships[name].local_columns:
+                columns[mapper.get_property_by_column(column).key] = None
+        options.append(load_only(*[getattr(model, name) for name in columns]))
+    return query.options(*options) if options else query
+
+@lru_cache(maxsize=128)
+def shaped_model(schema: Type[BaseModel], fields: Optional[FrozenSet[str]],
+                 expansions: Tuple[Tuple[str, type], ...] = ()) -> Type[BaseModel]:
+    """Copy of `schema` restricted to `fields` (all when None) with embedded relationship fields"""
+    definitions = {
+        name: (info.annotation, info) for name, info in schema.model_fields.items()
+        if fields is None or name in fields
+    }
+    definitions.update({name: (annotation, None) for name, annotation in expansions})
+    return create_model(
+        f"{schema.__name__}Shaped",
+        __config__=ConfigDict(from_attributes=True),
+        **definitions
+    )
+
+def shaped_response(rows: list, schema: Type[BaseModel], model, fields: Optional[List[str]] = None,
+                    includes: Sequence[str] = (), expansions: Optional[Dict[str, Type[BaseModel]]] = None) -> Response:
+    """Serialize rows with the trimmed/expanded model, bypassing the route's full response_model"""
+    embedded = []
+    for name in includes:
+        related = expansions[name]
+        if inspect(model).relationships[name].uselist:
+            embedded.append((name, List[related]))
+        else:
+            embedded.append((name, Optional[related]))
+    shaped = shaped_model(schema, frozenset(fields) if fields else None, tuple(embedded))
+    content = [shaped.model_validate(row).model_dump(mode="json") for row in rows]
+    return default_response_class()(content=content)
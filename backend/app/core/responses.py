@@ -0,0 +1,139 @@
+"""
+JSON response class and response compression.
+
+orjson and brotli are optional: without orjson responses fall back to
+FastAPI's JSONResponse, and without brotli only gzip is negotiated.
+"""
+
+import gzip
+from typing import Type
+
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson"""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+def default_response_class() -> Type[JSONResponse]:
+    if settings.ORJSON_RESPONSES and orjson is not None:
+        return ORJSONResponse
+    return JSONResponse
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+def negotiate_encoding(accept_encoding: str) -> str:
+    """Pick br or gzip from an Accept-Encoding header, honouring q=0; "" when neither is acceptable"""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in ("br", "gzip"):
+        if encoding == "br" and brotli is None:
+            continue
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return ""
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL)
+
+def _negotiated(status_code: int, headers: MutableHeaders) -> bool:
+    """Whether the response's encoding depends on Accept-Encoding"""
+    if "content-encoding" in headers:
+        return False
+    return status_code == 304 or headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+
+class CompressionMiddleware:
+    """Compress responses of at least `minimum_size` bytes with brotli or gzip.
+
+    The body is buffered, so this suits the API's JSON payloads rather than
+    long-lived streams. Strong ETags are weakened on compressed responses, since
+    the bytes on the wire differ from the identity representation.
+
+    Every response of a compressible type (and every 304, which stands in for
+    one) carries `Vary: Accept-Encoding`, compressed or not, so shared caches
+    never hand one client's encoding to another.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if not encoding:
+            async def send_identity(message: Message):
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(raw=message["headers"])
+                    if _negotiated(message["status"], headers):
+                        headers.add_vary_header("Accept-Encoding")
+                await send(message)
+
+            await self.app(scope, receive, send_identity)
+            return
+
+        start_message: Message = {}
+        chunks = []
+
+        async def send_compressed(message: Message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or not start_message:
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            headers = MutableHeaders(raw=start_message["headers"])
+            negotiated = _negotiated(start_message["status"], headers)
+            if negotiated:
+                headers.add_vary_header("Accept-Encoding")
+            if len(body) < self.minimum_size or "content-encoding" in headers or not negotiated:
+                await send(start_message)
+                await send({"type": "http.response.body", "body": body})
+                return
+
+            body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
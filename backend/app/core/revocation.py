@@ -0,0 +1,176 @@
+"""
+Access-token revocation for logout and forced sign-out.
+
+Revocations are stored in `revoked_tokens`, keyed by the token's `jti` claim,
+or by `user:<id>` to revoke every token a user was issued before a cutoff.
+Every authenticated request checks its token, so each process keeps a Bloom
+filter of the revoked keys: the common not-revoked case is answered in memory
+and only filter hits (real revocations and rare false positives) are confirmed
+against the store.
+
+Each tenant database has its own revoked_tokens table and so its own list.
+Revocations made in this process go into the filter immediately. Other workers
+pick them up on their next incremental refresh, at most
+REVOCATION_REFRESH_SECONDS later.
+"""
+
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.auth import RevokedToken
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings using double hashing.
+
+    Positions come from Python's string hash, which is randomised per process;
+    that is fine because every process builds its own filter from the store.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        position = hash(item) % self.size
+        step = (hash((item, self.size)) | 1) % self.size
+        for _ in range(self.hashes):
+            yield position
+            position = (position + step) % self.size
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        # Inlined, and the second hash is only computed when the first bit is set;
+        # for a key that was never added this usually returns after one probe
+        bits, size = self._bits, self.size
+        position = hash(item) % size
+        if not bits[position >> 3] & (1 << (position & 7)):
+            return False
+        step = (hash((item, size)) | 1) % size
+        for _ in range(self.hashes - 1):
+            position = (position + step) % size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+def user_key(user_id) -> str:
+    return f"user:{user_id}"
+
+class RevocationList:
+    """Bloom-filtered view of revoked_tokens with periodic incremental refresh"""
+
+    def __init__(self, capacity: int, error_rate: float, refresh_seconds: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_seconds = refresh_seconds
+        self._filter = BloomFilter(capacity, error_rate)
+        self._watermark: Optional[datetime] = None
+        self._next_refresh = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self, db: Session, full: bool = False):
+        """Load revocations newer than the last refresh, or rebuild the filter from scratch"""
+        now = datetime.utcnow()
+        query = db.query(RevokedToken.key, RevokedToken.revoked_at).filter(RevokedToken.expires_at > now)
+        if self._watermark is not None and not full:
+            # >= so rows committed with the same timestamp are not missed; re-adding is harmless
+            query = query.filter(RevokedToken.revoked_at >= self._watermark)
+        rows = query.all()
+
+        with self._lock:
+            if full or self._watermark is None:
+                self._filter = BloomFilter(max(self.capacity, 2 * len(rows)), self.error_rate)
+            for key, revoked_at in rows:
+                self._filter.add(key)
+                if self._watermark is None or revoked_at > self._watermark:
+                    self._watermark = revoked_at
+            if self._watermark is None:
+                self._watermark = now
+            # Grow the filter before the false-positive rate degrades
+            if self._filter.count > self._filter.capacity:
+                self._watermark = None
+            self._next_refresh = time.monotonic() + self.refresh_seconds
+
+    def _maybe_refresh(self, db: Session):
+        if time.monotonic() >= self._next_refresh:
+            self.refresh(db)
+
+    def _store(self, db: Session, key: str, user_id: Optional[UUID], expires_at: datetime, reason: Optional[str]):
+        now = datetime.utcnow()
+        row = db.query(RevokedToken).filter(RevokedToken.key == key).first()
+        if row is None:
+            row = RevokedToken(key=key)
+            db.add(row)
+        row.user_id = user_id
+        row.reason = reason
+        row.revoked_at = now
+        row.expires_at = max(expires_at, row.expires_at or expires_at)
+        db.commit()
+        with self._lock:
+            self._filter.add(key)
+
+    def revoke(self, db: Session, jti: str, user_id: Optional[UUID], expires_at: datetime, reason: Optional[str] = None):
+        """Revoke a single token until it expires"""
+        self._store(db, jti, user_id, expires_at, reason)
+
+    def revoke_user(self, db: Session, user_id: UUID, reason: Optional[str] = None):
+        """Revoke every token issued to a user up to now"""
+        expires_at = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        self._store(db, user_key(user_id), user_id, expires_at, reason)
+
+    def is_revoked(self, db: Session, jti: Optional[str], user_id: Optional[UUID], issued_at: Optional[datetime]) -> bool:
+        self._maybe_refresh(db)
+
+        if jti and jti in self._filter:
+            if db.query(RevokedToken.id).filter(RevokedToken.key == jti).first() is not None:
+                return True
+
+        if user_id is not None and user_key(user_id) in self._filter:
+            cutoff = db.query(RevokedToken.revoked_at).filter(RevokedToken.key == user_key(user_id)).scalar()
+            # iat has one-second resolution; tokens from the cutoff's second are treated as revoked
+            if cutoff is not None and (issued_at is None or issued_at <= cutoff):
+                return True
+
+        return False
+
+    def purge_expired(self, db: Session) -> int:
+        """Delete revocations whose tokens have all expired and rebuild the filter without them"""
+        deleted = db.query(RevokedToken).filter(RevokedToken.expires_at <= datetime.utcnow()).delete(synchronize_session=False)
+        db.commit()
+        self.refresh(db, full=True)
+        return deleted
+
+revocation_list = RevocationList(
+    capacity=settings.REVOCATION_BLOOM_CAPACITY,
+    error_rate=settings.REVOCATION_BLOOM_ERROR_RATE,
+    refresh_seconds=settings.REVOCATION_REFRESH_SECONDS
+)
+
+_tenant_lists: Dict[str, RevocationList] = {settings.DEFAULT_TENANT: revocation_list}
+_tenant_lists_lock = threading.Lock()
+
+def revocation_list_for(tenant: Optional[str]) -> RevocationList:
+    """Revocation list of a tenant's database; the default tenant's is `revocation_list`"""
+    tenant = tenant or settings.DEFAULT_TENANT
+    revocations = _tenant_lists.get(tenant)
+    if revocations is None:
+        with _tenant_lists_lock:
+            revocations = _tenant_lists.setdefault(tenant, RevocationList(
+                capacity=settings.REVOCATION_BLOOM_CAPACITY,
+                error_rate=settings.REVOCATION_BLOOM_ERROR_RATE,
+                refresh_seconds=settings.REVOCATION_REFRESH_SECONDS
+            ))
+    return revocations
@@ -0,0 +1,237 @@
+"""
+In-process job scheduler with cron schedules and lease-based locking.
+
+Every uvicorn worker runs a scheduler, started from the app lifespan. When a
+job is due, each worker tries to claim it by updating its row in `job_leases`.
+The update only matches while the lease is free and the row's `last_slot` is
+older than the due time. Exactly one worker wins each slot, so a job runs once
+per schedule tick however many workers there are. The lease expires after
+`lease_seconds`, so a worker that dies mid-run does not block the job for good.
+Leases are plain row updates, so the same code works on SQLite and PostgreSQL.
+
+Jobs run in the threadpool, off the event loop. Every run is recorded in
+`job_runs` with its duration, status and result for the /api/jobs endpoints.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Set
+
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import insert, or_, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.database import engine, run_serialized_write
+from app.models.jobs import JobLease, JobRun, JobRunStatus
+
+logger = logging.getLogger(__name__)
+
+class CronSchedule:
+    """Five-field cron expression: minute hour day-of-month month day-of-week, in UTC.
+
+    Fields accept `*`, numbers, ranges (`1-5`), steps (`*/15`, `0-30/10`) and
+    comma-separated lists. Day-of-week 0 and 7 are Sunday. As in cron, when
+    both day fields are restricted a day matching either one is due.
+    """
+
+    FIELDS = [("minute", 0, 59), ("hour", 0, 23), ("day of month", 1, 31), ("month", 1, 12), ("day of week", 0, 7)]
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Cron expression needs 5 fields, got {len(parts)}: {expression!r}")
+        self.minutes, self.hours, self.days, self.months, weekdays = [
+            self._parse_field(part, name, low, high) for part, (name, low, high) in zip(parts, self.FIELDS)
+        ]
+        self.weekdays = {day % 7 for day in weekdays}
+        self._any_day = parts[2] == "*"
+        self._any_weekday = parts[4] == "*"
+
+    @staticmethod
+    def _parse_field(spec: str, name: str, low: int, high: int) -> Set[int]:
+        values: Set[int] = set()
+        for item in spec.split(","):
+            item_range, _, step = item.partition("/")
+            if item_range == "*":
+                start, end = low, high
+            elif "-" in item_range:
+                start, end = (int(value) for value in item_range.split("-", 1))
+            else:
+                start = end = int(item_range)
+                if step:
+                    end = high
+            step_size = int(step) if step else 1
+            if not (low <= start <= end <= high) or step_size < 1:
+                raise ValueError(f"Invalid {name} field: {spec!r}")
+            values.update(range(start, end + 1, step_size))
+        return values
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_match = moment.day in self.days
+        weekday_match = (moment.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day_match and weekday_match
+        return day_match or weekday_match
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First matching minute strictly after `moment`"""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # Skip whole months, days and hours at a time; five years covers any valid expression
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                candidate = (candidate.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression never matches: {self.expression!r}")
+
+class Job:
+    def __init__(self, name: str, schedule: CronSchedule, fn: Callable[[], Optional[dict]],
+                 lease_seconds: int, description: str = ""):
+        self.name = name
+        self.schedule = schedule
+        self.fn = fn
+        self.lease_seconds = lease_seconds
+        self.description = description
+        self.next_run: Optional[datetime] = None
+
+class Scheduler:
+    def __init__(self, db_engine: Engine):
+        self.engine = db_engine
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.jobs: Dict[str, Job] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._running: Dict[str, asyncio.Task] = {}
+
+    def add_job(self, name: str, cron: str, fn: Callable[[], Optional[dict]],
+                lease_seconds: int = 600, description: str = ""):
+        self.jobs[name] = Job(name, CronSchedule(cron), fn, lease_seconds, description)
+
+    def is_running(self, name: str) -> bool:
+        """Whether this worker is running the job right now"""
+        return name in self._running
+
+    async def start(self):
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        # Let jobs that are already running finish and record their outcome
+        if self._running:
+            await asyncio.wait(list(self._running.values()), timeout=settings.SCHEDULER_SHUTDOWN_TIMEOUT_SECONDS)
+
+    async def _loop(self):
+        now = datetime.utcnow()
+        for job in self.jobs.values():
+            job.next_run = job.schedule.next_after(now)
+        while True:
+            now = datetime.utcnow()
+            for job in self.jobs.values():
+                if job.next_run > now:
+                    continue
+                slot, job.next_run = job.next_run, job.schedule.next_after(now)
+                if job.name not in self._running:
+                    self._spawn(job, slot)
+            wake_at = min((job.next_run for job in self.jobs.values()), default=now + timedelta(minutes=1))
+            # Re-check at least once a minute in case the wall clock jumps
+            await asyncio.sleep(min(max((wake_at - datetime.utcnow()).total_seconds(), 0.05), 60))
+
+    def _spawn(self, job: Job, slot: datetime) -> asyncio.Task:
+        task = asyncio.create_task(self._run(job, slot))
+        self._running[job.name] = task
+        task.add_done_callback(lambda _: self._running.pop(job.name, None))
+        return task
+
+    async def run_now(self, name: str) -> Optional[JobRun]:
+        """Run a job immediately unless a run holds its lease; returns the run, or None if it could not claim it"""
+        job = self.jobs[name]
+        if self.is_running(name):
+            return None
+        return await self._spawn(job, datetime.utcnow())
+
+    def _claim(self, job: Job, slot: datetime) -> bool:
+        now = datetime.utcnow()
+        leases = JobLease.__table__
+        with self.engine.begin() as conn:
+            claimed = conn.execute(
+                update(leases)
+                .where(
+                    leases.c.name == job.name,
+                    or_(leases.c.last_slot.is_(None), leases.c.last_slot < slot),
+                    or_(leases.c.expires_at.is_(None), leases.c.expires_at < now)
+                )
+                .values(owner=self.owner, expires_at=now + timedelta(seconds=job.lease_seconds), last_slot=slot)
+            )
+            if claimed.rowcount == 1:
+                return True
+            if conn.execute(leases.select().where(leases.c.name == job.name)).first() is not None:
+                return False
+        # First run of a new job: creating its lease row is the claim
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(insert(leases).values(
+                    name=job.name, owner=self.owner,
+                    expires_at=now + timedelta(seconds=job.lease_seconds), last_slot=slot
+                ))
+            return True
+        except IntegrityError:
+            return False
+
+    def _record(self, run: JobRun, release: Optional[str] = None):
+        leases = JobLease.__table__
+        with self.engine.begin() as conn:
+            values = {column.name: getattr(run, column.name) for column in JobRun.__table__.columns}
+            if run.finished_at is None:
+                conn.execute(insert(JobRun.__table__).values(**values))
+            else:
+                conn.execute(update(JobRun.__table__).where(JobRun.__table__.c.id == run.id).values(**values))
+            if release:
+                conn.execute(
+                    update(leases).where(leases.c.name == release, leases.c.owner == self.owner).values(expires_at=None)
+                )
+
+    async def _run(self, job: Job, slot: datetime) -> Optional[JobRun]:
+        if not await run_in_threadpool(run_serialized_write, self._claim, job, slot):
+            return None
+
+        run = JobRun(id=uuid.uuid4(), job_name=job.name, owner=self.owner, scheduled_for=slot,
+                     started_at=datetime.utcnow(), status=JobRunStatus.RUNNING)
+        await run_in_threadpool(run_serialized_write, self._record, run)
+        started = time.perf_counter()
+        try:
+            run.result = jsonable_encoder(await run_in_threadpool(job.fn))
+            run.status = JobRunStatus.SUCCEEDED
+        except Exception as exc:
+            logger.exception("Scheduled job %s failed", job.name)
+            run.status = JobRunStatus.FAILED
+            run.error = f"{type(exc).__name__}: {exc}"
+        run.finished_at = datetime.utcnow()
+        run.duration_ms = round((time.perf_counter() - started) * 1000, 3)
+        await run_in_threadpool(run_serialized_write, self._record, run, job.name)
+        return run
+
+scheduler = Scheduler(engine)
@@ -1,22 +1,38 @@
+import asyncio
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Union
+from typing import Optional, Tuple, Union
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import HTTPException, status, Depends
+from fastapi import HTTPException, Request, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.database import get_db
+from app.core.revocation import revocation_list_for
+from app.database import get_db, request_tenant
 from app.models.user import User
 from app.schemas.user import TokenData
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing; hashes with any other cost are flagged for rehash on login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
 
 # JWT token handling
 security = HTTPBearer()
 
+# JWT claim naming the tenant (hospital) database the token was issued for
+TENANT_CLAIM = "tenant"
+
+# Request-state key under which /api/batch hands its user to sub-requests
+BATCH_USER_STATE = "batch_user"
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     return pwd_context.verify(plain_password, hashed_password)
@@ -25,15 +41,60 @@ def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
 
+class PasswordHasher:
+    """Runs bcrypt on a bounded thread pool so hashing never blocks the event loop.
+
+    At most PASSWORD_HASH_WORKERS hashes run at once and PASSWORD_HASH_MAX_QUEUE
+    more may wait; beyond that callers get a 503 so a login storm sheds load
+    instead of queueing without bound.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def _run(self, fn, *args):
+        if self._in_flight >= self.workers + self.max_queue:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication is busy, retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        self._in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._in_flight -= 1
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(pwd_context.verify, plain_password, hashed_password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password; also returns a new hash when the stored one uses outdated settings"""
+        return await self._run(pwd_context.verify_and_update, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(pwd_context.hash, password)
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_QUEUE)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token"""
     to_encode = data.copy()
+    now = datetime.utcnow()
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    # jti identifies the token for revocation; iat lets a forced sign-out cover earlier tokens
+    to_encode.update({"exp": expire, "iat": now, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -54,23 +115,42 @@ def verify_token(token: str) -> TokenData:
         if username is None or user_id is None:
             raise credentials_exception
             
+        issued_at = payload.get("iat")
+        expires_at = payload.get("exp")
         token_data = TokenData(
             username=username,
             user_id=user_id,
-            role=role
+            role=role,
+            jti=payload.get("jti"),
+            issued_at=datetime.utcfromtimestamp(issued_at) if issued_at is not None else None,
+            expires_at=datetime.utcfromtimestamp(expires_at) if expires_at is not None else None,
+            tenant=payload.get(TENANT_CLAIM)
         )
         return token_data
     except JWTError:
         raise credentials_exception
 
 def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ) -> User:
     """Get the current authenticated user"""
+    # /api/batch already authenticated the caller; its sub-requests carry the user
+    batch_user = getattr(request.state, BATCH_USER_STATE, None)
+    if batch_user is not None:
+        return batch_user
+    
     token = credentials.credentials
     token_data = verify_token(token)
     
+    if revocation_list_for(token_data.tenant).is_revoked(db, token_data.jti, token_data.user_id, token_data.issued_at):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
     user = db.query(User).filter(User.username == token_data.username).first()
     if user is None:
         raise HTTPException(
@@ -108,5 +188,14 @@ def require_role(required_role: str):
         return current_user
     return role_checker
 
+def require_network_admin(request: Request, current_user: User = Depends(require_role("admin"))):
+    """Require an admin signed in to one of NETWORK_ADMIN_TENANTS, for cross-hospital analytics"""
+    if request_tenant(request) not in settings.NETWORK_ADMIN_TENANTS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Network analytics require an admin of a network admin tenant"
+        )
+    return current_user
+
 
 
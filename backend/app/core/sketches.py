@@ -0,0 +1,293 @@
+"""
+Mergeable streaming sketches for analytics that must not rescan source tables.
+
+`TDigest` summarises a distribution in a bounded number of weighted centroids
+and answers quantile and CDF queries with small relative error, tightest at
+the tails (p99) where means are most misleading. Digests merge, so one digest
+per department, admission type and month can be combined into any coarser
+view after the fact.
+
+`HyperLogLog` estimates the number of distinct items it has seen in a few
+kilobytes at most, with a relative standard error of 1.04 / sqrt(2^precision).
+Adding an item twice changes nothing and merging takes the register-wise
+maximum, so daily sketches combine into any date range and set of departments
+without double counting.
+"""
+
+import hashlib
+import math
+import struct
+from typing import Iterable, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+
+class TDigest:
+    """Merging t-digest (Dunning) with the arcsine scale function.
+
+    Points are buffered and folded into the centroids when the buffer fills
+    or before a query. A centroid may only grow while the scale function
+    advances by at most 1 across it, which keeps centroids near q=0 and q=1
+    small: extreme quantiles stay accurate while the digest keeps roughly
+    `compression` centroids however many points it has seen.
+    """
+
+    # compression, centroid count, min, max; then float32 means and float64 weights
+    HEADER = struct.Struct("<HIdd")
+
+    def __init__(self, compression: int = 100):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer: List[Tuple[float, float]] = []
+
+    @property
+    def count(self) -> float:
+        self._flush()
+        return float(self.weights.sum())
+
+    def add(self, value: float, weight: float = 1.0):
+        self._buffer.append((float(value), float(weight)))
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self._buffer) >= 5 * self.compression:
+            self._flush()
+
+    def update(self, values: Iterable[float]):
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        """Fold another digest into this one"""
+        other._flush()
+        self._buffer.extend(zip(other.means.tolist(), other.weights.tolist()))
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._flush()
+        return self
+
+    def _k(self, q: float) -> float:
+        return self.compression / (2 * math.pi) * math.asin(2 * min(max(q, 0.0), 1.0) - 1)
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        buffered = np.array(self._buffer)
+        self._buffer = []
+        means = np.concatenate([self.means, buffered[:, 0]])
+        weights = np.concatenate([self.weights, buffered[:, 1]])
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+
+        merged_means: List[float] = []
+        merged_weights: List[float] = []
+        # Greedy left-to-right merge under the scale-function size limit
+        q_left = 0.0
+        k_limit = self._k(q_left) + 1
+        current_mean, current_weight = float(means[0]), float(weights[0])
+        for mean, weight in zip(means[1:].tolist(), weights[1:].tolist()):
+            q_right = (q_left * total + current_weight + weight) / total
+            if self._k(q_right) <= k_limit:
+                current_weight += weight
+                current_mean += (mean - current_mean) * weight / current_weight
+            else:
+                merged_means.append(current_mean)
+                merged_weights.append(current_weight)
+                q_left += current_weight / total
+                k_limit = self._k(q_left) + 1
+                current_mean, current_weight = mean, weight
+        merged_means.append(current_mean)
+        merged_weights.append(current_weight)
+        self.means = np.array(merged_means)
+        self.weights = np.array(merged_weights)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated value at quantile q (0..1); None for an empty digest"""
+        self._flush()
+        if not len(self.means):
+            return None
+        if len(self.means) == 1 or q <= 0:
+            return self.min if q <= 0 else float(self.means[0])
+        if q >= 1:
+            return self.max
+        total = self.weights.sum()
+        # Each centroid's weight is centred on its mean; interpolate between neighbouring centres
+        centres = np.cumsum(self.weights) - self.weights / 2
+        target = q * total
+        if target <= centres[0]:
+            return float(self.min + (self.means[0] - self.min) * target / centres[0])
+        if target >= centres[-1]:
+            return float(self.means[-1] + (self.max - self.means[-1]) * (target - centres[-1]) / (total - centres[-1]))
+        return float(np.interp(target, centres, self.means))
+
+    def cdf(self, value: float) -> float:
+        """Estimated fraction of points <= value"""
+        self._flush()
+        if not len(self.means):
+            return 0.0
+        if value < self.min:
+            return 0.0
+        if value >= self.max:
+            return 1.0
+        total = self.weights.sum()
+        centres = np.cumsum(self.weights) - self.weights / 2
+        points = np.concatenate([[self.min], self.means, [self.max]])
+        ranks = np.concatenate([[0.0], centres, [total]])
+        return float(np.interp(value, points, ranks) / total)
+
+    def to_bytes(self) -> bytes:
+        self._flush()
+        header = self.HEADER.pack(self.compression, len(self.means), self.min, self.max)
+        return header + self.means.astype("<f4").tobytes() + self.weights.astype("<f8").tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "TDigest":
+        compression, size, low, high = cls.HEADER.unpack_from(data)
+        offset = cls.HEADER.size
+        digest = cls(compression)
+        digest.means = np.frombuffer(data, dtype="<f4", count=size, offset=offset).astype(float)
+        digest.weights = np.frombuffer(data, dtype="<f8", count=size, offset=offset + 4 * size).copy()
+        digest.min, digest.max = low, high
+        return digest
+
+class HyperLogLog:
+    """HyperLogLog over 64-bit hashes with Ertl's improved estimator.
+
+    The top `precision` bits of an item's hash pick one of 2^precision
+    registers; the register keeps the largest rank (leading zeros + 1) seen in
+    the remaining bits. The estimator works from the histogram of register
+    values and needs neither linear counting for small cardinalities nor
+    empirical bias tables. Sketches with few items serialise sparsely.
+    """
+
+    # format, precision, stored entries; then uint16 index + uint8 rank pairs (sparse) or all registers (dense)
+    HEADER = struct.Struct("<BBI")
+    SPARSE, DENSE = 0, 1
+
+    def __init__(self, precision: int = 12):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @property
+    def relative_error(self) -> float:
+        """Relative standard error of the estimate"""
+        return 1.04 / math.sqrt(len(self.registers))
+
+    @staticmethod
+    def hash(item) -> int:
+        if isinstance(item, UUID):
+            data = item.bytes
+        elif isinstance(item, bytes):
+            data = item
+        else:
+            data = str(item).encode()
+        return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big")
+
+    def add(self, item):
+        self.add_hashes(np.array([self.hash(item)], dtype=np.uint64))
+
+    def update(self, items: Iterable):
+        self.add_hashes(np.fromiter((self.hash(item) for item in items), dtype=np.uint64))
+
+    def add_hashes(self, hashes: np.ndarray):
+        if not len(hashes):
+            return
+        width = 64 - self.precision
+        index = (hashes >> np.uint64(width)).astype(np.int64)
+        rest = hashes & np.uint64((1 << width) - 1)
+        ranks = (width + 1 - self._bit_length(rest)).astype(np.uint8)
+        np.maximum.at(self.registers, index, ranks)
+
+    @staticmethod
+    def _bit_length(values: np.ndarray) -> np.ndarray:
+        # frexp is exact below 2^53, so work on the 32-bit halves
+        high = (values >> np.uint64(32)).astype(np.float64)
+        low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+        return np.where(high > 0, np.frexp(high)[1] + 32, np.frexp(low)[1]).astype(np.int64)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Fold another sketch into this one, at the lower of the two precisions"""
+        if other.precision > self.precision:
+            other = other.reduced(self.precision)
+        elif other.precision < self.precision:
+            reduced = self.reduced(other.precision)
+            self.precision, self.registers = reduced.precision, reduced.registers
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def reduced(self, precision: int) -> "HyperLogLog":
+        """The same sketch at a lower precision, as if it had been built there"""
+        shift = self.precision - precision
+        if shift <= 0:
+            return self
+        sketch = HyperLogLog(precision)
+        registers = self.registers.astype(np.int64).reshape(-1, 1 << shift)
+        # The dropped index bits now lead the rank word: the first set one decides the rank,
+        # and only if they are all zero does the old rank count, shifted by their width
+        low_bits = np.arange(1 << shift, dtype=np.uint64)
+        leading = shift + 1 - self._bit_length(low_bits)
+        ranks = np.where(registers == 0, 0, np.where(low_bits == 0, registers + shift, leading))
+        sketch.registers = ranks.max(axis=1).astype(np.uint8)
+        return sketch
+
+    def estimate(self) -> float:
+        m = len(self.registers)
+        q = 64 - self.precision
+        counts = np.bincount(self.registers, minlength=q + 2).astype(float)
+        if counts[0] == m:
+            return 0.0
+        z = m * self._tau(1 - counts[q + 1] / m)
+        for k in range(q, 0, -1):
+            z = 0.5 * (z + counts[k])
+        z += m * self._sigma(counts[0] / m)
+        return m * m / (2 * math.log(2)) / z
+
+    @staticmethod
+    def _sigma(x: float) -> float:
+        if x == 1:
+            return math.inf
+        y, z = 1.0, x
+        while True:
+            x *= x
+            previous = z
+            z += x * y
+            y += y
+            if z == previous:
+                return z
+
+    @staticmethod
+    def _tau(x: float) -> float:
+        if x == 0 or x == 1:
+            return 0.0
+        y, z = 1.0, 1 - x
+        while True:
+            x = math.sqrt(x)
+            previous = z
+            y *= 0.5
+            z -= (1 - x) ** 2 * y
+            if z == previous:
+                return z / 3
+
+    def to_bytes(self) -> bytes:
+        index = np.flatnonzero(self.registers)
+        if 3 * len(index) < len(self.registers):
+            header = self.HEADER.pack(self.SPARSE, self.precision, len(index))
+            return header + index.astype("<u2").tobytes() + self.registers[index].tobytes()
+        return self.HEADER.pack(self.DENSE, self.precision, len(self.registers)) + self.registers.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        layout, precision, size = cls.HEADER.unpack_from(data)
+        offset = cls.HEADER.size
+        sketch = cls(precision)
+        if layout == cls.DENSE:
+            sketch.registers = np.frombuffer(data, dtype=np.uint8, count=size, offset=offset).copy()
+        else:
+            index = np.frombuffer(data, dtype="<u2", count=size, offset=offset).astype(np.int64)
+            sketch.registers[index] = np.frombuffer(data, dtype=np.uint8, count=size, offset=offset + 2 * size)
+        return sketch
@@ -0,0 +1,96 @@
+"""
+Multi-hospital tenancy: per-request database routing and cross-shard fan-out.
+
+Every request is routed to one tenant's database. The tenant comes from the
+`tenant` claim of the bearer token, or, for unauthenticated requests such as
+login, from the X-Tenant header; without either it is DEFAULT_TENANT. The
+claim is signed, so a token issued for one hospital cannot be pointed at
+another's database.
+
+`fan_out` runs a function against every shard in parallel for network-wide
+analytics, each shard on its own session in a worker thread.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+
+from fastapi.responses import JSONResponse
+from jose import JWTError, jwt
+from sqlalchemy.orm import Session
+from starlette.datastructures import Headers
+
+from app.core.config import settings
+from app.core.security import TENANT_CLAIM
+from app.database import TENANT_STATE, tenant_registry
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+TENANT_HEADER = "x-tenant"
+
+def tenant_from_headers(headers: Headers) -> str:
+    authorization = headers.get("authorization")
+    if authorization:
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() == "bearer":
+            try:
+                claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+            except JWTError:
+                # Authentication rejects the token later; route to the default database meanwhile
+                return tenant_registry.default_tenant
+            return claims.get(TENANT_CLAIM) or tenant_registry.default_tenant
+    return headers.get(TENANT_HEADER) or tenant_registry.default_tenant
+
+class TenantMiddleware:
+    """Resolves the request's tenant into request.state for get_db/get_read_db"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        state = scope.setdefault("state", {})
+        # /api/batch sub-requests inherit the batch's tenant
+        if TENANT_STATE not in state:
+            tenant = tenant_from_headers(Headers(scope=scope))
+            if tenant not in tenant_registry:
+                response = JSONResponse({"detail": f"Unknown tenant: {tenant}"}, status_code=400)
+                await response(scope, receive, send)
+                return
+            state[TENANT_STATE] = tenant
+        await self.app(scope, receive, send)
+
+_fan_out_executor = ThreadPoolExecutor(max_workers=settings.TENANT_FANOUT_WORKERS, thread_name_prefix="tenant-fan-out")
+
+def _run_on_shard(tenant: str, fn: Callable[[Session], T]) -> T:
+    db = tenant_registry.read_session(tenant)
+    try:
+        return fn(db)
+    finally:
+        db.close()
+
+async def fan_out(fn: Callable[[Session], T], tenants: Optional[List[str]] = None) -> Tuple[Dict[str, T], List[str]]:
+    """Run fn(db) on every tenant's read session in parallel.
+
+    Returns the results by tenant and the tenants that failed; a shard that is
+    down does not fail the whole call.
+    """
+    tenants = tenants or tenant_registry.tenants
+    loop = asyncio.get_running_loop()
+    outcomes = await asyncio.gather(
+        *(loop.run_in_executor(_fan_out_executor, _run_on_shard, tenant, fn) for tenant in tenants),
+        return_exceptions=True
+    )
+    results, failed = {}, []
+    for tenant, outcome in zip(tenants, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error("Fan-out to tenant %s failed", tenant, exc_info=outcome)
+            failed.append(tenant)
+        else:
+            results[tenant] = outcome
+    return results, failed
@@ -1,27 +1,402 @@
-from sqlalchemy import create_engine
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from functools import partial
+from typing import Callable, Dict, List, Optional
+
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
 from app.core.config import settings
 
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """SQLite production profile, applied to every new connection"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.close()
+
+def create_database_engine(url: str, sqlite_production: bool = False):
+    """Create an engine; SQLite URLs can opt into the production profile"""
+    is_sqlite = url.startswith("sqlite")
+    connect_args = {}
+    if is_sqlite and sqlite_production:
+        # Connections are handed to the writer thread for commits
+        connect_args = {"check_same_thread": False, "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000}
+    db_engine = create_engine(
+        url,
+        pool_pre_ping=True,
+        pool_recycle=300,
+        echo=settings.DEBUG,
+        connect_args=connect_args
+    )
+    if is_sqlite and sqlite_production:
+        event.listen(db_engine, "connect", _apply_sqlite_pragmas)
+    return db_engine
+
+class _WriteLease:
+    """Exclusive use of the writer thread by one unit of work until released"""
+
+    def __init__(self, writer_thread: threading.Thread):
+        self._calls: "queue.Queue" = queue.Queue()
+        self._writer_thread = writer_thread
+
+    def run(self, fn: Callable, *args):
+        if threading.current_thread() is self._writer_thread:
+            return fn(*args)
+        future: Future = Future()
+        self._calls.put((fn, args, future))
+        return future.result()
+
+    def release(self):
+        self._calls.put(None)
+
+    def serve(self):
+        while True:
+            call = self._calls.get()
+            if call is None:
+                return
+            _execute(*call)
+
+def _execute(fn: Callable, args: tuple, future: Future):
+    if not future.set_running_or_notify_cancel():
+        return
+    try:
+        future.set_result(fn(*args))
+    except BaseException as exc:
+        future.set_exception(exc)
+
+class SQLiteWriteQueue:
+    """Runs write transactions one at a time on a dedicated writer thread.
+
+    SQLite allows a single writer; funnelling every write through one thread means
+    writers in this process queue here instead of racing for the database lock, while
+    readers keep reading the WAL snapshot without blocking. A unit of work that writes
+    in several steps (flush, then commit) holds a lease on the thread in between, so
+    no other writer's statements interleave with it.
+
+    `run` and leased calls block the calling thread; async handlers call them
+    through `run_in_threadpool`.
+    """
+
+    def __init__(self, maxsize: int = 0):
+        self._queue: "queue.Queue" = queue.Queue(maxsize)
+        self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def run(self, fn: Callable, *args):
+        """Execute fn on the writer thread and wait for its result"""
+        if threading.current_thread() is self._thread:
+            return fn(*args)
+        future: Future = Future()
+        self._queue.put((fn, args, future))
+        return future.result()
+
+    def lease(self) -> _WriteLease:
+        """Queue a lease; its calls run once the writer reaches it, until it is released"""
+        lease = _WriteLease(self._thread)
+        self._queue.put(lease)
+        return lease
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if isinstance(item, _WriteLease):
+                item.serve()
+            else:
+                _execute(*item)
+
+class SerializedWriteSession(Session):
+    """Session whose writes run on the SQLite writer thread.
+
+    The first flush or DML statement takes a lease on the writer; everything the
+    session writes until commit, rollback or close runs under that lease.
+    """
+
+    def __init__(self, *args, writer: SQLiteWriteQueue, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._writer = writer
+        self._lease: Optional[_WriteLease] = None
+
+    def _write(self, fn: Callable, *args):
+        if self._lease is None:
+            self._lease = self._writer.lease()
+        return self._lease.run(fn, *args)
+
+    def _release(self):
+        lease, self._lease = self._lease, None
+        if lease is not None:
+            lease.release()
+
+    def flush(self, objects=None):
+        if not (self.new or self.dirty or self.deleted):
+            return super().flush(objects)
+        self._write(super().flush, objects)
+
+    def execute(self, statement, *args, **kwargs):
+        if getattr(statement, "is_dml", False):
+            return self._write(partial(super().execute, statement, *args, **kwargs))
+        return super().execute(statement, *args, **kwargs)
+
+    def commit(self):
+        try:
+            self._write(super().commit)
+        finally:
+            self._release()
+
+    def rollback(self):
+        if self._lease is None:
+            return super().rollback()
+        try:
+            self._lease.run(super().rollback)
+        finally:
+            self._release()
+
+    def close(self):
+        if self._lease is None:
+            return super().close()
+        try:
+            self._lease.run(super().close)
+        finally:
+            self._release()
+
+# Request-state key and header carrying the wall-clock time of the request's last write
+LAST_WRITE_STATE = "last_write"
+LAST_WRITE_HEADER = "x-last-write"
+
+def _mark_session_wrote(session, flush_context):
+    """Remember that this session wrote, so the client's next reads stick to the primary"""
+    session.info["wrote"] = True
+    request_state = session.info.get("request_state")
+    if request_state is not None:
+        setattr(request_state, LAST_WRITE_STATE, time.time())
+
+class Shard:
+    """Engine, session factory and (SQLite production profile) writer queue of one database"""
+
+    def __init__(self, url: str):
+        sqlite_production = settings.SQLITE_PRODUCTION_MODE and url.startswith("sqlite")
+        self.engine = create_database_engine(url, sqlite_production=sqlite_production)
+        # Single writer for the SQLite production profile
+        self.writer = SQLiteWriteQueue() if sqlite_production else None
+        if self.writer:
+            self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine,
+                                             class_=SerializedWriteSession, writer=self.writer)
+        else:
+            self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        event.listen(self.SessionLocal, "after_flush", _mark_session_wrote)
+
+    def run_write(self, fn: Callable, *args):
+        """Run a Core-level write (bulk inserts, maintenance) through this shard's writer queue when enabled"""
+        if self.writer:
+            return self.writer.run(fn, *args)
+        return fn(*args)
+
+_primary = Shard(settings.DATABASE_URL)
+
 # Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=300,
-    echo=settings.DEBUG
-)
+engine = _primary.engine
+sqlite_writer = _primary.writer
 
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = _primary.SessionLocal
+
+def run_serialized_write(fn: Callable, *args):
+    """Run a Core-level write on the default tenant's database through its writer queue"""
+    return _primary.run_write(fn, *args)
+
+# Optional read replica for analytics and list endpoints
+replica_engine = create_database_engine(
+    settings.READ_REPLICA_URL,
+    sqlite_production=settings.SQLITE_PRODUCTION_MODE
+) if settings.READ_REPLICA_URL else None
+
+ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine) if replica_engine else None
 
 # Create base class for models
 Base = declarative_base()
 
+class ReplicaRouter:
+    """Routes read-only sessions to the replica, with read-your-writes stickiness and fallback.
+
+    After a client writes, its reads go to the primary for READ_REPLICA_STICKY_SECONDS
+    so replication lag never hides its own changes. Writes are remembered per client
+    (bearer token) in this process, and the write time is also returned in the
+    X-Last-Write header; a client that echoes it back stays sticky on every worker.
+    A replica that fails to connect is skipped for READ_REPLICA_RETRY_SECONDS and
+    reads fall back to the primary.
+    """
+
+    def __init__(self, sticky_seconds: float, retry_seconds: float):
+        self.sticky_seconds = sticky_seconds
+        self.retry_seconds = retry_seconds
+        self._last_write: Dict[str, float] = {}
+        self._replica_down_until = 0.0
+        self._lock = threading.Lock()
+
+    def record_write(self, client_key: Optional[str]):
+        if client_key is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._last_write[client_key] = now
+            # Drop clients whose sticky window has passed
+            if len(self._last_write) > 1000:
+                cutoff = now - self.sticky_seconds
+                self._last_write = {k: t for k, t in self._last_write.items() if t >= cutoff}
+
+    def is_sticky(self, client_key: Optional[str], reported_write: Optional[float] = None) -> bool:
+        # reported_write is the client's X-Last-Write (wall clock), possibly set by another worker
+        if reported_write is not None and abs(time.time() - reported_write) < self.sticky_seconds:
+            return True
+        if client_key is None:
+            return False
+        last_write = self._last_write.get(client_key)
+        return last_write is not None and time.monotonic() - last_write < self.sticky_seconds
+
+    def replica_available(self) -> bool:
+        return ReplicaSessionLocal is not None and time.monotonic() >= self._replica_down_until
+
+    def mark_replica_down(self):
+        self._replica_down_until = time.monotonic() + self.retry_seconds
+
+    def read_session(self, client_key: Optional[str], reported_write: Optional[float] = None) -> Session:
+        """Open a session on the replica when possible, otherwise on the primary"""
+        if self.replica_available() and not self.is_sticky(client_key, reported_write):
+            db = ReplicaSessionLocal()
+            try:
+                db.connection()
+                db.info["replica"] = True
+                return db
+            except DBAPIError:
+                db.close()
+                self.mark_replica_down()
+        return SessionLocal()
+
+read_router = ReplicaRouter(settings.READ_REPLICA_STICKY_SECONDS, settings.READ_REPLICA_RETRY_SECONDS)
+
+class TenantRegistry:
+    """Routes each hospital (tenant) to its own database.
+
+    The default tenant is the DATABASE_URL database (with the read replica, if
+    any); every other tenant gets a pooled engine on its TENANT_DATABASE_URLS
+    entry, created on first use. Point several tenants at one PostgreSQL server
+    with a search_path per URL to shard by schema instead of by database.
+    """
+
+    def __init__(self, default_tenant: str, urls: Dict[str, str]):
+        self.default_tenant = default_tenant
+        self.urls = {tenant: url for tenant, url in urls.items() if tenant != default_tenant}
+        self._shards: Dict[str, Shard] = {default_tenant: _primary}
+        self._lock = threading.Lock()
+
+    @property
+    def tenants(self) -> List[str]:
+        return [self.default_tenant] + list(self.urls)
+
+    def __contains__(self, tenant: str) -> bool:
+        return tenant == self.default_tenant or tenant in self.urls
+
+    def shard(self, tenant: str) -> Shard:
+        shard = self._shards.get(tenant)
+        if shard is None:
+            with self._lock:
+                shard = self._shards.get(tenant)
+                if shard is None:
+                    shard = self._shards[tenant] = Shard(self.urls[tenant])
+        return shard
+
+    def engine(self, tenant: str):
+        return self.shard(tenant).engine
+
+    def session(self, tenant: str) -> Session:
+        return self.shard(tenant).SessionLocal()
+
+    def read_session(self, tenant: str, client_key: Optional[str] = None,
+                     reported_write: Optional[float] = None) -> Session:
+        if tenant == self.default_tenant:
+            return read_router.read_session(client_key, reported_write)
+        return self.session(tenant)
+
+tenant_registry = TenantRegistry(settings.DEFAULT_TENANT, settings.TENANT_DATABASE_URLS)
+
+# Request-state key holding the tenant resolved by TenantMiddleware
+TENANT_STATE = "tenant"
+
+def request_tenant(request: Request) -> str:
+    return getattr(request.state, TENANT_STATE, tenant_registry.default_tenant)
+
+def _client_key(request: Request) -> Optional[str]:
+    return request.headers.get("authorization")
+
+def _reported_write(request: Request) -> Optional[float]:
+    try:
+        return float(request.headers[LAST_WRITE_HEADER])
+    except (KeyError, ValueError):
+        return None
+
+def request_read_session(request: Request) -> Session:
+    """Open a read session for the request's tenant, honoring the client's recent writes"""
+    return tenant_registry.read_session(request_tenant(request), _client_key(request), _reported_write(request))
+
+# Sub-requests of /api/batch reuse the batch's sessions, passed in the request state
+BATCH_DB_STATE = "batch_db"
+BATCH_READ_DB_STATE = "batch_read_db"
+
 # Dependency to get database session
-def get_db():
-    db = SessionLocal()
+def get_db(request: Request):
+    shared = getattr(request.state, BATCH_DB_STATE, None)
+    if shared is not None:
+        yield shared
+        return
+    db = tenant_registry.session(request_tenant(request))
+    db.info["request_state"] = request.state
     try:
         yield db
     finally:
+        if db.info.get("wrote"):
+            read_router.record_write(_client_key(request))
         db.close()
 
+# Dependency to get a read-only session, served by the replica when configured
+def get_read_db(request: Request):
+    shared = getattr(request.state, BATCH_READ_DB_STATE, None)
+    if shared is not None:
+        yield shared
+        return
+    db = request_read_session(request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+class LastWriteMiddleware:
+    """Adds X-Last-Write to responses of requests that wrote, for cross-worker read-your-writes"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        state = scope.setdefault("state", {})
+
+        async def send_with_last_write(message):
+            if message["type"] == "http.response.start" and LAST_WRITE_STATE in state:
+                headers = list(message.get("headers", []))
+                headers.append((LAST_WRITE_HEADER.encode("latin-1"), f"{state[LAST_WRITE_STATE]:.3f}".encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_last_write)
@@ -4,27 +4,54 @@ from fastapi.security import HTTPBearer
 from contextlib import asynccontextmanager
 import uvicorn
 
-from app.database import engine, get_db
+from app.database import LAST_WRITE_HEADER, LastWriteMiddleware, get_db, tenant_registry
 from app.models import Base
-from app.api import auth, patients, analytics, resources
+from app.api import auth, patients, analytics, resources, events, batch, jobs
 from app.core.config import settings
+from app.core.responses import CompressionMiddleware, default_response_class
+from app.core.tenancy import TenantMiddleware
+from app.core.scheduler import scheduler
+from app.services.event_ingestion import event_buffer
+from app.services.event_partitions import ensure_promoted_columns
+from app.services.scheduled_jobs import register_jobs
 
 # Create database tables
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    Base.metadata.create_all(bind=engine)
+    for tenant in tenant_registry.tenants:
+        tenant_engine = tenant_registry.engine(tenant)
+        Base.metadata.create_all(bind=tenant_engine)
+        with tenant_engine.begin() as conn:
+            ensure_promoted_columns(conn)
+    await event_buffer.start()
+    if settings.SCHEDULER_ENABLED:
+        register_jobs(scheduler)
+        await scheduler.start()
     yield
     # Shutdown
-    pass
+    await scheduler.stop()
+    await event_buffer.stop()
 
 app = FastAPI(
     title="Mediflow Healthcare Analytics Platform",
     description="A comprehensive healthcare analytics platform for tracking patient outcomes and optimizing resource allocation",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=default_response_class()
 )
 
+# Response compression
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+
+# Per-hospital database routing
+if settings.TENANT_DATABASE_URLS:
+    app.add_middleware(TenantMiddleware)
+
+# Read-your-writes across workers for read-replica routing
+app.add_middleware(LastWriteMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -32,6 +59,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[LAST_WRITE_HEADER],
 )
 
 # Security
@@ -42,6 +70,9 @@ app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(patients.router, prefix="/api/patients", tags=["Patients"])
 app.include_router(analytics.router, prefix="/api/analytics", tags=["Analytics"])
 app.include_router(resources.router, prefix="/api/resources", tags=["Resources"])
+app.include_router(events.router, prefix="/api/events", tags=["Events"])
+app.include_router(batch.router, prefix="/api/batch", tags=["Batch"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["Jobs"])
 
 @app.get("/")
 async def root():
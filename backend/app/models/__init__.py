@@ -1,16 +1,22 @@
 from .base import Base
 from .patient import Patient, Admission, Discharge
 from .outcome import PatientOutcome, Readmission, SatisfactionScore
-from .resource import Bed, Staff, Equipment, Department
-from .analytics import AnalyticsEvent, CostAnalysis
+from .resource import Bed, Staff, Equipment, Department, ShiftAssignment, ShiftType
+from .analytics import AnalyticsEvent, AnalyticsEventRollup, AnalyticsEventDeadLetter, CostAnalysis, LengthOfStaySketch, PatientCountSketch
+from .diagnosis import DiagnosisCode, DiagnosisPosting, DiagnosisField
 from .user import User, UserRole 
+from .auth import RevokedToken
+from .jobs import JobLease, JobRun, JobRunStatus
 
 __all__ = [
     "Base",
     "Patient", "Admission", "Discharge",
     "PatientOutcome", "Readmission", "SatisfactionScore",
-    "Bed", "Staff", "Equipment", "Department",
-    "AnalyticsEvent", "CostAnalysis",
-    "User", "Role"
+    "Bed", "Staff", "Equipment", "Department", "ShiftAssignment", "ShiftType",
+    "AnalyticsEvent", "AnalyticsEventRollup", "AnalyticsEventDeadLetter", "CostAnalysis", "LengthOfStaySketch", "PatientCountSketch",
+    "DiagnosisCode", "DiagnosisPosting", "DiagnosisField",
+    "User", "Role",
+    "RevokedToken",
+    "JobLease", "JobRun", "JobRunStatus"
 ]
 
@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, String, Date, Enum, Text, ForeignKey, Numeric, Boolean, JSON
+from sqlalchemy import Column, Integer, String, Date, DateTime, Enum, Text, ForeignKey, Numeric, Boolean, JSON, Index, LargeBinary, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
+import re
 import uuid
 from enum import Enum as PyEnum
 
+from app.core.config import settings
 from .base import Base, TimestampMixin, SoftDeleteMixin
+from .patient import AdmissionType
 
 class EventType(PyEnum):
     PATIENT_ADMISSION = "patient_admission"
@@ -17,12 +20,19 @@ class EventType(PyEnum):
     SATISFACTION_SURVEY = "satisfaction_survey"
     OUTCOME_TRACKING = "outcome_tracking"
 
+class RollupGranularity(PyEnum):
+    HOURLY = "hourly"
+    DAILY = "daily"
+    MONTHLY = "monthly"
+
 class AnalyticsEvent(Base, TimestampMixin, SoftDeleteMixin):
     __tablename__ = "analytics_events"
+    # Range-partitioned by month on PostgreSQL; the partition key must be part of the primary key
+    __table_args__ = {"postgresql_partition_by": "RANGE (event_date)"}
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     event_type = Column(Enum(EventType), nullable=False)
-    event_date = Column(Date, nullable=False)
+    event_date = Column(Date, primary_key=True, nullable=False)
     department_id = Column(UUID(as_uuid=True), ForeignKey("departments.id"), nullable=True)
     patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.id"), nullable=True)
     admission_id = Column(UUID(as_uuid=True), ForeignKey("admissions.id"), nullable=True)
@@ -39,6 +49,39 @@ class AnalyticsEvent(Base, TimestampMixin, SoftDeleteMixin):
     patient = relationship("Patient")
     admission = relationship("Admission")
 
+def promoted_column_name(key: str) -> str:
+    """Shadow column holding event_data[key] as text"""
+    return f"data_{key}"
+
+def _register_promoted_columns():
+    """Add an indexed shadow column to AnalyticsEvent for every key in PROMOTED_EVENT_KEYS"""
+    event_types = {event_type.value for event_type in EventType}
+    keys = set()
+    for event_type, type_keys in settings.PROMOTED_EVENT_KEYS.items():
+        if event_type not in event_types:
+            raise ValueError(f"PROMOTED_EVENT_KEYS: unknown event type '{event_type}'")
+        for key in type_keys:
+            if not re.fullmatch(r"[a-z][a-z0-9_]{0,50}", key):
+                raise ValueError(f"PROMOTED_EVENT_KEYS: '{key}' is not a valid column suffix")
+            keys.add(key)
+
+    table = AnalyticsEvent.__table__
+    for key in sorted(keys):
+        name = promoted_column_name(key)
+        setattr(AnalyticsEvent, name, Column(name, String(255), nullable=True))
+        Index(f"ix_{table.name}_{name}", table.c.event_type, table.c[name])
+
+_register_promoted_columns()
+
+class AnalyticsEventDeadLetter(Base, TimestampMixin):
+    """An ingested event that could not be written after EVENT_BUFFER_MAX_RETRIES attempts"""
+    __tablename__ = "analytics_event_dead_letters"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    event = Column(JSON, nullable=False)
+    error = Column(Text, nullable=False)
+    attempts = Column(Integer, nullable=False)
+
 class CostAnalysis(Base, TimestampMixin, SoftDeleteMixin):
     __tablename__ = "cost_analyses"
     
@@ -76,5 +119,54 @@ class CostAnalysis(Base, TimestampMixin, SoftDeleteMixin):
     department = relationship("Department")
     admission = relationship("Admission")
 
+class AnalyticsEventRollup(Base, TimestampMixin):
+    __tablename__ = "analytics_event_rollups"
+    __table_args__ = (
+        Index("ix_analytics_event_rollups_bucket", "granularity", "event_type", "bucket_start"),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    granularity = Column(Enum(RollupGranularity), nullable=False)
+    bucket_start = Column(DateTime, nullable=False)
+    event_type = Column(Enum(EventType), nullable=False)
+    department_id = Column(UUID(as_uuid=True), ForeignKey("departments.id"), nullable=True)
+    
+    # Mergeable aggregates of metric_value
+    event_count = Column(Integer, nullable=False, default=0)
+    metric_count = Column(Integer, nullable=False, default=0)
+    metric_sum = Column(Numeric(20, 4), nullable=True)
+    metric_min = Column(Numeric(15, 4), nullable=True)
+    metric_max = Column(Numeric(15, 4), nullable=True)
 
+class LengthOfStaySketch(Base, TimestampMixin):
+    """t-digest of discharge lengths of stay for one department, admission type and month"""
+    __tablename__ = "length_of_stay_sketches"
+    __table_args__ = (
+        UniqueConstraint("department_id", "admission_type", "period_start", name="uq_length_of_stay_sketches_key"),
+        Index("ix_length_of_stay_sketches_period", "period_start"),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    department_id = Column(UUID(as_uuid=True), ForeignKey("departments.id"), nullable=False)
+    admission_type = Column(Enum(AdmissionType), nullable=False)
+    period_start = Column(Date, nullable=False)  # first day of the discharge month
+    
+    # Exact count and sum for the mean; the digest carries min, max and the quantiles
+    discharge_count = Column(Integer, nullable=False, default=0)
+    total_days = Column(Integer, nullable=False, default=0)
+    digest = Column(LargeBinary, nullable=False)
 
+class PatientCountSketch(Base, TimestampMixin):
+    """HyperLogLog of the patients admitted to one department on one day"""
+    __tablename__ = "patient_count_sketches"
+    __table_args__ = (
+        UniqueConstraint("department_id", "period_start", name="uq_patient_count_sketches_key"),
+        Index("ix_patient_count_sketches_period", "period_start"),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    department_id = Column(UUID(as_uuid=True), ForeignKey("departments.id"), nullable=False)
+    period_start = Column(Date, nullable=False)  # admission date
+    
+    admission_count = Column(Integer, nullable=False, default=0)
+    registers = Column(LargeBinary, nullable=False)
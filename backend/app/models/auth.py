@@ -0,0 +1,20 @@
+from sqlalchemy import Column, String, DateTime, Index
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+
+from .base import Base
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+    __table_args__ = (
+        Index("ix_revoked_tokens_revoked_at", "revoked_at"),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # Token jti, or "user:<id>" for a forced sign-out of every token issued before revoked_at
+    key = Column(String(64), unique=True, nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), nullable=True)
+    reason = Column(String(100), nullable=True)
+    revoked_at = Column(DateTime, nullable=False)
+    # Rows can be purged once every token they cover has expired
+    expires_at = Column(DateTime, nullable=False)
@@ -1,13 +1,22 @@
 from sqlalchemy import Column, Integer, DateTime, func
 from sqlalchemy.ext.declarative import declarative_base
-from datetime import datetime
+from datetime import datetime, timezone
 
 Base = declarative_base()
 
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
 class TimestampMixin:
-    """Mixin to add created_at and updated_at timestamps to models"""
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    """Mixin to add created_at and updated_at timestamps to models.
+
+    Timestamps are set in Python with microsecond resolution; SQLite's
+    CURRENT_TIMESTAMP only has seconds, which would let two edits within one
+    second share an updated_at (and an ETag). The server defaults cover rows
+    inserted outside the ORM.
+    """
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now(), onupdate=utcnow, nullable=False)
 
 class SoftDeleteMixin:
     """Mixin to add soft delete functionality to models"""
@@ -0,0 +1,35 @@
+from sqlalchemy import Column, String, Date, Text, ForeignKey, Enum, Index
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from enum import Enum as PyEnum
+
+from .base import Base, TimestampMixin, SoftDeleteMixin
+
+class DiagnosisField(PyEnum):
+    PRIMARY = "primary"
+    SECONDARY = "secondary"
+    DISCHARGE = "discharge"
+
+class DiagnosisCode(Base, TimestampMixin, SoftDeleteMixin):
+    """Local diagnosis code table; searches by code expand to its description and synonyms"""
+    __tablename__ = "diagnosis_codes"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    code = Column(String(20), unique=True, nullable=False, index=True)
+    description = Column(String(255), nullable=False)
+    synonyms = Column(Text, nullable=True)  # one phrase per line or ';'-separated
+    category = Column(String(100), nullable=True)
+
+class DiagnosisPosting(Base):
+    """One normalized term of one admission's diagnosis field"""
+    __tablename__ = "diagnosis_postings"
+    __table_args__ = (
+        Index("ix_diagnosis_postings_term_date", "term", "admission_date"),
+    )
+
+    admission_id = Column(UUID(as_uuid=True), ForeignKey("admissions.id"), primary_key=True)
+    field = Column(Enum(DiagnosisField), primary_key=True)
+    term = Column(String(64), primary_key=True)
+    # Copied from the admission so date and department filters stay on the postings
+    admission_date = Column(Date, nullable=False)
+    department_id = Column(UUID(as_uuid=True), ForeignKey("departments.id"), nullable=False)
@@ -0,0 +1,38 @@
+from sqlalchemy import Column, String, DateTime, Enum, Float, Text, JSON, Index
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from enum import Enum as PyEnum
+
+from .base import Base
+
+class JobRunStatus(PyEnum):
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class JobLease(Base):
+    """One row per scheduled job; the worker holding the lease runs the job"""
+    __tablename__ = "job_leases"
+    
+    name = Column(String(100), primary_key=True)
+    owner = Column(String(100), nullable=True)
+    expires_at = Column(DateTime, nullable=True)
+    # Scheduled time of the last claimed run, so each slot runs once across workers
+    last_slot = Column(DateTime, nullable=True)
+
+class JobRun(Base):
+    __tablename__ = "job_runs"
+    __table_args__ = (
+        Index("ix_job_runs_job_name_started_at", "job_name", "started_at"),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    job_name = Column(String(100), nullable=False)
+    owner = Column(String(100), nullable=False)
+    scheduled_for = Column(DateTime, nullable=False)
+    started_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+    duration_ms = Column(Float, nullable=True)
+    status = Column(Enum(JobRunStatus), nullable=False)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
@@ -1,8 +1,10 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, Date, Text, ForeignKey, Enum, Boolean, Index
 from sqlalchemy.orm import relationship
-from app.database import Base
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
 import enum
 
+from .base import Base, TimestampMixin, SoftDeleteMixin
 
 class OutcomeType(str, enum.Enum):
     RECOVERED = "recovered"
@@ -17,26 +19,63 @@ class ReadmissionReason(str, enum.Enum):
     RELAPSE = "relapse"
     OTHER = "other"
 
-# THEN DEFINE MODELS THAT USE THE ENUMS
-class PatientOutcome(Base):
+class PatientOutcome(Base, TimestampMixin, SoftDeleteMixin):
     __tablename__ = "patient_outcomes"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    patient_id = Column(Integer, ForeignKey("patients.id"))
-    outcome_type = Column(Enum(OutcomeType))  # Now this will work
-    # ... other columns
 
-class Readmission(Base):
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.id"), nullable=False, index=True)
+    admission_id = Column(UUID(as_uuid=True), ForeignKey("admissions.id"), nullable=True, index=True)
+    outcome_type = Column(Enum(OutcomeType), nullable=False)
+    outcome_date = Column(Date, nullable=False)
+    recovery_time_days = Column(Integer, nullable=True)
+    treatment_success = Column(Boolean, nullable=True)
+    complications = Column(Text, nullable=True)
+    follow_up_required = Column(Boolean, default=False, nullable=False)
+    follow_up_date = Column(Date, nullable=True)
+    notes = Column(Text, nullable=True)
+
+    # Relationships
+    patient = relationship("Patient", back_populates="outcomes")
+
+class Readmission(Base, TimestampMixin, SoftDeleteMixin):
     __tablename__ = "readmissions"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    patient_id = Column(Integer, ForeignKey("patients.id"))
-    reason = Column(Enum(ReadmissionReason))  # This will also work
-    # ... other columns
+    __table_args__ = (
+        Index("ix_readmissions_date", "readmission_date"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.id"), nullable=False, index=True)
+    original_admission_id = Column(UUID(as_uuid=True), ForeignKey("admissions.id"), nullable=False, index=True)
+    readmission_date = Column(Date, nullable=False)
+    days_since_discharge = Column(Integer, nullable=False)
+    readmission_reason = Column(Enum(ReadmissionReason), nullable=False)
+    readmission_department_id = Column(UUID(as_uuid=True), ForeignKey("departments.id"), nullable=False)
+    severity_score = Column(Integer, nullable=True)  # 1-10
+    preventable = Column(Boolean, nullable=True)
+    notes = Column(Text, nullable=True)
 
-class SatisfactionScore(Base):
+    # Relationships
+    patient = relationship("Patient", back_populates="readmissions")
+
+class SatisfactionScore(Base, TimestampMixin, SoftDeleteMixin):
     __tablename__ = "satisfaction_scores"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    patient_id = Column(Integer, ForeignKey("patients.id"))
-    # ... other columns
\ No newline at end of file
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.id"), nullable=False, index=True)
+    admission_id = Column(UUID(as_uuid=True), ForeignKey("admissions.id"), nullable=True, index=True)
+    survey_date = Column(Date, nullable=False)
+    # Ratings 1-5
+    overall_satisfaction = Column(Integer, nullable=False)
+    care_quality = Column(Integer, nullable=True)
+    communication = Column(Integer, nullable=True)
+    cleanliness = Column(Integer, nullable=True)
+    food_quality = Column(Integer, nullable=True)
+    staff_friendliness = Column(Integer, nullable=True)
+    pain_management = Column(Integer, nullable=True)
+    discharge_process = Column(Integer, nullable=True)
+    would_recommend = Column(Boolean, nullable=True)
+    comments = Column(Text, nullable=True)
+    improvement_suggestions = Column(Text, nullable=True)
+
+    # Relationships
+    patient = relationship("Patient", back_populates="satisfaction_scores")
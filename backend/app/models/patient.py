@@ -2,7 +2,6 @@ from sqlalchemy import Column, Integer, String, Date, Enum, Text, ForeignKey, Nu
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
-from pydantic import Field
 from enum import Enum as PyEnum
 
 from .base import Base, TimestampMixin, SoftDeleteMixin
@@ -57,7 +56,8 @@ class Admission(Base, TimestampMixin, SoftDeleteMixin):
     patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.id"), nullable=False)
     admission_number = Column(String(50), unique=True, nullable=False, index=True)
     admission_date = Column(Date, nullable=False)
-    admission_time: str = Field(..., pattern=r'^([0-1]?[0-9]|2[0-3]):[0-5][0-9]$', description="Time in HH:MM format")
+    admission_time = Column(String(5), nullable=False)  # HH:MM format
+    admission_type = Column(Enum(AdmissionType), nullable=False)
     department_id = Column(UUID(as_uuid=True), ForeignKey("departments.id"), nullable=False)
     bed_id = Column(UUID(as_uuid=True), ForeignKey("beds.id"), nullable=True)
     primary_diagnosis = Column(Text, nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, Enum, Text, ForeignKey, Numeric, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Date, Enum, Text, ForeignKey, Numeric, Boolean, DateTime, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
@@ -25,6 +25,10 @@ class EquipmentStatus(PyEnum):
     MAINTENANCE = "maintenance"
     OUT_OF_ORDER = "out_of_order"
 
+class ShiftType(PyEnum):
+    DAY = "day"
+    NIGHT = "night"
+
 class DepartmentType(PyEnum):
     EMERGENCY = "emergency"
     SURGERY = "surgery"
@@ -115,5 +119,20 @@ class Equipment(Base, TimestampMixin, SoftDeleteMixin):
     # Relationships
     department = relationship("Department", back_populates="equipment")
 
-
-
+class ShiftAssignment(Base, TimestampMixin):
+    """One staff member working one shift on one day, as built by the rostering engine"""
+    __tablename__ = "shift_assignments"
+    __table_args__ = (
+        UniqueConstraint("staff_id", "shift_date", name="uq_shift_assignments_staff_date"),
+        Index("ix_shift_assignments_department_date", "department_id", "shift_date"),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    staff_id = Column(UUID(as_uuid=True), ForeignKey("staff.id"), nullable=False)
+    department_id = Column(UUID(as_uuid=True), ForeignKey("departments.id"), nullable=False)
+    shift_date = Column(Date, nullable=False)
+    shift = Column(Enum(ShiftType), nullable=False)
+    role = Column(Enum(StaffRole), nullable=False)
+    
+    # Relationships
+    staff = relationship("Staff")
@@ -1,11 +1,12 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import date, datetime
 from uuid import UUID
 from enum import Enum
 from decimal import Decimal
 
-from app.models.analytics import EventType
+from app.models.analytics import EventType, RollupGranularity
+from app.models.patient import AdmissionType
 
 # Analytics Event Schemas
 class AnalyticsEventBase(BaseModel):
@@ -31,6 +32,50 @@ class AnalyticsEventResponse(AnalyticsEventBase):
     class Config:
         from_attributes = True
 
+class EventIngestResponse(BaseModel):
+    accepted: int
+    pending: int
+
+class IngestionMetrics(BaseModel):
+    accepted: int
+    rejected: int
+    flushed: int
+    pending: int
+    flush_count: int
+    flush_errors: int
+    dead_lettered: int
+    events_per_second: float
+    flush_latency_avg_ms: float
+    flush_latency_p95_ms: float
+    flush_latency_max_ms: float
+
+class RollupPoint(BaseModel):
+    bucket_start: datetime
+    event_count: int
+    metric_sum: Optional[float]
+    metric_avg: Optional[float]
+    metric_min: Optional[float]
+    metric_max: Optional[float]
+
+class RollupSeries(BaseModel):
+    event_type: EventType
+    department_id: Optional[UUID]
+    granularity: RollupGranularity
+    points: List[RollupPoint]
+
+class RollupRunResult(BaseModel):
+    hourly: int
+    daily: int
+    monthly: int
+    dropped_partitions: List[str]
+    pruned_hourly: int
+    pruned_daily: int
+
+class PromotedKeyBackfillResult(BaseModel):
+    tables: int
+    scanned: int
+    updated: int
+
 # Cost Analysis Schemas
 class CostAnalysisBase(BaseModel):
     analysis_date: date
@@ -64,6 +109,95 @@ class CostAnalysisResponse(CostAnalysisBase):
     class Config:
         from_attributes = True
 
+class CostAnalysisGenerationResult(BaseModel):
+    departments: int
+    months: int
+    rows: int
+    elapsed_ms: float
+
+class AdmissionCostGenerationResult(BaseModel):
+    departments: int
+    admissions: int
+    rows: int
+    elapsed_ms: float
+
+# Length of Stay Distribution Schemas
+class LengthOfStayBucket(BaseModel):
+    min_days: int
+    max_days: Optional[int] = Field(None, description="Exclusive upper bound; None for the last bucket")
+    count: int
+
+class LengthOfStayDistribution(BaseModel):
+    department_id: Optional[UUID] = None
+    admission_type: Optional[AdmissionType] = None
+    discharges: int
+    mean: Optional[float]
+    min: Optional[float]
+    max: Optional[float]
+    p50: Optional[float]
+    p90: Optional[float]
+    p99: Optional[float]
+    histogram: List[LengthOfStayBucket]
+
+class LengthOfStayReport(BaseModel):
+    period_start: date
+    period_end: date
+    group_by: str
+    distributions: List[LengthOfStayDistribution]
+
+class LengthOfStaySketchRebuildResult(BaseModel):
+    sketches: int
+    discharges: int
+    elapsed_ms: float
+
+class DistinctPatientCount(BaseModel):
+    department_id: Optional[UUID] = None
+    distinct_patients: int
+    lower_bound: int = Field(..., description="95% interval, 1.96 standard errors")
+    upper_bound: int = Field(..., description="95% interval, capped at the admission count")
+    admissions: int
+    relative_standard_error: float
+
+class DistinctPatientReport(BaseModel):
+    start_date: date
+    end_date: date
+    group_by: str
+    counts: List[DistinctPatientCount]
+
+class DistinctPatientSketchRebuildResult(BaseModel):
+    sketches: int
+    admissions: int
+    elapsed_ms: float
+
+class CohortMetrics(BaseModel):
+    # Set for the dimensions the cohorts are grouped by
+    month: Optional[date] = None
+    department_id: Optional[UUID] = None
+    admission_type: Optional[AdmissionType] = None
+    diagnosis: Optional[str] = None
+    admissions: int
+    discharges: int
+    readmission_rate: float = Field(..., description="Percent readmitted within horizon_days of discharge")
+    mortality_rate: float = Field(..., description="Percent deceased within horizon_days of admission")
+    average_length_of_stay: Optional[float]
+    median_length_of_stay: Optional[float]
+    satisfaction_score: Optional[float]
+    satisfaction_responses: int
+    satisfaction_distribution: List[int] = Field(..., description="Responses rating 1 to 5")
+    # Percent by day 0..horizon_days
+    readmission_curve: List[float]
+    mortality_curve: List[float]
+    in_hospital_curve: List[float]
+
+class CohortReport(BaseModel):
+    group_by: List[str]
+    start_date: date
+    end_date: date
+    horizon_days: int
+    data_version: int
+    cached: bool
+    cohorts: List[CohortMetrics]
+
 # Analytics Dashboard Schemas
 class DashboardMetrics(BaseModel):
     total_patients: int
@@ -91,6 +225,18 @@ class DepartmentPerformance(BaseModel):
     cost_efficiency: float
     staff_utilization: float
 
+class NetworkDashboardMetrics(BaseModel):
+    network: DashboardMetrics
+    hospitals: Dict[str, DashboardMetrics]
+    unavailable: List[str] = Field(default_factory=list, description="Hospitals whose database could not be queried")
+
+class NetworkDepartmentPerformance(DepartmentPerformance):
+    tenant: str
+
+class NetworkDepartmentPerformanceReport(BaseModel):
+    departments: List[NetworkDepartmentPerformance]
+    unavailable: List[str] = Field(default_factory=list, description="Hospitals whose database could not be queried")
+
 class PatientOutcomeSummary(BaseModel):
     total_patients: int
     recovery_rate: float
@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List
+
+class BatchOperation(BaseModel):
+    id: Optional[str] = Field(None, description="Caller-chosen key echoed back in the result")
+    method: str = Field("GET", description="HTTP method")
+    path: str = Field(..., description="API path, optionally with a query string, e.g. /api/analytics/dashboard")
+    params: Optional[Dict[str, Any]] = Field(None, description="Query parameters")
+    body: Optional[Any] = Field(None, description="JSON request body")
+    headers: Optional[Dict[str, str]] = Field(None, description="Extra headers, e.g. If-None-Match")
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation]
+
+class BatchOperationResult(BaseModel):
+    id: Optional[str]
+    status: int
+    headers: Dict[str, str]
+    body: Optional[Any]
+
+class BatchResponse(BaseModel):
+    results: List[BatchOperationResult]
@@ -0,0 +1,43 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from datetime import date, datetime
+from uuid import UUID
+
+from app.schemas.patient import AdmissionResponse
+
+# Diagnosis Code Schemas
+class DiagnosisCodeBase(BaseModel):
+    code: str = Field(..., min_length=1, max_length=20, description="Local or ICD code, e.g. A41.9")
+    description: str = Field(..., min_length=1, max_length=255)
+    synonyms: Optional[str] = Field(None, description="Alternative phrases, one per line or ';'-separated")
+    category: Optional[str] = Field(None, max_length=100)
+
+class DiagnosisCodeCreate(DiagnosisCodeBase):
+    pass
+
+class DiagnosisCodeResponse(DiagnosisCodeBase):
+    id: UUID
+    created_at: datetime
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+# Diagnosis Search Schemas
+class DiagnosisMonthCount(BaseModel):
+    month: date
+    admissions: int
+
+class DiagnosisSearchResult(BaseModel):
+    q: Optional[str]
+    code: Optional[str]
+    # Normalized term lists searched: any phrase of the code, and the q phrase
+    phrases: List[List[str]]
+    total: int
+    by_month: List[DiagnosisMonthCount]
+    admissions: List[AdmissionResponse]
+
+class DiagnosisIndexRebuildResult(BaseModel):
+    admissions: int
+    postings: int
+    elapsed_ms: float
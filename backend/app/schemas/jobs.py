@@ -0,0 +1,35 @@
+from pydantic import BaseModel
+from typing import Optional, Dict, Any
+from datetime import datetime
+from uuid import UUID
+
+from app.models.jobs import JobRunStatus
+
+class JobRunResponse(BaseModel):
+    id: UUID
+    job_name: str
+    owner: str
+    scheduled_for: datetime
+    started_at: datetime
+    finished_at: Optional[datetime]
+    duration_ms: Optional[float]
+    status: JobRunStatus
+    result: Optional[Dict[str, Any]]
+    error: Optional[str]
+    
+    class Config:
+        from_attributes = True
+
+class JobStatus(BaseModel):
+    name: str
+    schedule: str
+    description: str
+    next_run: Optional[datetime]
+    running_here: bool
+    lease_owner: Optional[str]
+    lease_expires_at: Optional[datetime]
+    runs: int
+    failures: int
+    average_duration_ms: Optional[float]
+    max_duration_ms: Optional[float]
+    last_run: Optional[JobRunResponse]
@@ -5,6 +5,7 @@ from uuid import UUID
 from enum import Enum
 
 from app.models.patient import Gender, AdmissionType, DischargeStatus
+from app.schemas.outcome import PatientOutcomeResponse, ReadmissionResponse, SatisfactionScoreResponse
 
 # Patient Schemas
 class PatientBase(BaseModel):
@@ -95,5 +96,12 @@ class DischargeResponse(DischargeBase):
     class Config:
         from_attributes = True
 
+# Patient Timeline Schemas
+class AdmissionTimelineEntry(AdmissionResponse):
+    discharge: Optional[DischargeResponse] = None
 
-
+class PatientTimelineResponse(PatientResponse):
+    admissions: List[AdmissionTimelineEntry]
+    outcomes: List[PatientOutcomeResponse]
+    readmissions: List[ReadmissionResponse]
+    satisfaction_scores: List[SatisfactionScoreResponse]
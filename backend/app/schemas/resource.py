@@ -1,11 +1,11 @@
 from pydantic import BaseModel, Field, EmailStr
-from typing import Optional
+from typing import List, Optional
 from datetime import date, datetime
 from uuid import UUID
 from enum import Enum
 from decimal import Decimal
 
-from app.models.resource import BedStatus, StaffRole, EquipmentStatus, DepartmentType
+from app.models.resource import BedStatus, StaffRole, EquipmentStatus, DepartmentType, ShiftType
 
 # Department Schemas
 class DepartmentBase(BaseModel):
@@ -151,5 +151,59 @@ class EquipmentResponse(EquipmentBase):
     class Config:
         from_attributes = True
 
+# Maintenance Plan Schemas
+class MaintenancePlanItem(BaseModel):
+    equipment_id: UUID
+    equipment_code: str
+    name: str
+    department_id: UUID
+    status: EquipmentStatus
+    daily_usage_hours: Optional[float]
+    projected_exhaustion_date: Optional[date]
+    next_maintenance_due: Optional[date]
+    due_date: date
+    reason: str = Field(..., description="out_of_order, usage or calendar")
+    scheduled_date: date
+    slack_days: int
+    at_risk: bool
+
+class MaintenancePlan(BaseModel):
+    generated_at: datetime
+    capacity_per_day: int
+    lead_days: int
+    horizon_days: int
+    items: List[MaintenancePlanItem]
+    at_risk: List[MaintenancePlanItem]
+
+# Rostering Schemas
+class ShiftAssignmentResponse(BaseModel):
+    id: UUID
+    staff_id: UUID
+    department_id: UUID
+    shift_date: date
+    shift: ShiftType
+    role: StaffRole
+    
+    class Config:
+        from_attributes = True
 
-
+class CoverageGap(BaseModel):
+    department_id: UUID
+    shift_date: date
+    shift: ShiftType
+    role: StaffRole
+    required: int
+    assigned: int
+
+class RosterResult(BaseModel):
+    start_date: date
+    end_date: date
+    departments: int
+    staff: int
+    required_shifts: int
+    assigned_shifts: int
+    repaired_gaps: int
+    coverage_rate: float
+    staff_utilization: float = Field(..., description="Assigned shifts as a percentage of the weekly shift cap")
+    elapsed_ms: float
+    gaps: List[CoverageGap]
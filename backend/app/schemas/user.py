@@ -51,6 +51,10 @@ class TokenData(BaseModel):
     username: Optional[str] = None
     user_id: Optional[UUID] = None
     role: Optional[UserRole] = None
+    jti: Optional[str] = None
+    issued_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    tenant: Optional[str] = None
 
 # Password Change Schema
 class PasswordChange(BaseModel):
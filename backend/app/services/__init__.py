@@ -0,0 +1,2 @@
+# Domain services
+
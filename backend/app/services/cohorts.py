@@ -0,0 +1,438 @@
+"""
+Cohort analytics over admissions: readmission, mortality, length of stay and
+satisfaction per cohort.
+
+Admissions are grouped by any combination of admission month, department,
+admission type and primary diagnosis. For every cohort the engine returns
+three daily curves up to `horizon_days`, all Kaplan-Meier estimates so recent
+admissions count for the days they have been observed:
+
+  * readmission: share of live discharges readmitted within d days. A
+    readmission is the patient's next admission, or a recorded readmission,
+    whichever is sooner.
+  * mortality: share of admissions ending in death within d days of
+    admission. Deaths come from discharges with status deceased and from
+    deceased outcomes.
+  * in hospital: share of admissions still in hospital after d days.
+
+The satisfaction distribution comes from surveys linked to the admission.
+A survey without an admission counts toward the patient's latest admission
+on or before the survey date, and deceased outcomes without an admission are
+matched the same way.
+
+Each tenant has one `CohortEngine`. It fetches the needed columns of every
+admission, discharge, outcome, readmission and survey once, as numpy arrays.
+Each cohort grid is then one vectorised pass over them. Results are cached
+per cohort definition under the version of the data they were computed from.
+At most every COHORT_CACHE_REFRESH_SECONDS the engine compares a row count
+and max(updated_at) fingerprint of the source tables. On a change it reloads
+the columns in a background thread. The previous version keeps answering
+until the reload finishes, then the new version replaces it. Only a worker's
+first request waits for a load.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import String, and_, func, select, type_coerce
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database import tenant_registry
+from app.models.outcome import OutcomeType, PatientOutcome, Readmission, SatisfactionScore
+from app.models.patient import Admission, AdmissionType, Discharge, DischargeStatus
+
+DIMENSIONS = ("month", "department", "admission_type", "diagnosis")
+DEFAULT_MONTHS = 36
+SOURCE_TABLES = (Admission, Discharge, PatientOutcome, Readmission, SatisfactionScore)
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class CohortDefinition:
+    group_by: Tuple[str, ...]
+    start: date
+    end: date
+    horizon_days: int
+    department_id: Optional[UUID] = None
+    admission_type: Optional[AdmissionType] = None
+
+def normalize_diagnosis(text: Optional[str]) -> Optional[str]:
+    normalized = " ".join((text or "").split()).casefold()
+    return normalized or None
+
+def _key(column):
+    # Ids are only matched against each other: skip building a UUID object per row
+    return type_coerce(column, String)
+
+def _month_code(day: date) -> int:
+    return day.year * 12 + day.month - 1
+
+def _latest_admission(keys: np.ndarray, order: np.ndarray, patients: np.ndarray, days: np.ndarray) -> np.ndarray:
+    """Index of each (patient, day)'s latest admission on or before day, or -1"""
+    found = np.searchsorted(keys, (patients << 20) | days, side="right") - 1
+    matched = found >= 0
+    matched[matched] = (keys[found[matched]] >> 20) == patients[matched]
+    return np.where(matched, order[np.maximum(found, 0)], -1)
+
+def kaplan_meier(cohorts: np.ndarray, times: np.ndarray, events: np.ndarray, cohort_count: int,
+                 horizon: int) -> np.ndarray:
+    """Survival S(d), d = 0..horizon, per cohort: share with no event by the end of day d"""
+    clipped = np.minimum(times, horizon + 1)
+    width = horizon + 2
+    totals = np.bincount(cohorts * width + clipped, minlength=cohort_count * width).reshape(cohort_count, width)
+    hits = np.bincount(cohorts[events] * width + clipped[events],
+                       minlength=cohort_count * width).reshape(cohort_count, width)
+    # At risk on day d: everyone whose event or censoring is on day d or later
+    at_risk = np.cumsum(totals[:, ::-1], axis=1)[:, ::-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factors = np.where(at_risk > 0, 1 - hits / np.maximum(at_risk, 1), 1.0)
+    return np.cumprod(factors[:, :horizon + 1], axis=1)
+
+class CohortFrame:
+    """Columns of every live admission, with outcomes resolved to admission indexes"""
+
+    def __init__(self, db: Session):
+        rows = db.execute(
+            select(_key(Admission.id), _key(Admission.patient_id), Admission.admission_date,
+                   _key(Admission.department_id), Admission.admission_type, Admission.primary_diagnosis,
+                   Discharge.discharge_date, Discharge.length_of_stay, Discharge.discharge_status)
+            .outerjoin(Discharge, and_(Discharge.admission_id == Admission.id, Discharge.is_deleted == 0))
+            .where(Admission.is_deleted == 0)
+        ).all()
+        count = len(rows)
+        index = {row[0]: position for position, row in enumerate(rows)}
+
+        # Dense codes in order of first appearance
+        patient_codes: Dict[str, int] = {}
+        department_codes: Dict[str, int] = {}
+        diagnosis_codes: Dict[Optional[str], int] = {None: 0}
+        self.admission_types = list(AdmissionType)
+        type_codes = {admission_type: code for code, admission_type in enumerate(self.admission_types)}
+
+        self.patient = np.fromiter((patient_codes.setdefault(row[1], len(patient_codes)) for row in rows),
+                                   dtype=np.int64, count=count)
+        self.admitted = np.fromiter((row[2].toordinal() for row in rows), dtype=np.int64, count=count)
+        self.month = np.fromiter((_month_code(row[2]) for row in rows), dtype=np.int64, count=count)
+        self.department = np.fromiter((department_codes.setdefault(row[3], len(department_codes)) for row in rows),
+                                      dtype=np.int64, count=count)
+        self.admission_type = np.fromiter((type_codes[row[4]] for row in rows), dtype=np.int64, count=count)
+        self.diagnosis = np.fromiter(
+            (diagnosis_codes.setdefault(normalize_diagnosis(row[5]), len(diagnosis_codes)) for row in rows),
+            dtype=np.int64, count=count
+        )
+        self.departments: List[UUID] = [UUID(str(key)) for key in department_codes]
+        self.diagnoses: List[Optional[str]] = list(diagnosis_codes)
+        self.discharged = np.fromiter((row[6].toordinal() if row[6] else -1 for row in rows),
+                                      dtype=np.int64, count=count)
+        self.length_of_stay = np.fromiter((row[7] if row[7] is not None else -1 for row in rows),
+                                          dtype=np.int64, count=count)
+        died_in_hospital = np.fromiter((row[8] == DischargeStatus.DECEASED for row in rows), dtype=bool, count=count)
+
+        # Admissions sorted by (patient, admission day) for next-admission and latest-admission lookups
+        order = np.lexsort((self.admitted, self.patient))
+        keys = (self.patient[order] << 20) | self.admitted[order]
+
+        # Days from discharge to readmission: the patient's next admission...
+        never = np.iinfo(np.int64).max
+        self.readmitted_after = np.full(count, never, dtype=np.int64)
+        if count > 1:
+            same_patient = self.patient[order][1:] == self.patient[order][:-1]
+            current, following = order[:-1][same_patient], order[1:][same_patient]
+            gap = self.admitted[following] - self.discharged[current]
+            valid = (self.discharged[current] >= 0) & (gap >= 0)
+            self.readmitted_after[current[valid]] = gap[valid]
+        # ...or a recorded readmission, whichever is sooner
+        recorded = db.execute(
+            select(_key(Readmission.original_admission_id), Readmission.days_since_discharge)
+            .where(Readmission.is_deleted == 0)
+        ).all()
+        positions = np.array([index.get(row[0], -1) for row in recorded], dtype=np.int64)
+        gaps = np.array([row[1] for row in recorded], dtype=np.int64)
+        known = positions >= 0
+        np.minimum.at(self.readmitted_after, positions[known], gaps[known])
+
+        # Days from admission to death: in-hospital deaths and deceased outcomes
+        self.died_after = np.where(died_in_hospital, np.maximum(self.length_of_stay, 0), never)
+        deaths = db.execute(
+            select(_key(PatientOutcome.admission_id), _key(PatientOutcome.patient_id), PatientOutcome.outcome_date)
+            .where(PatientOutcome.is_deleted == 0, PatientOutcome.outcome_type == OutcomeType.DECEASED)
+        ).all()
+        positions = self._resolve(deaths, index, patient_codes, keys, order)
+        death_days = np.array([row[2].toordinal() for row in deaths], dtype=np.int64)
+        known = positions >= 0
+        np.minimum.at(self.died_after, positions[known],
+                      np.maximum(death_days[known] - self.admitted[positions[known]], 0))
+
+        surveys = db.execute(
+            select(_key(SatisfactionScore.admission_id), _key(SatisfactionScore.patient_id),
+                   SatisfactionScore.survey_date, SatisfactionScore.overall_satisfaction)
+            .where(SatisfactionScore.is_deleted == 0)
+        ).all()
+        positions = self._resolve(surveys, index, patient_codes, keys, order)
+        ratings = np.array([row[3] for row in surveys], dtype=np.int64)
+        known = (positions >= 0) & (ratings >= 1) & (ratings <= 5)
+        self.survey_admission = positions[known]
+        self.survey_rating = ratings[known]
+
+    @staticmethod
+    def _resolve(rows: Sequence, index: Dict[str, int], patient_codes: Dict[str, int],
+                 keys: np.ndarray, order: np.ndarray) -> np.ndarray:
+        """Admission index of (admission_id, patient_id, day, ...) rows, -1 where none matches"""
+        positions = np.array([index.get(row[0], -1) if row[0] else -1 for row in rows], dtype=np.int64)
+        unlinked = np.flatnonzero(positions < 0)
+        if len(unlinked) and len(keys):
+            patients = np.array([patient_codes.get(rows[i][1], -1) for i in unlinked], dtype=np.int64)
+            days = np.array([rows[i][2].toordinal() for i in unlinked], dtype=np.int64)
+            found = _latest_admission(keys, order, np.maximum(patients, 0), days)
+            positions[unlinked] = np.where(patients >= 0, found, -1)
+        return positions
+
+    def _dimension(self, name: str) -> Tuple[np.ndarray, int]:
+        if name == "month":
+            return self.month, 0
+        if name == "department":
+            return self.department, len(self.departments)
+        if name == "admission_type":
+            return self.admission_type, len(self.admission_types)
+        return self.diagnosis, len(self.diagnoses)
+
+    def _label(self, name: str, value: int):
+        if name == "month":
+            return date(value // 12, value % 12 + 1, 1)
+        if name == "department":
+            return self.departments[value]
+        if name == "admission_type":
+            return self.admission_types[value]
+        return self.diagnoses[value] or "unspecified"
+
+    def cohorts(self, definition: CohortDefinition, today: date) -> List[dict]:
+        selected = (self.admitted >= definition.start.toordinal()) & (self.admitted <= definition.end.toordinal())
+        if definition.department_id is not None:
+            if definition.department_id not in self.departments:
+                return []
+            selected &= self.department == self.departments.index(definition.department_id)
+        if definition.admission_type is not None:
+            selected &= self.admission_type == self.admission_types.index(definition.admission_type)
+        rows = np.flatnonzero(selected)
+        if not len(rows):
+            return []
+
+        # Mixed-radix key over the grouped dimensions, then dense cohort numbers
+        key = np.zeros(len(rows), dtype=np.int64)
+        for name in definition.group_by:
+            values, size = self._dimension(name)
+            values = values[rows]
+            if name == "month":
+                values = values - values.min()
+                size = int(values.max()) + 1
+            key = key * size + values
+        keys, cohort = np.unique(key, return_inverse=True)
+        cohort = cohort.reshape(-1)
+        cohort_count = len(keys)
+        horizon = definition.horizon_days
+        now = today.toordinal()
+
+        admitted = self.admitted[rows]
+        discharged = self.discharged[rows]
+        is_discharged = discharged >= 0
+        observed_since_admission = np.maximum(now - admitted, 0)
+
+        admissions = np.bincount(cohort, minlength=cohort_count)
+        discharges = np.bincount(cohort[is_discharged], minlength=cohort_count)
+
+        # Readmission: live discharges, censored today
+        died = self.died_after[rows]
+        live = is_discharged & ~((died < np.iinfo(np.int64).max) & (died <= self.length_of_stay[rows]))
+        readmitted_after = self.readmitted_after[rows][live]
+        observed = np.maximum(now - discharged[live], 0)
+        readmitted = readmitted_after <= observed
+        readmission = 1 - kaplan_meier(cohort[live], np.where(readmitted, readmitted_after, observed),
+                                       readmitted, cohort_count, horizon)
+
+        # Mortality from admission, censored today
+        dead = died <= observed_since_admission
+        mortality = 1 - kaplan_meier(cohort, np.where(dead, died, observed_since_admission), dead,
+                                     cohort_count, horizon)
+
+        # Still in hospital: the stay ends at discharge, current inpatients are censored today
+        stays = np.where(is_discharged, np.maximum(self.length_of_stay[rows], 0), observed_since_admission)
+        in_hospital = kaplan_meier(cohort, stays, is_discharged, cohort_count, horizon)
+
+        los_total = np.bincount(cohort[is_discharged], weights=stays[is_discharged], minlength=cohort_count)
+        medians = np.full(cohort_count, np.nan)
+        if is_discharged.any():
+            discharged_cohorts, discharged_stays = cohort[is_discharged], stays[is_discharged]
+            ordered = np.lexsort((discharged_stays, discharged_cohorts))
+            sorted_stays = discharged_stays[ordered]
+            starts = np.concatenate([[0], np.cumsum(discharges)[:-1]])
+            has = discharges > 0
+            low = starts[has] + (discharges[has] - 1) // 2
+            high = starts[has] + discharges[has] // 2
+            medians[has] = (sorted_stays[low] + sorted_stays[high]) / 2
+
+        # Satisfaction: surveys of the selected admissions
+        position = np.full(len(self.admitted), -1, dtype=np.int64)
+        position[rows] = np.arange(len(rows))
+        survey_rows = position[self.survey_admission]
+        in_selection = survey_rows >= 0
+        survey_cohorts = cohort[survey_rows[in_selection]]
+        ratings = self.survey_rating[in_selection]
+        distribution = np.bincount(survey_cohorts * 5 + ratings - 1, minlength=cohort_count * 5).reshape(cohort_count, 5)
+        responses = distribution.sum(axis=1)
+        rating_sums = distribution @ np.arange(1, 6)
+
+        # Decode each cohort's key back into its dimension values
+        labels = {name: None for name in DIMENSIONS}
+        decoded = []
+        remaining = keys.copy()
+        for name in reversed(definition.group_by):
+            values, size = self._dimension(name)
+            offset = 0
+            if name == "month":
+                selected_months = values[rows]
+                offset = int(selected_months.min())
+                size = int(selected_months.max()) - offset + 1
+            decoded.append((name, remaining % size + offset))
+            remaining = remaining // size
+
+        results = []
+        for position_in_grid in range(cohort_count):
+            cohort_labels = dict(labels)
+            for name, values in decoded:
+                cohort_labels[name] = self._label(name, int(values[position_in_grid]))
+            discharged_count = int(discharges[position_in_grid])
+            response_count = int(responses[position_in_grid])
+            results.append({
+                "month": cohort_labels["month"],
+                "department_id": cohort_labels["department"],
+                "admission_type": cohort_labels["admission_type"],
+                "diagnosis": cohort_labels["diagnosis"],
+                "admissions": int(admissions[position_in_grid]),
+                "discharges": discharged_count,
+                "readmission_rate": round(float(readmission[position_in_grid, -1]) * 100, 2),
+                "mortality_rate": round(float(mortality[position_in_grid, -1]) * 100, 2),
+                "average_length_of_stay": round(float(los_total[position_in_grid]) / discharged_count, 2)
+                if discharged_count else None,
+                "median_length_of_stay": float(medians[position_in_grid]) if discharged_count else None,
+                "satisfaction_score": round(float(rating_sums[position_in_grid]) / response_count, 2)
+                if response_count else None,
+                "satisfaction_responses": response_count,
+                "satisfaction_distribution": distribution[position_in_grid].tolist(),
+                "readmission_curve": np.round(readmission[position_in_grid] * 100, 2).tolist(),
+                "mortality_curve": np.round(mortality[position_in_grid] * 100, 2).tolist(),
+                "in_hospital_curve": np.round(in_hospital[position_in_grid] * 100, 2).tolist(),
+            })
+        return results
+
+class CohortEngine:
+    """Per-tenant column store and versioned result cache"""
+
+    def __init__(self, tenant: str, cache_size: int, refresh_seconds: float):
+        self.tenant = tenant
+        self.cache_size = cache_size
+        self.refresh_seconds = refresh_seconds
+        self.version = 0
+        self._frame: Optional[CohortFrame] = None
+        self._fingerprint = None
+        self._checked_at = 0.0
+        self._reloading = False
+        self._results: "OrderedDict[tuple, List[dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(db: Session) -> tuple:
+        columns = []
+        for model in SOURCE_TABLES:
+            columns += [select(func.count()).select_from(model).scalar_subquery(),
+                        select(func.max(model.updated_at)).scalar_subquery()]
+        return tuple(db.execute(select(*columns)).one())
+
+    def _install(self, frame: CohortFrame, fingerprint: tuple):
+        with self._lock:
+            self._frame = frame
+            self._fingerprint = fingerprint
+            self.version += 1
+            self._results.clear()
+            self._reloading = False
+
+    def _reload(self, fingerprint: tuple):
+        db = tenant_registry.read_session(self.tenant)
+        try:
+            frame = CohortFrame(db)
+        except Exception:
+            logger.exception("Reloading cohort columns for tenant %s failed", self.tenant)
+            with self._lock:
+                self._reloading = False
+                # Retry at the next check
+                self._checked_at = 0.0
+            return
+        finally:
+            db.close()
+        self._install(frame, fingerprint)
+
+    def _current_frame(self, db: Session) -> Tuple[CohortFrame, int]:
+        if self._frame is None:
+            # First use blocks; concurrent first requests wait for one load
+            with self._load_lock:
+                if self._frame is None:
+                    fingerprint = self.fingerprint(db)
+                    self._install(CohortFrame(db), fingerprint)
+                    self._checked_at = time.monotonic()
+
+        with self._lock:
+            due = time.monotonic() - self._checked_at >= self.refresh_seconds and not self._reloading
+            if due:
+                self._checked_at = time.monotonic()
+        if due:
+            fingerprint = self.fingerprint(db)
+            with self._lock:
+                if fingerprint != self._fingerprint and not self._reloading:
+                    # Keep serving the current version while the new one loads
+                    self._reloading = True
+                    threading.Thread(target=self._reload, args=(fingerprint,), daemon=True).start()
+        with self._lock:
+            return self._frame, self.version
+
+    def cohorts(self, db: Session, definition: CohortDefinition) -> Tuple[List[dict], int, bool]:
+        """Cohort results for a definition, with the data version and whether they came from the cache"""
+        today = date.today()
+        frame, version = self._current_frame(db)
+        # Curves are censored at today, so results are per day as well
+        key = (version, today, definition)
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None:
+                self._results.move_to_end(key)
+                return cached, version, True
+
+        results = frame.cohorts(definition, today)
+        with self._lock:
+            if version == self.version:
+                self._results[key] = results
+                while len(self._results) > self.cache_size:
+                    self._results.popitem(last=False)
+        return results, version, False
+
+_tenant_engines: Dict[str, CohortEngine] = {}
+_tenant_engines_lock = threading.Lock()
+
+def cohort_engine_for(tenant: Optional[str]) -> CohortEngine:
+    tenant = tenant or settings.DEFAULT_TENANT
+    engine = _tenant_engines.get(tenant)
+    if engine is None:
+        with _tenant_engines_lock:
+            engine = _tenant_engines.setdefault(tenant, CohortEngine(
+                tenant=tenant,
+                cache_size=settings.COHORT_CACHE_SIZE,
+                refresh_seconds=settings.COHORT_CACHE_REFRESH_SECONDS
+            ))
+    return engine
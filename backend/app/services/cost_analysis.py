@@ -0,0 +1,423 @@
+"""
+Department and per-admission cost analyses generated from operational data.
+
+For every department and calendar month in a range, one `cost_analyses` row
+is computed:
+
+  * facility cost: patient-days in the month x `Department.cost_per_day`. A
+    stay contributes the nights it spends inside the month. Same-day stays
+    count as one day, and stays still open run up to today.
+  * staff cost: annual `Staff.salary` of active staff, prorated by the days of
+    the month they were employed.
+  * equipment cost: `Equipment.maintenance_cost`, read as an annual figure and
+    prorated the same way from the purchase date.
+  * revenue: `Discharge` insurance coverage and patient payments, falling
+    back to `total_cost` when neither is recorded. Revenue is booked to the
+    discharge month and the admitting department.
+
+Each source table is read once. Admissions come pre-grouped by department,
+admission date and discharge date, because stays that share those values are
+attributed identically. The per-month attribution then runs as numpy array
+operations over all rows at once, one pass per month, instead of a query per
+department and month. Months that are still running accrue costs only up to
+today.
+
+`generate_admission_costs` breaks the same costs down per stay, writing rows
+with `admission_id` set; see its docstring. Department-level readers must
+filter those rows out (`admission_id IS NULL`) so costs are not counted twice.
+
+Generated rows get deterministic ids (uuid5 of department and month, or of the
+admission), so regenerating a range replaces them in place and leaves manually
+entered analyses alone.
+"""
+
+import time
+import uuid
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import and_, case, delete, func, insert, or_, select
+from sqlalchemy.engine import Connection
+
+from app.models.analytics import CostAnalysis
+from app.models.patient import Admission, Discharge
+from app.models.resource import Department, Equipment, Staff
+
+# Namespace for the ids of generated rows
+COST_ANALYSIS_NAMESPACE = uuid.UUID("6f1d3c1e-5a0b-4f2e-9c7d-2b8e4a9f0c31")
+# Admissions costed per round-trip when generating per-admission analyses
+ADMISSION_COST_CHUNK_SIZE = 50000
+
+# Revenue of a discharge: coverage plus payments, or the billed total when neither is recorded
+DISCHARGE_REVENUE = case(
+    (and_(Discharge.insurance_coverage.is_(None), Discharge.patient_payment.is_(None)),
+     func.coalesce(Discharge.total_cost, 0)),
+    else_=func.coalesce(Discharge.insurance_coverage, 0) + func.coalesce(Discharge.patient_payment, 0)
+)
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+def next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+def months_between(start: date, end: date) -> List[Tuple[date, date]]:
+    """(first day, last day) of every calendar month touching [start, end]"""
+    months = []
+    month = month_start(start)
+    while month <= end:
+        following = next_month(month)
+        months.append((month, following - timedelta(days=1)))
+        month = following
+    return months
+
+def generated_id(department_id, period_start: date) -> UUID:
+    return uuid.uuid5(COST_ANALYSIS_NAMESPACE, f"{department_id}:{period_start.isoformat()}")
+
+def _ordinals(values) -> np.ndarray:
+    """Dates as day numbers; missing dates become NaN"""
+    return np.array([value.toordinal() if value is not None else np.nan for value in values], dtype=float)
+
+def _amounts(values) -> np.ndarray:
+    return np.array([float(value) if value is not None else np.nan for value in values], dtype=float)
+
+def _overlap_days(start: np.ndarray, end: np.ndarray, window_start: int, window_end: int) -> np.ndarray:
+    """Days of [start, end) inside [window_start, window_end)"""
+    return np.clip(np.minimum(end, window_end) - np.maximum(start, window_start), 0, None)
+
+def stay_end_days(admitted: np.ndarray, discharged: np.ndarray, open_end: int) -> np.ndarray:
+    """Exclusive end day of each stay: open stays run through today, same-day stays count as one day"""
+    return np.maximum(np.where(np.isnan(discharged), open_end, discharged), admitted + 1)
+
+def _profit_margin(revenue: np.ndarray, cost: np.ndarray) -> np.ndarray:
+    """Margin percentage, clipped to the column's -100..100 range; 0 without revenue"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        margin = np.where(revenue > 0, (revenue - cost) / revenue * 100, 0)
+    return np.clip(margin, -100, 100)
+
+def generate_cost_analyses(conn: Connection, start: date, end: date, department_id: Optional[UUID] = None,
+                           today: Optional[date] = None) -> dict:
+    """Compute and write monthly analyses for every department (or one) in the months touching [start, end]"""
+    started = time.perf_counter()
+    today = today or date.today()
+    months = months_between(start, end)
+    range_start, range_end = months[0][0], months[-1][1]
+
+    department_filter = [Department.is_deleted == 0]
+    if department_id:
+        department_filter.append(Department.id == department_id)
+    departments = conn.execute(select(Department.id, Department.cost_per_day).where(*department_filter)).all()
+    if not departments:
+        return {"departments": 0, "months": len(months), "rows": 0, "elapsed_ms": 0.0}
+    department_index = {row.id: index for index, row in enumerate(departments)}
+    cost_per_day = _amounts(row.cost_per_day for row in departments)
+    cost_per_day = np.nan_to_num(cost_per_day)
+    n_departments = len(departments)
+
+    def department_positions(ids) -> np.ndarray:
+        return np.array([department_index.get(value, -1) for value in ids], dtype=np.int64)
+
+    # Stays overlapping the range, grouped by department and dates. Stays that share
+    # them are attributed identically, so the database collapses them first
+    stays = conn.execute(
+        select(
+            Admission.department_id, Admission.admission_date, Discharge.discharge_date,
+            func.count(), func.sum(Discharge.length_of_stay), func.sum(Discharge.insurance_coverage),
+            func.sum(Discharge.patient_payment), func.sum(DISCHARGE_REVENUE)
+        )
+        .select_from(Admission)
+        .outerjoin(Discharge, and_(Discharge.admission_id == Admission.id, Discharge.is_deleted == 0))
+        .where(
+            Admission.is_deleted == 0,
+            Admission.admission_date <= range_end,
+            Admission.department_id.in_(list(department_index)),
+            or_(Discharge.discharge_date.is_(None), Discharge.discharge_date >= range_start)
+        )
+        .group_by(Admission.department_id, Admission.admission_date, Discharge.discharge_date)
+    ).all()
+    stay_department = department_positions(row[0] for row in stays)
+    admitted = _ordinals(row[1] for row in stays)
+    discharged = _ordinals(row[2] for row in stays)
+    stay_count = np.array([row[3] for row in stays], dtype=float)
+    is_discharged = ~np.isnan(discharged)
+    stay_end = stay_end_days(admitted, discharged, today.toordinal() + 1)
+    length_of_stay = np.nan_to_num(_amounts(row[4] for row in stays))
+    coverage = np.nan_to_num(_amounts(row[5] for row in stays))
+    payment = np.nan_to_num(_amounts(row[6] for row in stays))
+    revenue = np.nan_to_num(_amounts(row[7] for row in stays))
+
+    staff = conn.execute(
+        select(Staff.department_id, Staff.salary, Staff.hire_date)
+        .where(Staff.is_deleted == 0, Staff.is_active == True, Staff.department_id.in_(list(department_index)))
+    ).all()
+    staff_department = department_positions(row.department_id for row in staff)
+    hired = np.nan_to_num(_ordinals(row.hire_date for row in staff), nan=-np.inf)
+    daily_salary = np.nan_to_num(_amounts(row.salary for row in staff)) / 365.0
+
+    equipment = conn.execute(
+        select(Equipment.department_id, Equipment.maintenance_cost, Equipment.purchase_date)
+        .where(Equipment.is_deleted == 0, Equipment.department_id.in_(list(department_index)))
+    ).all()
+    equipment_department = department_positions(row.department_id for row in equipment)
+    purchased = np.nan_to_num(_ordinals(row.purchase_date for row in equipment), nan=-np.inf)
+    daily_maintenance = np.nan_to_num(_amounts(row.maintenance_cost for row in equipment)) / 365.0
+
+    rows = []
+    for period_start, period_end in months:
+        window_start = period_start.toordinal()
+        # Costs accrue up to today in the running month, and not at all in future months
+        window_end = min(period_end, today).toordinal() + 1
+        if window_end <= window_start:
+            continue
+
+        in_month = _overlap_days(admitted, stay_end, window_start, window_end)
+        patient_days = np.bincount(stay_department, weights=in_month * stay_count, minlength=n_departments)
+        patient_count = np.bincount(stay_department, weights=(in_month > 0) * stay_count, minlength=n_departments)
+        discharged_here = is_discharged & (discharged >= window_start) & (discharged < period_end.toordinal() + 1)
+
+        def discharge_total(values: np.ndarray) -> np.ndarray:
+            return np.bincount(stay_department, weights=np.where(discharged_here, values, 0), minlength=n_departments)
+
+        discharges = discharge_total(stay_count)
+        los_total = discharge_total(length_of_stay)
+        insurance_revenue = discharge_total(coverage)
+        patient_payments = discharge_total(payment)
+        total_revenue = discharge_total(revenue)
+
+        employed = _overlap_days(hired, np.full(hired.shape, np.inf), window_start, window_end)
+        staff_cost = np.bincount(staff_department, weights=employed * daily_salary, minlength=n_departments)
+        in_service = _overlap_days(purchased, np.full(purchased.shape, np.inf), window_start, window_end)
+        equipment_cost = np.bincount(equipment_department, weights=in_service * daily_maintenance, minlength=n_departments)
+        facility_cost = patient_days * cost_per_day
+
+        total_cost = facility_cost + staff_cost + equipment_cost
+        margin = _profit_margin(total_revenue, total_cost)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            per_patient_day = np.where(patient_days > 0, total_cost / patient_days, np.nan)
+            average_los = np.where(discharges > 0, los_total / discharges, np.nan)
+
+        for index, department in enumerate(departments):
+            rows.append({
+                "id": generated_id(department.id, period_start),
+                "analysis_date": period_end,
+                "department_id": department.id,
+                "total_cost": round(float(total_cost[index]), 2),
+                "staff_cost": round(float(staff_cost[index]), 2),
+                "equipment_cost": round(float(equipment_cost[index]), 2),
+                "facility_cost": round(float(facility_cost[index]), 2),
+                "insurance_revenue": round(float(insurance_revenue[index]), 2),
+                "patient_payment": round(float(patient_payments[index]), 2),
+                "total_revenue": round(float(total_revenue[index]), 2),
+                "profit_margin": round(float(margin[index]), 2),
+                "cost_per_patient_day": None if np.isnan(per_patient_day[index]) else round(float(per_patient_day[index]), 2),
+                "period_start": period_start,
+                "period_end": period_end,
+                "patient_count": int(patient_count[index]),
+                "average_length_of_stay": None if np.isnan(average_los[index]) else round(float(average_los[index]), 2),
+                "is_deleted": 0,
+            })
+
+    # Replace earlier generated rows for these departments and months
+    table = CostAnalysis.__table__
+    stale_ids = [generated_id(department.id, period_start) for department in departments for period_start, _ in months]
+    for offset in range(0, len(stale_ids), 500):
+        conn.execute(delete(table).where(table.c.id.in_(stale_ids[offset:offset + 500])))
+    if rows:
+        conn.execute(insert(table), rows)
+
+    return {
+        "departments": n_departments,
+        "months": len(months),
+        "rows": len(rows),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+    }
+
+def admission_cost_id(admission_id) -> UUID:
+    return uuid.uuid5(COST_ANALYSIS_NAMESPACE, f"admission:{admission_id}")
+
+def interval_day_totals(department: np.ndarray, start: np.ndarray, end: np.ndarray, weight: np.ndarray,
+                        n_departments: int, n_days: int) -> np.ndarray:
+    """Sweep of weighted [start, end) day intervals into a (department, day) total.
+
+    Every interval becomes a +weight event at its start and a -weight event at
+    its end; a running sum along the days then gives the total of intervals
+    covering each day. Indexes are days from the grid's first day and are
+    clipped to it, so intervals reaching past either edge are cut there.
+    """
+    events = np.zeros((n_departments, n_days + 1))
+    np.add.at(events, (department, np.clip(start, 0, n_days)), weight)
+    np.add.at(events, (department, np.clip(end, 0, n_days)), -weight)
+    return np.cumsum(events, axis=1)[:, :n_days]
+
+def generate_admission_costs(conn: Connection, start: date, end: date, department_id: Optional[UUID] = None,
+                             today: Optional[date] = None) -> dict:
+    """Cost every admission whose stay overlaps [start, end] and write one analysis per admission.
+
+    Stays, staff employment and equipment service are intervals of days. Each
+    department's daily staff and equipment cost is split evenly between the
+    stays in the department that day; bed-days are charged at the
+    department's `cost_per_day`. The daily pools and census are built with one
+    sweep over interval start/end events per department, and each stay's share
+    is then a difference of two prefix sums, so the whole run is linear in the
+    number of stays plus days rather than stays x days. Rows are streamed and
+    written in chunks of ADMISSION_COST_CHUNK_SIZE admissions.
+    """
+    started = time.perf_counter()
+    today = today or date.today()
+    open_end = today.toordinal() + 1
+
+    department_filter = [Department.is_deleted == 0]
+    if department_id:
+        department_filter.append(Department.id == department_id)
+    departments = conn.execute(select(Department.id, Department.cost_per_day).where(*department_filter)).all()
+    empty = {"departments": len(departments), "admissions": 0, "rows": 0, "elapsed_ms": 0.0}
+    if not departments:
+        return empty
+    department_index = {row.id: index for index, row in enumerate(departments)}
+    cost_per_day = np.nan_to_num(_amounts(row.cost_per_day for row in departments))
+    n_departments = len(departments)
+
+    def department_positions(ids) -> np.ndarray:
+        return np.array([department_index.get(value, -1) for value in ids], dtype=np.int64)
+
+    def overlapping(first: date, last: date) -> list:
+        return [
+            Admission.is_deleted == 0,
+            Admission.admission_date <= last,
+            Admission.department_id.in_(list(department_index)),
+            or_(Discharge.discharge_date.is_(None), Discharge.discharge_date >= first)
+        ]
+
+    def with_discharge(query):
+        return query.select_from(Admission).outerjoin(
+            Discharge, and_(Discharge.admission_id == Admission.id, Discharge.is_deleted == 0)
+        )
+
+    # Days the costed stays span; the grid covers them whole, not just [start, end]
+    first_admitted, last_admitted, last_discharged, targets, discharged_targets = conn.execute(
+        with_discharge(select(
+            func.min(Admission.admission_date), func.max(Admission.admission_date), func.max(Discharge.discharge_date),
+            func.count(), func.count(Discharge.discharge_date)
+        )).where(*overlapping(start, end))
+    ).one()
+    if not targets:
+        return empty
+    grid_start = first_admitted.toordinal()
+    grid_end = max(last_admitted.toordinal() + 1, last_discharged.toordinal() if last_discharged else 0,
+                   open_end if discharged_targets < targets else 0)
+    n_days = grid_end - grid_start
+    grid_first, grid_last = date.fromordinal(grid_start), date.fromordinal(grid_end - 1)
+
+    # Census: stays in each department on each day of the grid, from stays grouped by dates
+    census_rows = conn.execute(
+        with_discharge(select(Admission.department_id, Admission.admission_date, Discharge.discharge_date, func.count()))
+        .where(*overlapping(grid_first, grid_last))
+        .group_by(Admission.department_id, Admission.admission_date, Discharge.discharge_date)
+    ).all()
+    census_admitted = _ordinals(row[1] for row in census_rows)
+    census_end = stay_end_days(census_admitted, _ordinals(row[2] for row in census_rows), open_end)
+    census = interval_day_totals(
+        department_positions(row[0] for row in census_rows),
+        (census_admitted - grid_start).astype(np.int64), (census_end - grid_start).astype(np.int64),
+        np.array([row[3] for row in census_rows], dtype=float), n_departments, n_days
+    )
+
+    # Daily staff and equipment cost pools; employment and service run from hire/purchase onwards
+    staff = conn.execute(
+        select(Staff.department_id, Staff.salary, Staff.hire_date)
+        .where(Staff.is_deleted == 0, Staff.is_active == True, Staff.department_id.in_(list(department_index)))
+    ).all()
+    equipment = conn.execute(
+        select(Equipment.department_id, Equipment.maintenance_cost, Equipment.purchase_date)
+        .where(Equipment.is_deleted == 0, Equipment.department_id.in_(list(department_index)))
+    ).all()
+
+    def cost_pool(rows) -> np.ndarray:
+        began = np.nan_to_num(_ordinals(row[2] for row in rows), nan=grid_start) - grid_start
+        return interval_day_totals(
+            department_positions(row[0] for row in rows), began.astype(np.int64),
+            np.full(len(rows), n_days, dtype=np.int64),
+            np.nan_to_num(_amounts(row[1] for row in rows)) / 365.0, n_departments, n_days
+        )
+
+    # Per-stay share of each day, accumulated so a stay's total is prefix[end] - prefix[start]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        staff_share = np.where(census > 0, cost_pool(staff) / census, 0)
+        equipment_share = np.where(census > 0, cost_pool(equipment) / census, 0)
+    zero_column = np.zeros((n_departments, 1))
+    staff_prefix = np.hstack([zero_column, np.cumsum(staff_share, axis=1)])
+    equipment_prefix = np.hstack([zero_column, np.cumsum(equipment_share, axis=1)])
+
+    table = CostAnalysis.__table__
+    stays = conn.execution_options(stream_results=True, yield_per=ADMISSION_COST_CHUNK_SIZE).execute(
+        with_discharge(select(
+            Admission.id, Admission.department_id, Admission.admission_date, Discharge.discharge_date,
+            Discharge.length_of_stay, Discharge.insurance_coverage, Discharge.patient_payment, DISCHARGE_REVENUE
+        )).where(*overlapping(start, end))
+    )
+    admissions = written = 0
+    for chunk in stays.partitions():
+        admissions += len(chunk)
+        department = department_positions(row[1] for row in chunk)
+        admitted = _ordinals(row[2] for row in chunk)
+        discharged = _ordinals(row[3] for row in chunk)
+        stay_end = stay_end_days(admitted, discharged, open_end)
+        first, last = (admitted - grid_start).astype(np.int64), (stay_end - grid_start).astype(np.int64)
+
+        days = stay_end - admitted
+        staff_cost = np.round(staff_prefix[department, last] - staff_prefix[department, first], 2)
+        equipment_cost = np.round(equipment_prefix[department, last] - equipment_prefix[department, first], 2)
+        facility_cost = np.round(days * cost_per_day[department], 2)
+        total_cost = staff_cost + equipment_cost + facility_cost
+        coverage = np.round(_amounts(row[5] for row in chunk), 2)
+        payment = np.round(_amounts(row[6] for row in chunk), 2)
+        revenue = np.round(_amounts(row[7] for row in chunk), 2)
+        margin = np.round(_profit_margin(np.nan_to_num(revenue), total_cost), 2)
+        per_day = np.round(total_cost / days, 2)
+        length_of_stay = np.where(np.isnan(discharged), days, _amounts(row[4] for row in chunk))
+
+        is_discharged = ~np.isnan(discharged)
+        columns = zip(
+            chunk, total_cost.tolist(), staff_cost.tolist(), equipment_cost.tolist(), facility_cost.tolist(),
+            coverage.tolist(), payment.tolist(), revenue.tolist(), margin.tolist(), per_day.tolist(),
+            length_of_stay.tolist(), is_discharged.tolist()
+        )
+        rows = [
+            {
+                "id": admission_cost_id(row[0]),
+                "analysis_date": today,
+                "department_id": row[1],
+                "admission_id": row[0],
+                "total_cost": total,
+                "staff_cost": staff_total,
+                "equipment_cost": equipment_total,
+                "facility_cost": facility_total,
+                "insurance_revenue": None if np.isnan(covered) else covered,
+                "patient_payment": None if np.isnan(paid) else paid,
+                "total_revenue": earned if done else None,
+                "profit_margin": margin_value if done else None,
+                "cost_per_patient_day": day_cost,
+                "period_start": row[2],
+                "period_end": row[3] if done else today,
+                "patient_count": 1,
+                "average_length_of_stay": None if np.isnan(stay_length) else stay_length,
+                "is_deleted": 0,
+            }
+            for (row, total, staff_total, equipment_total, facility_total, covered, paid, earned, margin_value,
+                 day_cost, stay_length, done) in columns
+        ]
+        # Replace earlier analyses of these admissions
+        ids = [values["id"] for values in rows]
+        for offset in range(0, len(ids), 500):
+            conn.execute(delete(table).where(table.c.id.in_(ids[offset:offset + 500])))
+        conn.execute(insert(table), rows)
+        written += len(rows)
+
+    return {
+        "departments": n_departments,
+        "admissions": admissions,
+        "rows": written,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+    }
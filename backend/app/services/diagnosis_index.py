@@ -0,0 +1,193 @@
+"""
+Inverted index over the free-text diagnosis fields.
+
+`Admission.primary_diagnosis`, `Admission.secondary_diagnoses` and
+`Discharge.discharge_diagnosis` are tokenized into normalized terms. The
+tokenizer case-folds, strips accents, splits on punctuation and drops filler
+words. ICD-style codes in the text become `code:` terms, for the full code and
+its three-character category, so "A41.9" is found by "A41" too. Each distinct
+term of each field is one `diagnosis_postings` row. The row also carries the
+admission's date and department, so date and department filters never leave
+the postings. Postings are written in the same transaction as the admission or
+discharge.
+
+A search phrase matches an admission when all of its terms occur in the same
+field. Searching by a code from the local `diagnosis_codes` table expands to
+the literal code and to its description and synonyms as phrases. Edits to the
+code table therefore apply at once, without reindexing.
+
+`rebuild_diagnosis_index` recomputes every posting, for diagnoses written
+before the index existed or after a tokenizer change.
+"""
+
+import re
+import time
+import unicodedata
+from datetime import date
+from typing import Dict, List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import and_, delete, extract, func, insert, select, union
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.models.diagnosis import DiagnosisCode, DiagnosisField, DiagnosisPosting
+from app.models.patient import Admission, Discharge
+
+CODE_PREFIX = "code:"
+CODE_PATTERN = re.compile(r"\b([A-Za-z]\d{2}(?:\.[0-9A-Za-z]{1,4})?)\b")
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset({
+    "a", "an", "and", "as", "at", "by", "due", "for", "from", "in", "into", "is", "nos", "of", "on", "or",
+    "the", "to", "unspecified", "w", "was", "with", "without", "wo",
+})
+MAX_TERM_LENGTH = 64
+REBUILD_CHUNK_SIZE = 20000
+
+def normalize_code(code: str) -> str:
+    return code.strip().upper()
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Distinct normalized terms of a diagnosis text, in order of first appearance"""
+    if not text:
+        return []
+    decomposed = unicodedata.normalize("NFKD", text)
+    folded = "".join(character for character in decomposed if not unicodedata.combining(character))
+
+    terms = []
+    for match in CODE_PATTERN.finditer(folded):
+        code = normalize_code(match.group(1))
+        terms.append(CODE_PREFIX + code)
+        if "." in code:
+            terms.append(CODE_PREFIX + code.split(".", 1)[0])
+    for word in WORD_PATTERN.findall(CODE_PATTERN.sub(" ", folded).casefold()):
+        if word not in STOPWORDS and (len(word) > 1 or word.isdigit()):
+            terms.append(word[:MAX_TERM_LENGTH])
+    return list(dict.fromkeys(terms))
+
+def code_phrases(code: DiagnosisCode) -> List[List[str]]:
+    """The code itself plus its description and each synonym, as term lists"""
+    phrases = [[CODE_PREFIX + normalize_code(code.code)], tokenize(code.description)]
+    for synonym in re.split(r"[;\n]", code.synonyms or ""):
+        phrases.append(tokenize(synonym))
+    unique = {tuple(phrase): phrase for phrase in phrases if phrase}
+    return list(unique.values())
+
+def _postings(admission_id: UUID, admission_date: date, department_id: UUID,
+              texts: Dict[DiagnosisField, Optional[str]]) -> List[dict]:
+    return [
+        {"term": term, "admission_id": admission_id, "field": field,
+         "admission_date": admission_date, "department_id": department_id}
+        for field, text in texts.items()
+        for term in tokenize(text)
+    ]
+
+def _post(db: Session, admission: Admission, texts: Dict[DiagnosisField, Optional[str]]):
+    if not any(texts.values()):
+        return
+    if admission.id is None:
+        # The id is assigned on flush
+        db.flush()
+    rows = _postings(admission.id, admission.admission_date, admission.department_id, texts)
+    if rows:
+        db.execute(insert(DiagnosisPosting.__table__), rows)
+
+def index_admission(db: Session, admission: Admission):
+    """Post an admission's primary and secondary diagnoses; the caller commits"""
+    _post(db, admission, {DiagnosisField.PRIMARY: admission.primary_diagnosis,
+                          DiagnosisField.SECONDARY: admission.secondary_diagnoses})
+
+def index_discharge(db: Session, admission: Admission, discharge: Discharge):
+    """Post a discharge diagnosis under its admission; the caller commits"""
+    _post(db, admission, {DiagnosisField.DISCHARGE: discharge.discharge_diagnosis})
+
+def rebuild_diagnosis_index(conn: Connection) -> dict:
+    """Recompute all postings from the admissions and discharges tables"""
+    started = time.perf_counter()
+    table = DiagnosisPosting.__table__
+    conn.execute(delete(table))
+
+    rows = conn.execution_options(stream_results=True, yield_per=REBUILD_CHUNK_SIZE).execute(
+        select(Admission.id, Admission.admission_date, Admission.department_id,
+               Admission.primary_diagnosis, Admission.secondary_diagnoses, Discharge.discharge_diagnosis)
+        .outerjoin(Discharge, and_(Discharge.admission_id == Admission.id, Discharge.is_deleted == 0))
+        .where(Admission.is_deleted == 0)
+    )
+    admissions = postings = 0
+    for chunk in rows.partitions():
+        batch = []
+        for admission_id, admission_date, department_id, primary, secondary, discharge in chunk:
+            batch += _postings(admission_id, admission_date, department_id, {
+                DiagnosisField.PRIMARY: primary,
+                DiagnosisField.SECONDARY: secondary,
+                DiagnosisField.DISCHARGE: discharge,
+            })
+        admissions += len(chunk)
+        if batch:
+            conn.execute(insert(table), batch)
+            postings += len(batch)
+    return {"admissions": admissions, "postings": postings,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+def _phrase_matches(terms: List[str], filters: list):
+    """Admissions, with their dates, having every term of the phrase in one field"""
+    query = select(DiagnosisPosting.admission_id, DiagnosisPosting.admission_date)
+    if len(terms) == 1:
+        return query.where(DiagnosisPosting.term == terms[0], *filters)
+    return (
+        query.where(DiagnosisPosting.term.in_(terms), *filters)
+        .group_by(DiagnosisPosting.admission_id, DiagnosisPosting.field, DiagnosisPosting.admission_date)
+        .having(func.count() == len(terms))
+    )
+
+def _group_matches(phrases: List[List[str]], filters: list):
+    matches = [_phrase_matches(phrase, filters) for phrase in phrases]
+    return (matches[0] if len(matches) == 1 else union(*matches)).subquery()
+
+def search_admissions(db: Session, phrase_groups: Sequence[List[List[str]]], start: Optional[date] = None,
+                      end: Optional[date] = None, department_id: Optional[UUID] = None,
+                      fields: Optional[List[DiagnosisField]] = None, skip: int = 0, limit: int = 20) -> dict:
+    """Admissions matching any phrase of every group, with the total and counts per month"""
+    filters = []
+    if start:
+        filters.append(DiagnosisPosting.admission_date >= start)
+    if end:
+        filters.append(DiagnosisPosting.admission_date <= end)
+    if department_id:
+        filters.append(DiagnosisPosting.department_id == department_id)
+    if fields:
+        filters.append(DiagnosisPosting.field.in_(fields))
+
+    # Admissions are never edited once written, so the postings carry everything but the page itself
+    first = _group_matches(phrase_groups[0], filters)
+    matched = select(first.c.admission_id, first.c.admission_date).distinct()
+    for phrases in phrase_groups[1:]:
+        # One IN per further group rather than INTERSECT, which SQLite cannot nest around a UNION
+        group = _group_matches(phrases, filters)
+        matched = matched.where(first.c.admission_id.in_(select(group.c.admission_id)))
+    matched = matched.subquery()
+
+    year, month = extract("year", matched.c.admission_date), extract("month", matched.c.admission_date)
+    by_month = [
+        {"month": date(int(year_value), int(month_value), 1), "admissions": count}
+        for year_value, month_value, count in db.execute(
+            select(year, month, func.count()).group_by(year, month).order_by(year, month)
+        )
+    ]
+    page = db.execute(
+        select(matched.c.admission_id)
+        .order_by(matched.c.admission_date.desc(), matched.c.admission_id)
+        .offset(skip).limit(limit)
+    ).scalars().all()
+    admissions = {admission.id: admission for admission in
+                  db.query(Admission).filter(Admission.id.in_(page), Admission.is_deleted == 0)} if page else {}
+    return {
+        "total": sum(entry["admissions"] for entry in by_month),
+        "by_month": by_month,
+        "admissions": [admissions[admission_id] for admission_id in page if admission_id in admissions],
+    }
+
+def find_code(db: Session, code: str) -> Optional[DiagnosisCode]:
+    return db.query(DiagnosisCode).filter(
+        DiagnosisCode.code == normalize_code(code), DiagnosisCode.is_deleted == 0
+    ).first()
@@ -0,0 +1,197 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DataError, IntegrityError
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.database import tenant_registry
+from app.models.analytics import AnalyticsEventDeadLetter
+from app.services.event_partitions import insert_events
+from app.schemas.analytics import AnalyticsEventCreate
+
+logger = logging.getLogger(__name__)
+
+class EventIngestionBuffer:
+    """In-memory buffer that writes analytics events to the database in batches.
+
+    Events are flushed when EVENT_BUFFER_BATCH_SIZE are pending or every
+    EVENT_BUFFER_FLUSH_INTERVAL_SECONDS, whichever comes first. Once
+    EVENT_BUFFER_MAX_PENDING events are waiting, offers are refused so callers
+    back off instead of growing memory without bound.
+
+    Events are buffered per tenant and each batch is written to its tenant's
+    database, through that shard's writer queue; tenants with events waiting
+    take turns.
+
+    A failed batch is retried up to EVENT_BUFFER_MAX_RETRIES times, or not at all
+    when the database rejected its data, and then split in half so the events
+    that cannot be written are isolated. A single event that still fails is
+    moved to `analytics_event_dead_letters` and logged, so one bad event never
+    blocks the events behind it.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float, max_pending: int, max_retries: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self._pending: Dict[str, List[dict]] = {}
+        # Failed batches with their tenant and attempt count, written before new events
+        self._retries: Deque[Tuple[str, List[dict], int]] = deque()
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._started_at = time.monotonic()
+
+        # Metrics
+        self.accepted = 0
+        self.rejected = 0
+        self.flushed = 0
+        self.flush_count = 0
+        self.flush_errors = 0
+        self.dead_lettered = 0
+        self._flush_latencies: Deque[float] = deque(maxlen=500)
+        self._recent_flushes: Deque[Tuple[float, int]] = deque(maxlen=1000)
+
+    @property
+    def pending(self) -> int:
+        return sum(len(rows) for rows in self._pending.values()) + sum(len(batch) for _, batch, _ in self._retries)
+
+    def _full_batch_pending(self) -> bool:
+        return any(len(rows) >= self.batch_size for rows in self._pending.values())
+
+    def offer(self, events: List[AnalyticsEventCreate], tenant: str) -> bool:
+        """Queue validated events for a tenant; returns False when the buffer is full"""
+        if self.pending + len(events) > self.max_pending:
+            self.rejected += len(events)
+            return False
+        rows = self._pending.setdefault(tenant, [])
+        rows.extend(event.dict() for event in events)
+        self.accepted += len(events)
+        if len(rows) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    async def start(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """Stop the flusher and drain whatever is still buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self.pending:
+            if not await self.flush():
+                break
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while self.pending:
+                if not await self.flush() or (not self._retries and not self._full_batch_pending()):
+                    break
+
+    async def flush(self) -> bool:
+        """Write up to one batch, retried batches first; returns False if it failed"""
+        if self._retries:
+            tenant, batch, attempts = self._retries.popleft()
+        elif self._pending:
+            # Oldest tenant first; one with events left goes to the back of the line
+            tenant = next(iter(self._pending))
+            rows = self._pending.pop(tenant)
+            batch, attempts = rows[:self.batch_size], 0
+            if len(rows) > len(batch):
+                self._pending[tenant] = rows[len(batch):]
+        else:
+            return True
+
+        shard = tenant_registry.shard(tenant)
+        started = time.perf_counter()
+        try:
+            await run_in_threadpool(shard.run_write, self._write_batch, shard.engine, batch)
+        except Exception as exc:
+            attempts += 1
+            self.flush_errors += 1
+            logger.warning("Failed to flush %d analytics events (attempt %d): %s", len(batch), attempts, exc)
+            # Rejected data fails the same way on every retry
+            exhausted = attempts >= self.max_retries or isinstance(exc, (IntegrityError, DataError))
+            if not exhausted:
+                self._retries.appendleft((tenant, batch, attempts))
+            elif len(batch) > 1:
+                middle = len(batch) // 2
+                self._retries.extendleft([(tenant, batch[middle:], 0), (tenant, batch[:middle], 0)])
+            else:
+                await self._dead_letter(tenant, batch[0], exc, attempts)
+            return False
+
+        elapsed = time.perf_counter() - started
+        self.flushed += len(batch)
+        self.flush_count += 1
+        self._flush_latencies.append(elapsed * 1000)
+        self._recent_flushes.append((time.monotonic(), len(batch)))
+        return True
+
+    def _write_batch(self, db_engine: Engine, rows: List[dict]):
+        with db_engine.begin() as conn:
+            insert_events(conn, rows)
+
+    async def _dead_letter(self, tenant: str, row: dict, exc: Exception, attempts: int):
+        event = jsonable_encoder(row)
+        self.dead_lettered += 1
+        logger.error("Dead-lettering analytics event of tenant %s after %d attempts: %s: %s", tenant, attempts, exc, event)
+        shard = tenant_registry.shard(tenant)
+        try:
+            await run_in_threadpool(shard.run_write, self._write_dead_letter, shard.engine, event,
+                                    f"{type(exc).__name__}: {exc}", attempts)
+        except Exception:
+            # The log line above is the only record left
+            logger.exception("Failed to store dead-lettered analytics event")
+
+    def _write_dead_letter(self, db_engine: Engine, event: dict, error: str, attempts: int):
+        with db_engine.begin() as conn:
+            conn.execute(insert(AnalyticsEventDeadLetter.__table__).values(
+                id=uuid.uuid4(), event=event, error=error, attempts=attempts
+            ))
+
+    def metrics(self) -> dict:
+        now = time.monotonic()
+        window = min(60.0, max(now - self._started_at, 1e-9))
+        recent = sum(count for at, count in self._recent_flushes if now - at <= window)
+        latencies = sorted(self._flush_latencies)
+        return {
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "flushed": self.flushed,
+            "pending": self.pending,
+            "flush_count": self.flush_count,
+            "flush_errors": self.flush_errors,
+            "dead_lettered": self.dead_lettered,
+            "events_per_second": round(recent / window, 2),
+            "flush_latency_avg_ms": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+            "flush_latency_p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 2) if latencies else 0.0,
+            "flush_latency_max_ms": round(latencies[-1], 2) if latencies else 0.0,
+        }
+
+event_buffer = EventIngestionBuffer(
+    batch_size=settings.EVENT_BUFFER_BATCH_SIZE,
+    flush_interval=settings.EVENT_BUFFER_FLUSH_INTERVAL_SECONDS,
+    max_pending=settings.EVENT_BUFFER_MAX_PENDING,
+    max_retries=settings.EVENT_BUFFER_MAX_RETRIES
+)
@@ -0,0 +1,57 @@
+"""
+Registry of event_data keys promoted to indexed columns.
+
+PROMOTED_EVENT_KEYS maps an event type to the JSON keys that are filtered on
+often enough to deserve a column. Each key gets a `data_<key>` shadow column
+(see app.models.analytics) that is filled on ingestion and by the backfill, so
+filters on promoted keys hit an (event_type, data_<key>) index instead of
+parsing event_data row by row. Other keys fall back to a JSON lookup.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Table, and_, or_
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.config import settings
+from app.models.analytics import EventType, promoted_column_name
+
+def promoted_keys(event_type: EventType) -> List[str]:
+    return settings.PROMOTED_EVENT_KEYS.get(event_type.value, [])
+
+def promoted_types(key: str) -> List[EventType]:
+    """Event types whose events carry `key` in its shadow column"""
+    return [EventType(event_type) for event_type, keys in settings.PROMOTED_EVENT_KEYS.items() if key in keys]
+
+def promoted_columns() -> List[str]:
+    return sorted({promoted_column_name(key) for keys in settings.PROMOTED_EVENT_KEYS.values() for key in keys})
+
+def _as_text(value: Any) -> Optional[str]:
+    if value is None or isinstance(value, (dict, list)):
+        return None
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)[:255]
+
+def extract_promoted_values(event_type: EventType, event_data: Optional[Dict[str, Any]]) -> Dict[str, Optional[str]]:
+    """Shadow column values for one event; every promoted column is present so batches stay uniform"""
+    values = dict.fromkeys(promoted_columns())
+    if event_data:
+        for key in promoted_keys(event_type):
+            values[promoted_column_name(key)] = _as_text(event_data.get(key))
+    return values
+
+def key_filter(table: Table, key: str, value: str, event_type: Optional[EventType] = None) -> ColumnElement:
+    """Condition for event_data[key] == value, using the shadow column wherever it is populated"""
+    json_match = table.c.event_data[key].as_string() == value
+    types = promoted_types(key)
+    if not types:
+        return json_match
+
+    column_match = table.c[promoted_column_name(key)] == value
+    if event_type is not None:
+        return column_match if event_type in types else json_match
+    return or_(
+        and_(table.c.event_type.in_(types), column_match),
+        and_(table.c.event_type.notin_(types), json_match)
+    )
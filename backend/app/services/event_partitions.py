@@ -0,0 +1,360 @@
+"""
+Time-partitioned storage, rollups and retention for analytics events.
+
+PostgreSQL stores `analytics_events` as a declaratively range-partitioned table
+with one partition per month, created on demand. SQLite has no partitioning,
+so events go to one table per month (`analytics_events_y2025m01`) with the same
+columns. Either way, old months can be dropped in one cheap DDL statement.
+
+`metric_value` aggregates are rolled up into `analytics_event_rollups` in three
+tiers (hourly -> daily -> monthly) per event type and department. Each tier
+stores count/sum/min/max so coarser tiers are merged from finer ones, and
+long-range queries read the small rollup tiers instead of raw events.
+
+Shadow columns for promoted event_data keys (app.services.event_keys) are added
+to existing tables and backfilled here as well, since every month table has to
+be altered.
+"""
+
+import threading
+import uuid
+import weakref
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import Column, Index, MetaData, Table, and_, bindparam, delete, extract, func, insert, inspect, select, text, update
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.config import settings
+from app.database import Shard
+from app.models.analytics import AnalyticsEvent, AnalyticsEventRollup, EventType, RollupGranularity
+from app.services.event_keys import promoted_columns, promoted_keys, extract_promoted_values
+
+_partition_metadata = MetaData()
+_partition_tables: Dict[date, Table] = {}
+# Partitions this process has seen per database. Only months inside raw retention are
+# remembered, because older ones may be dropped by another worker at any time.
+_known_partitions: "weakref.WeakKeyDictionary[Engine, Set[date]]" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+def next_month(month: date) -> date:
+    return date(month.year + (month.month == 12), month.month % 12 + 1, 1)
+
+def raw_retention_cutoff(today: date) -> date:
+    """First month whose raw partition is kept"""
+    cutoff_month = month_start(today)
+    for _ in range(settings.EVENT_RAW_RETENTION_MONTHS):
+        cutoff_month = date(cutoff_month.year - (cutoff_month.month == 1), (cutoff_month.month - 2) % 12 + 1, 1)
+    return cutoff_month
+
+def _known_partitions_for(conn: Connection) -> Set[date]:
+    with _lock:
+        return _known_partitions.setdefault(conn.engine, set())
+
+def partition_name(month: date) -> str:
+    return f"{AnalyticsEvent.__tablename__}_y{month.year}m{month.month:02d}"
+
+def is_partitioned_natively(conn: Connection) -> bool:
+    return conn.dialect.name == "postgresql"
+
+def partition_table(month: date) -> Table:
+    """Month table used on SQLite; same columns as analytics_events, without foreign keys"""
+    with _lock:
+        table = _partition_tables.get(month)
+        if table is None:
+            name = partition_name(month)
+            table = Table(
+                name, _partition_metadata,
+                *[Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable)
+                  for c in AnalyticsEvent.__table__.columns],
+                Index(f"ix_{name}_type_date", "event_type", "event_date"),
+                *[Index(f"ix_{name}_{column}", "event_type", column) for column in promoted_columns()],
+            )
+            _partition_tables[month] = table
+        return table
+
+def ensure_partitions(conn: Connection, months: Iterable[date]):
+    """Create any missing monthly partitions"""
+    known = _known_partitions_for(conn)
+    cutoff_month = raw_retention_cutoff(date.today())
+    for month in sorted(set(months) - known):
+        if is_partitioned_natively(conn):
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {AnalyticsEvent.__tablename__} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month(month).isoformat()}')"
+            ))
+        else:
+            partition_table(month).create(conn, checkfirst=True)
+        if month >= cutoff_month:
+            known.add(month)
+
+def existing_partitions(conn: Connection) -> List[date]:
+    """Months that currently have a partition, oldest first"""
+    prefix = f"{AnalyticsEvent.__tablename__}_y"
+    months = []
+    for name in inspect(conn).get_table_names():
+        if name.startswith(prefix) and len(name) == len(prefix) + 7:
+            months.append(date(int(name[len(prefix):len(prefix) + 4]), int(name[-2:]), 1))
+    return sorted(months)
+
+def all_event_tables(conn: Connection) -> List[Table]:
+    """Every table holding raw events, including rows written before partitioning"""
+    if is_partitioned_natively(conn):
+        return [AnalyticsEvent.__table__]
+    return [AnalyticsEvent.__table__] + [partition_table(month) for month in existing_partitions(conn)]
+
+def event_tables_for_range(conn: Connection, start: date, end: date) -> List[Table]:
+    """Tables holding raw events between start and end (inclusive)"""
+    if is_partitioned_natively(conn):
+        return [AnalyticsEvent.__table__]
+    return [partition_table(month) for month in existing_partitions(conn)
+            if month <= end and next_month(month) > start]
+
+def prepare_event_rows(rows: List[dict]) -> List[dict]:
+    """Fill the defaults that Core inserts into month tables would otherwise miss"""
+    now = datetime.utcnow()
+    for row in rows:
+        row.setdefault("id", uuid.uuid4())
+        row.setdefault("is_deleted", 0)
+        row.setdefault("created_at", now)
+        row.setdefault("updated_at", now)
+        row.update(extract_promoted_values(row["event_type"], row["event_data"]))
+    return rows
+
+def insert_events(conn: Connection, rows: List[dict]):
+    """Insert raw events, creating the monthly partitions they need"""
+    rows = prepare_event_rows(rows)
+    by_month: Dict[date, List[dict]] = defaultdict(list)
+    for row in rows:
+        by_month[month_start(row["event_date"])].append(row)
+    ensure_partitions(conn, by_month.keys())
+
+    if is_partitioned_natively(conn):
+        conn.execute(insert(AnalyticsEvent.__table__), rows)
+    else:
+        for month, month_rows in by_month.items():
+            conn.execute(insert(partition_table(month)), month_rows)
+
+# Promoted event_data keys
+def ensure_promoted_columns(conn: Connection) -> List[str]:
+    """Add shadow columns and indexes for newly promoted keys to existing event tables"""
+    added = []
+    tables = all_event_tables(conn)
+    for table in tables:
+        existing = {column["name"] for column in inspect(conn).get_columns(table.name)}
+        for column in promoted_columns():
+            if column not in existing:
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column} VARCHAR(255)"))
+                added.append(f"{table.name}.{column}")
+            # On PostgreSQL an index on the parent is created on every partition
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table.name}_{column} ON {table.name} (event_type, {column})"))
+    return added
+
+def _backfill_batch(db_engine: Engine, table: Table, event_types: List[EventType], last_id, batch_size: int):
+    columns = promoted_columns()
+    with db_engine.begin() as conn:
+        query = select(table.c.id, table.c.event_type, table.c.event_data,
+                       *[table.c[column] for column in columns]).where(table.c.event_type.in_(event_types))
+        if last_id is not None:
+            query = query.where(table.c.id > last_id)
+        rows = conn.execute(query.order_by(table.c.id).limit(batch_size)).all()
+
+        changes = []
+        for row in rows:
+            values = extract_promoted_values(row.event_type, row.event_data)
+            if any(getattr(row, column) != value for column, value in values.items()):
+                changes.append({"_id": row.id, **{f"_{column}": value for column, value in values.items()}})
+        if changes:
+            conn.execute(
+                update(table).where(table.c.id == bindparam("_id")).values(
+                    {column: bindparam(f"_{column}") for column in columns}),
+                changes
+            )
+    return rows, len(changes)
+
+def backfill_promoted_keys(shard: Shard, batch_size: Optional[int] = None) -> dict:
+    """Fill a shard's shadow columns from event_data in keyset-paginated batches, one transaction per batch"""
+    batch_size = batch_size or settings.EVENT_BACKFILL_BATCH_SIZE
+    event_types = [event_type for event_type in EventType if promoted_keys(event_type)]
+    result = {"tables": 0, "scanned": 0, "updated": 0}
+    if not event_types:
+        return result
+
+    with shard.engine.connect() as conn:
+        tables = all_event_tables(conn)
+
+    for table in tables:
+        result["tables"] += 1
+        last_id = None
+        while True:
+            rows, updated = shard.run_write(_backfill_batch, shard.engine, table, event_types, last_id, batch_size)
+            result["scanned"] += len(rows)
+            result["updated"] += updated
+            if len(rows) < batch_size:
+                break
+            last_id = rows[-1].id
+    return result
+
+# Rollups
+def _merge(target: dict, count: int, metric_count: int, total, low, high):
+    target["event_count"] += count
+    target["metric_count"] += metric_count
+    if total is not None:
+        target["metric_sum"] = (target["metric_sum"] or Decimal("0")) + Decimal(str(total))
+    if low is not None:
+        target["metric_min"] = low if target["metric_min"] is None else min(target["metric_min"], low)
+    if high is not None:
+        target["metric_max"] = high if target["metric_max"] is None else max(target["metric_max"], high)
+
+def _empty_bucket() -> dict:
+    return {"event_count": 0, "metric_count": 0, "metric_sum": None, "metric_min": None, "metric_max": None}
+
+def _replace_buckets(conn: Connection, granularity: RollupGranularity, start: datetime, end: datetime,
+                     buckets: Dict[Tuple, dict]):
+    rollups = AnalyticsEventRollup.__table__
+    conn.execute(delete(rollups).where(and_(
+        rollups.c.granularity == granularity,
+        rollups.c.bucket_start >= start,
+        rollups.c.bucket_start < end
+    )))
+    now = datetime.utcnow()
+    rows = [
+        {"id": uuid.uuid4(), "granularity": granularity, "bucket_start": bucket_start, "event_type": event_type,
+         "department_id": department_id, "created_at": now, "updated_at": now, **values}
+        for (bucket_start, event_type, department_id), values in buckets.items()
+    ]
+    if rows:
+        conn.execute(insert(rollups), rows)
+
+def rollup_events(conn: Connection, start: date, end: date) -> dict:
+    """Recompute hourly and daily rollups for [start, end] and monthly rollups for the months touched"""
+    # Never recompute buckets whose raw partitions have already been dropped
+    months = existing_partitions(conn)
+    if not months or end < months[0]:
+        return {"hourly": 0, "daily": 0, "monthly": 0}
+    start = max(start, months[0])
+
+    hourly: Dict[Tuple, dict] = defaultdict(_empty_bucket)
+    for table in event_tables_for_range(conn, start, end):
+        hour = extract("hour", table.c.created_at)
+        result = conn.execute(
+            select(
+                table.c.event_date, hour, table.c.event_type, table.c.department_id,
+                func.count(), func.count(table.c.metric_value), func.sum(table.c.metric_value),
+                func.min(table.c.metric_value), func.max(table.c.metric_value)
+            ).where(and_(
+                table.c.is_deleted == 0,
+                table.c.event_date >= start,
+                table.c.event_date <= end
+            )).group_by(table.c.event_date, hour, table.c.event_type, table.c.department_id)
+        )
+        for event_date, event_hour, event_type, department_id, count, metric_count, total, low, high in result:
+            bucket = datetime.combine(event_date, datetime.min.time()) + timedelta(hours=int(event_hour or 0))
+            _merge(hourly[(bucket, event_type, department_id)], count, metric_count, total, low, high)
+
+    range_start = datetime.combine(start, datetime.min.time())
+    range_end = datetime.combine(end + timedelta(days=1), datetime.min.time())
+    _replace_buckets(conn, RollupGranularity.HOURLY, range_start, range_end, hourly)
+
+    daily: Dict[Tuple, dict] = defaultdict(_empty_bucket)
+    for (bucket, event_type, department_id), values in hourly.items():
+        day = datetime.combine(bucket.date(), datetime.min.time())
+        _merge(daily[(day, event_type, department_id)], values["event_count"], values["metric_count"],
+               values["metric_sum"], values["metric_min"], values["metric_max"])
+    _replace_buckets(conn, RollupGranularity.DAILY, range_start, range_end, daily)
+
+    # Monthly buckets are merged from every daily bucket of the months touched
+    rollups = AnalyticsEventRollup.__table__
+    first_month = datetime.combine(month_start(start), datetime.min.time())
+    after_last_month = datetime.combine(next_month(month_start(end)), datetime.min.time())
+    monthly: Dict[Tuple, dict] = defaultdict(_empty_bucket)
+    result = conn.execute(select(
+        rollups.c.bucket_start, rollups.c.event_type, rollups.c.department_id, rollups.c.event_count,
+        rollups.c.metric_count, rollups.c.metric_sum, rollups.c.metric_min, rollups.c.metric_max
+    ).where(and_(
+        rollups.c.granularity == RollupGranularity.DAILY,
+        rollups.c.bucket_start >= first_month,
+        rollups.c.bucket_start < after_last_month
+    )))
+    for bucket, event_type, department_id, count, metric_count, total, low, high in result:
+        month = datetime.combine(month_start(bucket.date()), datetime.min.time())
+        _merge(monthly[(month, event_type, department_id)], count, metric_count, total, low, high)
+    _replace_buckets(conn, RollupGranularity.MONTHLY, first_month, after_last_month, monthly)
+
+    return {"hourly": len(hourly), "daily": len(daily), "monthly": len(monthly)}
+
+def apply_retention(conn: Connection, today: Optional[date] = None) -> dict:
+    """Drop raw partitions past retention (after a final rollup) and prune fine rollup tiers"""
+    today = today or date.today()
+    cutoff_month = raw_retention_cutoff(today)
+
+    known = _known_partitions_for(conn)
+    dropped = []
+    for month in existing_partitions(conn):
+        if month >= cutoff_month:
+            continue
+        rollup_events(conn, month, next_month(month) - timedelta(days=1))
+        conn.execute(text(f"DROP TABLE IF EXISTS {partition_name(month)}"))
+        known.discard(month)
+        dropped.append(partition_name(month))
+
+    rollups = AnalyticsEventRollup.__table__
+    hourly_cutoff = datetime.combine(today - timedelta(days=settings.EVENT_HOURLY_RETENTION_DAYS), datetime.min.time())
+    daily_cutoff = datetime.combine(today - timedelta(days=settings.EVENT_DAILY_RETENTION_DAYS), datetime.min.time())
+    pruned_hourly = conn.execute(delete(rollups).where(and_(
+        rollups.c.granularity == RollupGranularity.HOURLY, rollups.c.bucket_start < hourly_cutoff
+    ))).rowcount
+    pruned_daily = conn.execute(delete(rollups).where(and_(
+        rollups.c.granularity == RollupGranularity.DAILY, rollups.c.bucket_start < daily_cutoff
+    ))).rowcount
+
+    return {"dropped_partitions": dropped, "pruned_hourly": pruned_hourly, "pruned_daily": pruned_daily}
+
+def choose_granularity(start: date, end: date, today: Optional[date] = None) -> RollupGranularity:
+    """Finest tier that suits the range length and whose retention still covers start"""
+    today = today or date.today()
+    days = (end - start).days + 1
+    if days <= 2 and start >= today - timedelta(days=settings.EVENT_HOURLY_RETENTION_DAYS):
+        return RollupGranularity.HOURLY
+    if days <= 92 and start >= today - timedelta(days=settings.EVENT_DAILY_RETENTION_DAYS):
+        return RollupGranularity.DAILY
+    return RollupGranularity.MONTHLY
+
+def query_rollups(conn: Connection, event_type: EventType, start: date, end: date,
+                  department_id: Optional[uuid.UUID] = None,
+                  granularity: Optional[RollupGranularity] = None) -> Tuple[RollupGranularity, List[dict]]:
+    """Read a metric series from the coarsest tier that fits the range"""
+    granularity = granularity or choose_granularity(start, end)
+    rollups = AnalyticsEventRollup.__table__
+    conditions = [
+        rollups.c.granularity == granularity,
+        rollups.c.event_type == event_type,
+        rollups.c.bucket_start >= datetime.combine(
+            month_start(start) if granularity == RollupGranularity.MONTHLY else start, datetime.min.time()),
+        rollups.c.bucket_start < datetime.combine(end + timedelta(days=1), datetime.min.time()),
+    ]
+    if department_id:
+        conditions.append(rollups.c.department_id == department_id)
+
+    result = conn.execute(select(
+        rollups.c.bucket_start,
+        func.sum(rollups.c.event_count), func.sum(rollups.c.metric_count), func.sum(rollups.c.metric_sum),
+        func.min(rollups.c.metric_min), func.max(rollups.c.metric_max)
+    ).where(and_(*conditions)).group_by(rollups.c.bucket_start).order_by(rollups.c.bucket_start))
+
+    points = []
+    for bucket, count, metric_count, total, low, high in result:
+        points.append({
+            "bucket_start": bucket,
+            "event_count": int(count or 0),
+            "metric_sum": float(total) if total is not None else None,
+            "metric_avg": float(total) / metric_count if total is not None and metric_count else None,
+            "metric_min": float(low) if low is not None else None,
+            "metric_max": float(high) if high is not None else None,
+        })
+    return granularity, points
@@ -0,0 +1,148 @@
+"""
+Dashboard and department-performance metrics, split into additive totals.
+
+Rates and averages cannot be combined across hospitals, but the counts and
+sums behind them can. Each metric is computed in two steps: `*_totals(db)`
+collects counts and sums from one database, and `dashboard_metrics` /
+`department_performance` derive the rates. The single-hospital endpoints run
+both steps on one database. Network-wide analytics add up the totals from
+every shard with `merge_totals` before deriving the rates.
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List
+
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session
+
+from app.models.analytics import CostAnalysis
+from app.models.outcome import Readmission, SatisfactionScore
+from app.models.patient import Admission, Discharge, Patient
+from app.models.resource import Bed, Department, Staff
+from app.schemas.analytics import DashboardMetrics, DepartmentPerformance
+
+def _rate(part, whole) -> float:
+    return (part / whole * 100) if whole > 0 else 0
+
+def _mean(total, count) -> float:
+    return float(total) / count if count and total else 0
+
+def merge_totals(totals: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    merged: Dict[str, Any] = {}
+    for part in totals:
+        for key, value in part.items():
+            merged[key] = merged[key] + value if key in merged else value
+    return merged
+
+def dashboard_totals(db: Session) -> Dict[str, Any]:
+    thirty_days_ago = date.today() - timedelta(days=30)
+    los_sum, los_count = db.query(func.sum(Discharge.length_of_stay), func.count(Discharge.length_of_stay)).filter(
+        Discharge.is_deleted == 0
+    ).one()
+    satisfaction_sum, satisfaction_count = db.query(
+        func.sum(SatisfactionScore.overall_satisfaction), func.count(SatisfactionScore.overall_satisfaction)
+    ).filter(SatisfactionScore.is_deleted == 0).one()
+    total_revenue = db.query(func.sum(Discharge.total_cost)).filter(Discharge.is_deleted == 0).scalar()
+    # Department-level analyses only; per-admission rows break the same costs down again
+    total_costs = db.query(func.sum(CostAnalysis.total_cost)).filter(
+        CostAnalysis.is_deleted == 0, CostAnalysis.admission_id.is_(None)
+    ).scalar()
+
+    return {
+        "patients": db.query(Patient).filter(Patient.is_deleted == 0).count(),
+        "admissions": db.query(Admission).filter(Admission.is_deleted == 0).count(),
+        "beds": db.query(Bed).filter(Bed.is_deleted == 0).count(),
+        "occupied_beds": db.query(Bed).filter(and_(Bed.is_deleted == 0, Bed.status == "occupied")).count(),
+        "los_sum": los_sum or 0,
+        "los_count": los_count,
+        # 30-day readmission rate
+        "recent_discharges": db.query(Discharge).filter(
+            and_(Discharge.is_deleted == 0, Discharge.discharge_date >= thirty_days_ago)
+        ).count(),
+        "recent_readmissions": db.query(Readmission).filter(
+            and_(
+                Readmission.is_deleted == 0,
+                Readmission.readmission_date >= thirty_days_ago,
+                Readmission.days_since_discharge <= 30
+            )
+        ).count(),
+        "satisfaction_sum": satisfaction_sum or 0,
+        "satisfaction_count": satisfaction_count,
+        "revenue": Decimal(str(total_revenue)) if total_revenue else Decimal('0'),
+        "costs": Decimal(str(total_costs)) if total_costs else Decimal('0'),
+    }
+
+def dashboard_metrics(totals: Dict[str, Any]) -> DashboardMetrics:
+    revenue, costs = totals["revenue"], totals["costs"]
+    profit_margin = float((revenue - costs) / revenue * 100) if revenue > 0 else 0
+    return DashboardMetrics(
+        total_patients=totals["patients"],
+        total_admissions=totals["admissions"],
+        current_occupancy_rate=round(_rate(totals["occupied_beds"], totals["beds"]), 2),
+        average_length_of_stay=round(_mean(totals["los_sum"], totals["los_count"]), 2),
+        readmission_rate=round(_rate(totals["recent_readmissions"], totals["recent_discharges"]), 2),
+        patient_satisfaction_score=round(_mean(totals["satisfaction_sum"], totals["satisfaction_count"]), 2),
+        total_revenue=revenue,
+        total_costs=costs,
+        profit_margin=round(profit_margin, 2)
+    )
+
+def department_performance_totals(db: Session) -> List[Dict[str, Any]]:
+    """Totals per department, with department_id and department_name"""
+    departments = db.query(Department).filter(Department.is_deleted == 0).all()
+    rows = []
+
+    for dept in departments:
+        los_sum, los_count = db.query(
+            func.sum(Discharge.length_of_stay), func.count(Discharge.length_of_stay)
+        ).join(Admission).filter(
+            and_(Admission.department_id == dept.id, Discharge.is_deleted == 0)
+        ).one()
+        satisfaction_sum, satisfaction_count = db.query(
+            func.sum(SatisfactionScore.overall_satisfaction), func.count(SatisfactionScore.overall_satisfaction)
+        ).join(Admission).filter(
+            and_(Admission.department_id == dept.id, SatisfactionScore.is_deleted == 0)
+        ).one()
+        total_costs = db.query(func.sum(CostAnalysis.total_cost)).filter(
+            and_(CostAnalysis.department_id == dept.id, CostAnalysis.is_deleted == 0, CostAnalysis.admission_id.is_(None))
+        ).scalar()
+
+        rows.append({
+            "department_id": dept.id,
+            "department_name": dept.name,
+            "beds": db.query(Bed).filter(and_(Bed.department_id == dept.id, Bed.is_deleted == 0)).count(),
+            "occupied_beds": db.query(Bed).filter(
+                and_(Bed.department_id == dept.id, Bed.is_deleted == 0, Bed.status == "occupied")
+            ).count(),
+            "los_sum": los_sum or 0,
+            "los_count": los_count,
+            "discharges": db.query(Discharge).join(Admission).filter(
+                and_(Admission.department_id == dept.id, Discharge.is_deleted == 0)
+            ).count(),
+            "readmissions": db.query(Readmission).filter(
+                and_(Readmission.readmission_department_id == dept.id, Readmission.is_deleted == 0)
+            ).count(),
+            "satisfaction_sum": satisfaction_sum or 0,
+            "satisfaction_count": satisfaction_count,
+            # Cost efficiency (simplified)
+            "costs": float(total_costs) if total_costs else 0,
+            "staff": db.query(Staff).filter(and_(Staff.department_id == dept.id, Staff.is_deleted == 0)).count(),
+            "active_staff": db.query(Staff).filter(
+                and_(Staff.department_id == dept.id, Staff.is_deleted == 0, Staff.is_active == True)
+            ).count(),
+        })
+
+    return rows
+
+def department_performance(totals: Dict[str, Any]) -> DepartmentPerformance:
+    return DepartmentPerformance(
+        department_id=totals["department_id"],
+        department_name=totals["department_name"],
+        occupancy_rate=round(_rate(totals["occupied_beds"], totals["beds"]), 2),
+        average_length_of_stay=round(_mean(totals["los_sum"], totals["los_count"]), 2),
+        readmission_rate=round(_rate(totals["readmissions"], totals["discharges"]), 2),
+        patient_satisfaction=round(_mean(totals["satisfaction_sum"], totals["satisfaction_count"]), 2),
+        cost_efficiency=round(totals["costs"], 2),
+        staff_utilization=round(_rate(totals["active_staff"], totals["staff"]), 2)
+    )
@@ -0,0 +1,147 @@
+"""
+Length-of-stay distributions from mergeable t-digest sketches.
+
+Every discharge updates one `length_of_stay_sketches` row, keyed by the
+admitting department, the admission type and the discharge month, in the same
+transaction as the discharge itself. Percentile and histogram queries merge
+the rows for the requested months and groups; they never read `discharges`.
+
+`rebuild_los_sketches` recomputes every row from the discharges table. Use it
+to backfill discharges recorded before the sketches existed, or after
+discharges were edited or deleted, since sketches only ever add.
+"""
+
+import time
+import uuid
+from collections import defaultdict
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, delete, insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.sketches import TDigest
+from app.models.analytics import LengthOfStaySketch
+from app.models.patient import Admission, AdmissionType, Discharge
+from app.services.cost_analysis import month_start
+
+# Histogram buckets in days: [0, 1), [1, 2), ... and a final open-ended bucket
+HISTOGRAM_EDGES = [0, 1, 2, 3, 5, 7, 10, 14, 21, 30, 60]
+GROUPINGS = ("none", "department", "admission_type", "both")
+
+def record_discharge(db: Session, admission: Admission, discharge: Discharge):
+    """Add a discharge's length of stay to its sketch; the caller commits"""
+    key = dict(
+        department_id=admission.department_id,
+        admission_type=admission.admission_type,
+        period_start=month_start(discharge.discharge_date)
+    )
+    # Lock the row so concurrent discharges do not overwrite each other's update
+    sketch = db.query(LengthOfStaySketch).filter_by(**key).with_for_update().first()
+    if sketch is None:
+        try:
+            with db.begin_nested():
+                sketch = LengthOfStaySketch(**key, discharge_count=0, total_days=0,
+                                            digest=TDigest(settings.LOS_DIGEST_COMPRESSION).to_bytes())
+                db.add(sketch)
+        except IntegrityError:
+            # Another discharge created it first
+            sketch = db.query(LengthOfStaySketch).filter_by(**key).with_for_update().one()
+
+    digest = TDigest.from_bytes(sketch.digest)
+    digest.add(discharge.length_of_stay)
+    sketch.digest = digest.to_bytes()
+    sketch.discharge_count += 1
+    sketch.total_days += discharge.length_of_stay
+
+def rebuild_los_sketches(conn: Connection) -> dict:
+    """Recompute all sketches from the discharges table"""
+    started = time.perf_counter()
+    rows = conn.execute(
+        select(Admission.department_id, Admission.admission_type, Discharge.discharge_date, Discharge.length_of_stay)
+        .join(Discharge, and_(Discharge.admission_id == Admission.id, Discharge.is_deleted == 0))
+        .where(Admission.is_deleted == 0)
+    )
+    groups: Dict[Tuple[UUID, AdmissionType, date], List[int]] = defaultdict(list)
+    discharges = 0
+    for department_id, admission_type, discharge_date, length_of_stay in rows:
+        groups[(department_id, admission_type, month_start(discharge_date))].append(length_of_stay)
+        discharges += 1
+
+    sketches = []
+    for (department_id, admission_type, period_start), values in groups.items():
+        digest = TDigest(settings.LOS_DIGEST_COMPRESSION)
+        digest.update(values)
+        sketches.append({
+            "department_id": department_id,
+            "admission_type": admission_type,
+            "period_start": period_start,
+            "discharge_count": len(values),
+            "total_days": sum(values),
+            "digest": digest.to_bytes(),
+        })
+
+    table = LengthOfStaySketch.__table__
+    conn.execute(delete(table))
+    if sketches:
+        conn.execute(insert(table), [{"id": uuid.uuid4(), **values} for values in sketches])
+    return {"sketches": len(sketches), "discharges": discharges,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+def _summary(digest: TDigest, count: int, total_days: int) -> dict:
+    def rounded(value: Optional[float]) -> Optional[float]:
+        return None if value is None else round(value, 2)
+
+    histogram = []
+    # Stays are whole days, so bucket [a, b) holds the values a..b-1: cut the CDF between integers
+    bounds = HISTOGRAM_EDGES + [None]
+    previous = 0.0
+    for lower, upper in zip(bounds, bounds[1:]):
+        cumulative = 1.0 if upper is None else digest.cdf(upper - 0.5)
+        histogram.append({"min_days": lower, "max_days": upper, "count": round((cumulative - previous) * count)})
+        previous = cumulative
+
+    return {
+        "discharges": count,
+        "mean": round(total_days / count, 2) if count else None,
+        "min": rounded(digest.min) if count else None,
+        "max": rounded(digest.max) if count else None,
+        "p50": rounded(digest.quantile(0.5)),
+        "p90": rounded(digest.quantile(0.9)),
+        "p99": rounded(digest.quantile(0.99)),
+        "histogram": histogram,
+    }
+
+def los_distribution(db: Session, start: date, end: date, department_id: Optional[UUID] = None,
+                     admission_type: Optional[AdmissionType] = None, group_by: str = "department") -> List[dict]:
+    """Merged distributions for discharges in the months touching [start, end], one per group"""
+    query = db.query(LengthOfStaySketch).filter(
+        LengthOfStaySketch.period_start >= month_start(start),
+        LengthOfStaySketch.period_start <= end
+    )
+    if department_id:
+        query = query.filter(LengthOfStaySketch.department_id == department_id)
+    if admission_type:
+        query = query.filter(LengthOfStaySketch.admission_type == admission_type)
+
+    merged: Dict[tuple, list] = {}
+    for sketch in query.all():
+        key = (
+            sketch.department_id if group_by in ("department", "both") else None,
+            sketch.admission_type if group_by in ("admission_type", "both") else None,
+        )
+        if key not in merged:
+            merged[key] = [TDigest(settings.LOS_DIGEST_COMPRESSION), 0, 0]
+        entry = merged[key]
+        entry[0].merge(TDigest.from_bytes(sketch.digest))
+        entry[1] += sketch.discharge_count
+        entry[2] += sketch.total_days
+
+    return [
+        {"department_id": key[0], "admission_type": key[1], **_summary(digest, count, total_days)}
+        for key, (digest, count, total_days) in sorted(merged.items(), key=lambda item: (str(item[0][0]), str(item[0][1])))
+    ]
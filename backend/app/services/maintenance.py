@@ -0,0 +1,200 @@
+"""
+Fleet-wide equipment maintenance planning.
+
+Each device gets a due date: the earlier of its calendar `next_maintenance_due`
+and the day its `usage_hours` are projected to reach `max_usage_hours`. The
+projection uses the device's average daily usage since its last maintenance,
+or since it entered service if it has never been serviced. Out-of-order
+devices are due today. Devices already in maintenance are left out.
+
+The plan assigns service days across every department under a shared daily
+technician capacity, earliest deadline first. A device becomes eligible
+MAINTENANCE_LEAD_DAYS before it is due. Each day the due devices go into a
+heap keyed by due date, and up to the capacity are popped. A device is at risk
+if it is overdue or can only be serviced after its due date.
+
+Each process keeps one planner per tenant. A planner holds the equipment
+fields it needs and refreshes incrementally: only rows whose `updated_at` has
+reached its watermark are re-read, and only those that differ are
+re-projected, so edits made through any worker show up in the next plan. The
+schedule is rebuilt only when a device changed or the day rolled over.
+"""
+
+import heapq
+import math
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.resource import Equipment, EquipmentStatus
+
+EQUIPMENT_COLUMNS = (
+    Equipment.id, Equipment.equipment_id, Equipment.name, Equipment.department_id, Equipment.status,
+    Equipment.purchase_date, Equipment.last_maintenance, Equipment.next_maintenance_due,
+    Equipment.usage_hours, Equipment.max_usage_hours, Equipment.created_at, Equipment.updated_at,
+    Equipment.is_deleted
+)
+
+@dataclass
+class DeviceProjection:
+    id: UUID
+    equipment_id: str
+    name: str
+    department_id: UUID
+    status: EquipmentStatus
+    daily_usage_hours: Optional[float]
+    projected_exhaustion_date: Optional[date]
+    next_maintenance_due: Optional[date]
+    due_date: Optional[date]
+    reason: Optional[str]
+
+@dataclass
+class PlannedMaintenance:
+    device: DeviceProjection
+    scheduled_date: date
+
+    @property
+    def at_risk(self) -> bool:
+        return self.scheduled_date > self.device.due_date
+
+def project_device(row, today: date) -> DeviceProjection:
+    """Usage rate, projected hour exhaustion and due date of one equipment row"""
+    since = row.last_maintenance or row.purchase_date or (row.created_at.date() if row.created_at else today)
+    days = max((today - since).days, 1)
+    usage = row.usage_hours or 0
+    rate = usage / days if usage else None
+
+    exhaustion = None
+    if row.max_usage_hours:
+        if usage >= row.max_usage_hours:
+            exhaustion = today
+        elif rate:
+            exhaustion = today + timedelta(days=math.floor((row.max_usage_hours - usage) / rate))
+
+    # Earliest deadline wins; out-of-order devices need a technician now
+    candidates = []
+    if row.status == EquipmentStatus.OUT_OF_ORDER:
+        candidates.append((today, "out_of_order"))
+    if exhaustion is not None:
+        candidates.append((exhaustion, "usage"))
+    if row.next_maintenance_due is not None:
+        candidates.append((row.next_maintenance_due, "calendar"))
+    due_date, reason = min(candidates, key=lambda candidate: candidate[0]) if candidates else (None, None)
+
+    return DeviceProjection(
+        id=row.id,
+        equipment_id=row.equipment_id,
+        name=row.name,
+        department_id=row.department_id,
+        status=row.status,
+        daily_usage_hours=round(rate, 2) if rate else None,
+        projected_exhaustion_date=exhaustion,
+        next_maintenance_due=row.next_maintenance_due,
+        due_date=due_date,
+        reason=reason
+    )
+
+def schedule_maintenance(devices: List[DeviceProjection], today: date, capacity_per_day: int,
+                         lead_days: int, horizon_days: int) -> List[PlannedMaintenance]:
+    """Earliest-deadline-first service days for devices due within the horizon, capacity_per_day per day"""
+    horizon = today + timedelta(days=horizon_days)
+    # (release day, due date, equipment_id, device): eligible lead_days before due, never before today
+    pending = sorted(
+        (max(device.due_date - timedelta(days=lead_days), today), device.due_date, device.equipment_id, device)
+        for device in devices
+        if device.due_date is not None and device.due_date <= horizon and device.status != EquipmentStatus.MAINTENANCE
+    )
+    plan: List[PlannedMaintenance] = []
+    ready: list = []
+    day, next_pending = today, 0
+    while next_pending < len(pending) or ready:
+        if not ready:
+            day = max(day, pending[next_pending][0])
+        while next_pending < len(pending) and pending[next_pending][0] <= day:
+            _, due_date, equipment_id, device = pending[next_pending]
+            heapq.heappush(ready, (due_date, equipment_id, device))
+            next_pending += 1
+        for _ in range(min(capacity_per_day, len(ready))):
+            plan.append(PlannedMaintenance(device=heapq.heappop(ready)[2], scheduled_date=day))
+        day += timedelta(days=1)
+    return plan
+
+class MaintenancePlanner:
+    """Per-tenant cache of device projections and the current plan"""
+
+    def __init__(self, capacity_per_day: int, lead_days: int, horizon_days: int):
+        self.capacity_per_day = capacity_per_day
+        self.lead_days = lead_days
+        self.horizon_days = horizon_days
+        self._rows: Dict[UUID, object] = {}
+        self._devices: Dict[UUID, DeviceProjection] = {}
+        self._plan: Optional[List[PlannedMaintenance]] = None
+        self._planned_on: Optional[date] = None
+        self._watermark: Optional[datetime] = None
+        self.generated_at: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+    def refresh(self, db: Session) -> int:
+        """Re-read equipment updated since the last refresh; returns how many devices changed"""
+        query = db.query(*EQUIPMENT_COLUMNS)
+        if self._watermark is not None:
+            # Timestamps may only have one-second resolution: look a second back so rows updated
+            # within the watermark's second are not missed; re-projecting them is harmless
+            query = query.filter(Equipment.updated_at >= self._watermark - timedelta(seconds=1))
+        rows = query.all()
+        today = date.today()
+
+        changed = 0
+        with self._lock:
+            for row in rows:
+                if self._watermark is None or row.updated_at > self._watermark:
+                    self._watermark = row.updated_at
+                if row.is_deleted:
+                    changed += self._rows.pop(row.id, None) is not None
+                    self._devices.pop(row.id, None)
+                elif self._rows.get(row.id) != row:
+                    self._rows[row.id] = row
+                    self._devices[row.id] = project_device(row, today)
+                    changed += 1
+            if changed:
+                self._plan = None
+        return changed
+
+    def plan(self, db: Session) -> List[PlannedMaintenance]:
+        self.refresh(db)
+        today = date.today()
+        with self._lock:
+            if self._planned_on != today:
+                # Projections are relative to today
+                self._devices = {key: project_device(row, today) for key, row in self._rows.items()}
+                self._plan = None
+            if self._plan is None:
+                self._plan = schedule_maintenance(
+                    list(self._devices.values()), today, self.capacity_per_day, self.lead_days, self.horizon_days
+                )
+                self._planned_on = today
+                self.generated_at = datetime.utcnow()
+            return self._plan
+
+def _new_planner() -> MaintenancePlanner:
+    return MaintenancePlanner(
+        capacity_per_day=settings.MAINTENANCE_TECHNICIAN_CAPACITY,
+        lead_days=settings.MAINTENANCE_LEAD_DAYS,
+        horizon_days=settings.MAINTENANCE_HORIZON_DAYS
+    )
+
+_tenant_planners: Dict[str, MaintenancePlanner] = {}
+_tenant_planners_lock = threading.Lock()
+
+def maintenance_planner_for(tenant: Optional[str]) -> MaintenancePlanner:
+    tenant = tenant or settings.DEFAULT_TENANT
+    planner = _tenant_planners.get(tenant)
+    if planner is None:
+        with _tenant_planners_lock:
+            planner = _tenant_planners.setdefault(tenant, _new_planner())
+    return planner
@@ -0,0 +1,132 @@
+"""
+Distinct patient counts from mergeable HyperLogLog sketches.
+
+Every admission adds its patient to one `patient_count_sketches` row, keyed
+by department and admission date, in the same transaction as the admission.
+A count for any date range and set of departments merges those daily rows, so
+it never joins or scans admissions, and a patient admitted several times in
+the range is counted once.
+
+Estimates have a relative standard error of 1.04 / sqrt(2^HLL_PRECISION);
+the reported bounds are a 95% interval (1.96 standard errors), capped by the
+exact admission count, which a distinct count can never exceed. Small counts
+are usually exact. `benchmarks/hll_precision.py` checks the estimates against
+COUNT(DISTINCT patient_id).
+
+Sketches only ever add: rebuild them after admissions are deleted or moved,
+or after changing HLL_PRECISION. Sketches of different precisions still
+merge, at the lower precision, until then.
+"""
+
+import time
+import uuid
+from collections import defaultdict
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import delete, insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.sketches import HyperLogLog
+from app.models.analytics import PatientCountSketch
+from app.models.patient import Admission
+
+GROUPINGS = ("none", "department")
+CONFIDENCE_Z = 1.96
+
+def record_admission(db: Session, admission: Admission):
+    """Add an admission's patient to its sketch; the caller commits"""
+    key = dict(department_id=admission.department_id, period_start=admission.admission_date)
+    # Lock the row so concurrent admissions do not overwrite each other's update
+    sketch = db.query(PatientCountSketch).filter_by(**key).with_for_update().first()
+    if sketch is None:
+        try:
+            with db.begin_nested():
+                sketch = PatientCountSketch(**key, admission_count=0,
+                                            registers=HyperLogLog(settings.HLL_PRECISION).to_bytes())
+                db.add(sketch)
+        except IntegrityError:
+            # Another admission created it first
+            sketch = db.query(PatientCountSketch).filter_by(**key).with_for_update().one()
+
+    registers = HyperLogLog.from_bytes(sketch.registers)
+    registers.add(admission.patient_id)
+    sketch.registers = registers.to_bytes()
+    sketch.admission_count += 1
+
+def rebuild_patient_count_sketches(conn: Connection) -> dict:
+    """Recompute all sketches from the admissions table"""
+    started = time.perf_counter()
+    rows = conn.execute(
+        select(Admission.department_id, Admission.admission_date, Admission.patient_id)
+        .where(Admission.is_deleted == 0)
+    )
+    groups: Dict[Tuple[UUID, date], List[int]] = defaultdict(list)
+    admissions = 0
+    for department_id, admission_date, patient_id in rows:
+        groups[(department_id, admission_date)].append(HyperLogLog.hash(patient_id))
+        admissions += 1
+
+    sketches = []
+    for (department_id, admission_date), hashes in groups.items():
+        registers = HyperLogLog(settings.HLL_PRECISION)
+        registers.add_hashes(np.array(hashes, dtype=np.uint64))
+        sketches.append({
+            "id": uuid.uuid4(),
+            "department_id": department_id,
+            "period_start": admission_date,
+            "admission_count": len(hashes),
+            "registers": registers.to_bytes(),
+        })
+
+    table = PatientCountSketch.__table__
+    conn.execute(delete(table))
+    if sketches:
+        conn.execute(insert(table), sketches)
+    return {"sketches": len(sketches), "admissions": admissions,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+def _count(registers: Optional[HyperLogLog], admissions: int) -> dict:
+    if registers is None or not admissions:
+        return {"distinct_patients": 0, "lower_bound": 0, "upper_bound": 0, "admissions": admissions,
+                "relative_standard_error": round(HyperLogLog(settings.HLL_PRECISION).relative_error, 4)}
+    estimate = min(registers.estimate(), admissions)
+    margin = CONFIDENCE_Z * registers.relative_error * estimate
+    return {
+        "distinct_patients": round(estimate),
+        "lower_bound": max(round(estimate - margin), 1),
+        "upper_bound": min(round(estimate + margin), admissions),
+        "admissions": admissions,
+        "relative_standard_error": round(registers.relative_error, 4),
+    }
+
+def distinct_patients(db: Session, start: date, end: date, department_ids: Optional[List[UUID]] = None,
+                      group_by: str = "none") -> List[dict]:
+    """Estimated distinct patients admitted in [start, end], overall or per department"""
+    query = db.query(PatientCountSketch.department_id, PatientCountSketch.admission_count,
+                     PatientCountSketch.registers).filter(
+        PatientCountSketch.period_start >= start,
+        PatientCountSketch.period_start <= end
+    )
+    if department_ids:
+        query = query.filter(PatientCountSketch.department_id.in_(department_ids))
+
+    merged: Dict[Optional[UUID], list] = {}
+    for department_id, admission_count, registers in query.all():
+        key = department_id if group_by == "department" else None
+        entry = merged.setdefault(key, [None, 0])
+        sketch = HyperLogLog.from_bytes(registers)
+        entry[0] = sketch if entry[0] is None else entry[0].merge(sketch)
+        entry[1] += admission_count
+
+    if group_by == "none" and not merged:
+        merged[None] = [None, 0]
+    return [
+        {"department_id": key, **_count(registers, admissions)}
+        for key, (registers, admissions) in sorted(merged.items(), key=lambda item: str(item[0]))
+    ]
@@ -0,0 +1,259 @@
+"""
+Staff rostering against forecast census.
+
+The roster covers two twelve-hour shifts a day per department. Each shift
+needs enough nurses and doctors for the patients expected that day, at the
+ratios in ROSTER_PATIENTS_PER_NURSE / ROSTER_PATIENTS_PER_DOCTOR (keyed by
+department type, with a "default").
+
+Census is forecast per department and weekday: the average census on the same
+weekday over the last ROSTER_CENSUS_HISTORY_WEEKS weeks, built from admission
+intervals with the same day sweep as the cost analyses.
+
+Staff are assigned greedily, day by day, with the least-loaded eligible person
+taken first. A person works at most one shift a day and at most
+ROSTER_MAX_SHIFTS_PER_WEEK shifts a week. A night shift is never followed by
+a day shift, and `shift_pattern` Day/Night limits a person to that shift.
+A repair pass then tries to close each remaining gap by handing one of a
+blocked person's shifts to a colleague, freeing that person for the gap.
+Whatever is still short is reported as a coverage gap.
+"""
+
+import math
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import and_, delete, func, insert, or_, select
+from sqlalchemy.engine import Connection
+
+from app.core.config import settings
+from app.models.patient import Admission, Discharge
+from app.models.resource import Department, ShiftAssignment, ShiftType, Staff, StaffRole
+from app.services.cost_analysis import interval_day_totals, stay_end_days
+
+ROSTERED_ROLES = (StaffRole.NURSE, StaffRole.DOCTOR)
+SHIFTS = (ShiftType.DAY, ShiftType.NIGHT)
+
+@dataclass(eq=False)
+class Rostered:
+    id: UUID
+    department: int
+    role: StaffRole
+    shifts: Set[ShiftType]
+    # Day index of the hire date; earlier days cannot be assigned
+    first_day: int = 0
+    assigned: Dict[int, ShiftType] = field(default_factory=dict)
+    per_week: Dict[int, int] = field(default_factory=lambda: defaultdict(int))
+
+def _allowed_shifts(shift_pattern: Optional[str]) -> Set[ShiftType]:
+    pattern = (shift_pattern or "").strip().lower()
+    if pattern == "day":
+        return {ShiftType.DAY}
+    if pattern == "night":
+        return {ShiftType.NIGHT}
+    return set(SHIFTS)
+
+def _ratio(ratios: Dict[str, float], department_type) -> float:
+    return ratios.get(department_type.value, ratios.get("default", 1.0))
+
+def forecast_census(conn: Connection, department_ids: List[UUID], start: date, days: int,
+                    today: Optional[date] = None) -> np.ndarray:
+    """Expected patients per (department, day) of [start, start + days): same-weekday mean of recent weeks"""
+    today = today or date.today()
+    history_end = min(start, today + timedelta(days=1)).toordinal()
+    history_days = 7 * settings.ROSTER_CENSUS_HISTORY_WEEKS
+    history_start = history_end - history_days
+    index = {department_id: position for position, department_id in enumerate(department_ids)}
+
+    stays = conn.execute(
+        select(Admission.department_id, Admission.admission_date, Discharge.discharge_date, func.count())
+        .select_from(Admission)
+        .outerjoin(Discharge, and_(Discharge.admission_id == Admission.id, Discharge.is_deleted == 0))
+        .where(
+            Admission.is_deleted == 0,
+            Admission.department_id.in_(department_ids),
+            Admission.admission_date < date.fromordinal(history_end),
+            or_(Discharge.discharge_date.is_(None), Discharge.discharge_date > date.fromordinal(history_start))
+        )
+        .group_by(Admission.department_id, Admission.admission_date, Discharge.discharge_date)
+    ).all()
+    admitted = np.array([row[1].toordinal() for row in stays], dtype=float)
+    discharged = np.array([row[2].toordinal() if row[2] else np.nan for row in stays], dtype=float)
+    ends = stay_end_days(admitted, discharged, today.toordinal() + 1)
+    history = interval_day_totals(
+        np.array([index[row[0]] for row in stays], dtype=np.int64),
+        (admitted - history_start).astype(np.int64), (ends - history_start).astype(np.int64),
+        np.array([row[3] for row in stays], dtype=float), len(department_ids), history_days
+    )
+
+    # history[:, phase::7] holds every day falling on one weekday; forecast days map onto the same phases
+    by_weekday = np.stack([history[:, phase::7].mean(axis=1) for phase in range(7)], axis=1)
+    offset = (start.toordinal() - history_start) % 7
+    return by_weekday[:, (np.arange(days) + offset) % 7]
+
+class RosterSolver:
+    def __init__(self, people: List[Rostered], required: Dict[Tuple[int, int, ShiftType, StaffRole], int],
+                 max_per_week: int):
+        self.required = required
+        self.max_per_week = max_per_week
+        self.pools: Dict[Tuple[int, StaffRole], List[Rostered]] = defaultdict(list)
+        for person in people:
+            self.pools[(person.department, person.role)].append(person)
+        self.slots: Dict[Tuple[int, int, ShiftType, StaffRole], List[Rostered]] = defaultdict(list)
+        self.repaired = 0
+
+    def feasible(self, person: Rostered, day: int, shift: ShiftType) -> bool:
+        if day in person.assigned or shift not in person.shifts or day < person.first_day:
+            return False
+        if person.per_week[day // 7] >= self.max_per_week:
+            return False
+        # Rest after nights: no night -> day on consecutive days
+        if shift == ShiftType.DAY and person.assigned.get(day - 1) == ShiftType.NIGHT:
+            return False
+        if shift == ShiftType.NIGHT and person.assigned.get(day + 1) == ShiftType.DAY:
+            return False
+        return True
+
+    def assign(self, person: Rostered, slot: Tuple[int, int, ShiftType, StaffRole]):
+        _, day, shift, _ = slot
+        person.assigned[day] = shift
+        person.per_week[day // 7] += 1
+        self.slots[slot].append(person)
+
+    def unassign(self, person: Rostered, slot: Tuple[int, int, ShiftType, StaffRole]):
+        _, day, _, _ = slot
+        del person.assigned[day]
+        person.per_week[day // 7] -= 1
+        self.slots[slot].remove(person)
+
+    def greedy(self, days: int):
+        for day in range(days):
+            for shift in SHIFTS:
+                for (department, role), pool in self.pools.items():
+                    slot = (department, day, shift, role)
+                    needed = self.required.get(slot, 0)
+                    if not needed:
+                        continue
+                    # Least-loaded first spreads shifts evenly; among equals, people limited to
+                    # one shift type go first so flexible staff stay free for the other shift
+                    for person in sorted(pool, key=lambda candidate: (len(candidate.assigned), len(candidate.shifts))):
+                        if self.feasible(person, day, shift):
+                            self.assign(person, slot)
+                            needed -= 1
+                            if not needed:
+                                break
+
+    def _free_for(self, person: Rostered, slot: Tuple[int, int, ShiftType, StaffRole]) -> bool:
+        """Try to hand one of person's nearby shifts to a colleague so person can take slot"""
+        department, day, shift, role = slot
+        pool = self.pools[(department, role)]
+        week = day // 7
+        blocking = [other_day for other_day in sorted(person.assigned)
+                    if other_day // 7 == week or abs(other_day - day) == 1]
+        for other_day in blocking:
+            other_slot = (department, other_day, person.assigned[other_day], role)
+            if person not in self.slots.get(other_slot, ()):
+                continue
+            self.unassign(person, other_slot)
+            if self.feasible(person, day, shift):
+                for colleague in pool:
+                    if colleague is not person and self.feasible(colleague, other_day, other_slot[2]):
+                        self.assign(colleague, other_slot)
+                        self.assign(person, slot)
+                        return True
+            self.assign(person, other_slot)
+        return False
+
+    def repair(self):
+        for slot, needed in sorted(self.required.items(), key=lambda item: (item[0][1], item[0][0])):
+            department, day, shift, role = slot
+            for person in self.pools[(department, role)]:
+                if len(self.slots[slot]) >= needed:
+                    break
+                if day in person.assigned or shift not in person.shifts:
+                    continue
+                if self._free_for(person, slot):
+                    self.repaired += 1
+
+def build_roster(conn: Connection, start: date, days: int, department_id: Optional[UUID] = None,
+                 today: Optional[date] = None) -> dict:
+    """Build and store shift assignments for [start, start + days); returns the roster summary and gaps"""
+    started = time.perf_counter()
+    department_filter = [Department.is_deleted == 0]
+    if department_id:
+        department_filter.append(Department.id == department_id)
+    departments = conn.execute(select(Department.id, Department.department_type).where(*department_filter)).all()
+    department_ids = [row.id for row in departments]
+    end = start + timedelta(days=days - 1)
+    summary = {"start_date": start, "end_date": end, "departments": len(departments), "staff": 0,
+               "required_shifts": 0, "assigned_shifts": 0, "repaired_gaps": 0, "coverage_rate": 100.0,
+               "staff_utilization": 0.0, "gaps": [], "elapsed_ms": 0.0}
+    if not departments:
+        return summary
+
+    census = np.ceil(forecast_census(conn, department_ids, start, days, today))
+    required = {}
+    for position, department in enumerate(departments):
+        for role, ratios in ((StaffRole.NURSE, settings.ROSTER_PATIENTS_PER_NURSE),
+                             (StaffRole.DOCTOR, settings.ROSTER_PATIENTS_PER_DOCTOR)):
+            ratio = _ratio(ratios, department.department_type)
+            for day in range(days):
+                needed = math.ceil(census[position, day] / ratio)
+                for shift in SHIFTS:
+                    if needed:
+                        required[(position, day, shift, role)] = needed
+
+    index = {department_id: position for position, department_id in enumerate(department_ids)}
+    staff = conn.execute(
+        select(Staff.id, Staff.department_id, Staff.role, Staff.shift_pattern, Staff.hire_date)
+        .where(Staff.is_deleted == 0, Staff.is_active == True, Staff.role.in_(ROSTERED_ROLES),
+               Staff.department_id.in_(department_ids), Staff.hire_date <= end)
+    ).all()
+    people = [Rostered(id=row.id, department=index[row.department_id], role=row.role,
+                       shifts=_allowed_shifts(row.shift_pattern), first_day=(row.hire_date - start).days)
+              for row in staff]
+
+    solver = RosterSolver(people, required, settings.ROSTER_MAX_SHIFTS_PER_WEEK)
+    solver.greedy(days)
+    solver.repair()
+
+    gaps = []
+    for (position, day, shift, role), needed in sorted(required.items(), key=lambda item: (item[0][1], item[0][0])):
+        assigned = len(solver.slots[(position, day, shift, role)])
+        if assigned < needed:
+            gaps.append({"department_id": department_ids[position], "shift_date": start + timedelta(days=day),
+                         "shift": shift, "role": role, "required": needed, "assigned": assigned})
+
+    rows = [
+        {"id": uuid.uuid4(), "staff_id": person.id, "department_id": department_ids[department], "role": role,
+         "shift_date": start + timedelta(days=day), "shift": shift}
+        for (department, day, shift, role), assigned in solver.slots.items()
+        for person in assigned
+    ]
+    table = ShiftAssignment.__table__
+    conn.execute(delete(table).where(
+        table.c.department_id.in_(department_ids), table.c.shift_date >= start, table.c.shift_date <= end
+    ))
+    if rows:
+        conn.execute(insert(table), rows)
+
+    required_shifts = sum(required.values())
+    assigned_shifts = sum(min(len(solver.slots[slot]), needed) for slot, needed in required.items())
+    capacity = len(people) * settings.ROSTER_MAX_SHIFTS_PER_WEEK * days / 7
+    summary.update(
+        staff=len(people),
+        required_shifts=required_shifts,
+        assigned_shifts=assigned_shifts,
+        repaired_gaps=solver.repaired,
+        coverage_rate=round(assigned_shifts / required_shifts * 100, 2) if required_shifts else 100.0,
+        staff_utilization=round(len(rows) / capacity * 100, 2) if capacity else 0.0,
+        gaps=gaps,
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 1)
+    )
+    return summary
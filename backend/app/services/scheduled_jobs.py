@@ -0,0 +1,89 @@
+"""
+Periodic maintenance work, run by the scheduler instead of on the request path.
+
+Each job opens its own connection or session and returns a small dict that is
+stored with its run in `job_runs`.
+"""
+
+from datetime import date, datetime, timedelta
+
+from app.core.config import settings
+from app.core.revocation import revocation_list_for
+from app.core.scheduler import Scheduler
+from app.database import engine, run_serialized_write, tenant_registry
+from app.models.jobs import JobRun
+from app.services.cost_analysis import generate_admission_costs, generate_cost_analyses
+from app.services.event_partitions import apply_retention, rollup_events
+
+def refresh_event_rollups() -> dict:
+    """Recompute yesterday's and today's rollups in every tenant so /api/events/rollups stays current"""
+    today = date.today()
+
+    def run(db_engine):
+        with db_engine.begin() as conn:
+            return rollup_events(conn, today - timedelta(days=1), today)
+
+    rolled_up = {}
+    for tenant in tenant_registry.tenants:
+        shard = tenant_registry.shard(tenant)
+        rolled_up[tenant] = shard.run_write(run, shard.engine)
+    return {"rolled_up": rolled_up}
+
+def apply_event_retention() -> dict:
+    def run(db_engine):
+        with db_engine.begin() as conn:
+            return apply_retention(conn)
+
+    applied = {}
+    for tenant in tenant_registry.tenants:
+        shard = tenant_registry.shard(tenant)
+        applied[tenant] = shard.run_write(run, shard.engine)
+    return {"applied": applied}
+
+def refresh_cost_analyses() -> dict:
+    """Regenerate last month's and this month's department and per-admission cost analyses in every tenant"""
+    today = date.today()
+    start = today.replace(day=1) - timedelta(days=1)
+
+    def run(db_engine):
+        with db_engine.begin() as conn:
+            return {
+                "departments": generate_cost_analyses(conn, start, today),
+                "admissions": generate_admission_costs(conn, start, today),
+            }
+
+    generated = {}
+    for tenant in tenant_registry.tenants:
+        shard = tenant_registry.shard(tenant)
+        generated[tenant] = shard.run_write(run, shard.engine)
+    return {"generated": generated}
+
+def purge_revoked_tokens() -> dict:
+    purged = {}
+    for tenant in tenant_registry.tenants:
+        db = tenant_registry.session(tenant)
+        try:
+            purged[tenant] = revocation_list_for(tenant).purge_expired(db)
+        finally:
+            db.close()
+    return {"purged": purged}
+
+def prune_job_runs() -> dict:
+    cutoff = datetime.utcnow() - timedelta(days=settings.JOB_RUN_HISTORY_DAYS)
+
+    def run():
+        with engine.begin() as conn:
+            return conn.execute(JobRun.__table__.delete().where(JobRun.__table__.c.started_at < cutoff)).rowcount
+    return {"deleted": run_serialized_write(run)}
+
+def register_jobs(scheduler: Scheduler):
+    scheduler.add_job("event_rollups", settings.EVENT_ROLLUP_CRON, refresh_event_rollups,
+                      description="Recompute hourly, daily and monthly event rollups for yesterday and today")
+    scheduler.add_job("event_retention", settings.EVENT_RETENTION_CRON, apply_event_retention,
+                      description="Drop raw event partitions and fine rollups past retention")
+    scheduler.add_job("cost_analyses", settings.COST_ANALYSIS_CRON, refresh_cost_analyses,
+                      description="Regenerate department and per-admission cost analyses for last month and this month")
+    scheduler.add_job("revoked_token_purge", settings.REVOCATION_PURGE_CRON, purge_revoked_tokens,
+                      description="Delete expired token revocations and rebuild the Bloom filters")
+    scheduler.add_job("job_run_pruning", settings.JOB_RUN_PRUNE_CRON, prune_job_runs,
+                      description="Delete job run history older than JOB_RUN_HISTORY_DAYS")
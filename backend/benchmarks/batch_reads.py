@@ -0,0 +1,75 @@
+"""
+Batch read parallelism benchmark.
+
+Times one analytics GET on its own, then the same GET repeated inside a single
+/api/batch call, against the in-process app. With reads running in parallel
+the batch should take about ceil(N / BATCH_READ_CONCURRENCY) single-read
+times instead of N, given free cores or a database server to wait on.
+--latency-ms adds a per-query delay standing in for the network round-trip
+of a PostgreSQL server, to measure the overlap against a local SQLite file.
+
+    python -m benchmarks.batch_reads --reads 8 --iterations 5 --latency-ms 5
+
+Seed realistic data first with `python -m scripts.generate_data`.
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.database import tenant_registry
+from app.main import app
+
+READ = {"path": "/api/analytics/trends/readmissions", "params": {"days": 30}}
+
+
+async def timed(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        response = await fn()
+        response.raise_for_status()
+    return (time.perf_counter() - started) / iterations * 1000
+
+
+async def run(args):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=120) as client:
+        response = await client.post("/api/auth/login", data={"username": args.username, "password": args.password})
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        operations = [{"id": str(index), **READ} for index in range(args.reads)]
+
+        single_ms = await timed(lambda: client.get(READ["path"], params=READ["params"], headers=headers), args.iterations)
+        batch_ms = await timed(lambda: client.post("/api/batch", json={"operations": operations}, headers=headers),
+                               args.iterations)
+
+    print(f"BATCH_READ_CONCURRENCY={settings.BATCH_READ_CONCURRENCY}")
+    print(f"{'single read':<24} {single_ms:>9.1f}ms")
+    print(f"{f'batch of {args.reads} reads':<24} {batch_ms:>9.1f}ms  ({args.reads * single_ms / batch_ms:.1f}x vs sequential)")
+
+
+def add_latency(latency_ms: float):
+    for tenant in tenant_registry.tenants:
+        event.listen(tenant_registry.engine(tenant), "before_cursor_execute",
+                     lambda *args: time.sleep(latency_ms / 1000))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel batch read benchmark")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--reads", type=int, default=8, help="GETs per batch")
+    parser.add_argument("--iterations", type=int, default=5, help="Repetitions per measurement")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Simulated database round-trip per query")
+    args = parser.parse_args()
+    if args.latency_ms:
+        add_latency(args.latency_ms)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Distinct-patient sketch precision: HyperLogLog estimates against exact counts.
+
+Synthetic mode feeds random patient ids into sketches at several cardinalities
+and precisions. For each combination it reports the mean and worst relative
+error, the observed standard error next to the documented 1.04 / sqrt(2^p),
+and how often the exact count fell inside the reported 95% bounds.
+
+Database mode rebuilds the sketches from the admissions table. It then
+compares /api/analytics/distinct-patients estimates with
+COUNT(DISTINCT patient_id) for every department and for the whole hospital,
+over months, quarters and the full history, and times both queries.
+
+    python -m benchmarks.hll_precision --synthetic --trials 200
+    python -m benchmarks.hll_precision --database
+
+Seed realistic data first with `python -m scripts.generate_data`.
+"""
+
+import argparse
+import math
+import statistics
+import time
+from datetime import date
+
+import numpy as np
+from sqlalchemy import func
+
+from app.core.sketches import HyperLogLog
+from app.services.patient_counts import CONFIDENCE_Z, _count
+
+
+def synthetic(args):
+    rng = np.random.default_rng(args.seed)
+    print(f"{'precision':>9} {'n':>9} {'documented':>10} {'observed':>9} {'mean err':>9} {'worst':>8} {'in 95%':>7}")
+    for precision in args.precisions:
+        for n in args.cardinalities:
+            errors, covered = [], 0
+            for _ in range(args.trials):
+                sketch = HyperLogLog(precision)
+                # Random 64-bit values stand in for hashed patient ids
+                sketch.add_hashes(rng.integers(0, 2 ** 64, size=n, dtype=np.uint64))
+                # Each patient admitted twice on average: the admission cap must not bind
+                count = _count(sketch, 2 * n)
+                errors.append((sketch.estimate() - n) / n)
+                covered += count["lower_bound"] <= n <= count["upper_bound"]
+            observed = math.sqrt(statistics.fmean(error * error for error in errors))
+            print(f"{precision:>9} {n:>9} {1.04 / math.sqrt(1 << precision):>9.2%} {observed:>9.2%} "
+                  f"{statistics.fmean(errors):>+9.2%} {max(map(abs, errors)):>8.2%} {covered / args.trials:>7.1%}")
+
+
+def database(args):
+    from app.database import SessionLocal, engine
+    from app.models.patient import Admission
+    from app.services.patient_counts import distinct_patients, rebuild_patient_count_sketches
+
+    with engine.begin() as conn:
+        result = rebuild_patient_count_sketches(conn)
+    print(f"rebuilt {result['sketches']} sketches from {result['admissions']} admissions "
+          f"in {result['elapsed_ms']:.0f}ms\n")
+
+    db = SessionLocal()
+    try:
+        first, last = db.query(func.min(Admission.admission_date), func.max(Admission.admission_date)).filter(
+            Admission.is_deleted == 0).one()
+        if first is None:
+            print("no admissions")
+            return
+        ranges = [("all", first, last)]
+        for months, label in ((3, "quarter"), (1, "month")):
+            end = last
+            start = date(end.year, end.month, 1)
+            for _ in range(months - 1):
+                start = date(start.year - (start.month == 1), (start.month - 2) % 12 + 1, 1)
+            ranges.append((label, start, end))
+
+        print(f"{'range':<8} {'department':<38} {'exact':>8} {'estimate':>9} {'error':>8} {'95% bounds':>17} "
+              f"{'exact ms':>9} {'sketch ms':>10}")
+        errors, covered = [], 0
+        for label, start, end in ranges:
+            started = time.perf_counter()
+            exact = dict(db.query(Admission.department_id, func.count(func.distinct(Admission.patient_id))).filter(
+                Admission.is_deleted == 0, Admission.admission_date >= start, Admission.admission_date <= end
+            ).group_by(Admission.department_id).all())
+            exact[None] = db.query(func.count(func.distinct(Admission.patient_id))).filter(
+                Admission.is_deleted == 0, Admission.admission_date >= start, Admission.admission_date <= end
+            ).scalar()
+            exact_ms = (time.perf_counter() - started) * 1000
+
+            started = time.perf_counter()
+            counts = distinct_patients(db, start, end, group_by="department")
+            counts += distinct_patients(db, start, end)
+            sketch_ms = (time.perf_counter() - started) * 1000
+
+            for count in counts:
+                truth = exact.get(count["department_id"], 0)
+                error = (count["distinct_patients"] - truth) / truth if truth else 0.0
+                errors.append(error)
+                covered += count["lower_bound"] <= truth <= count["upper_bound"]
+                bounds = f"{count['lower_bound']}-{count['upper_bound']}"
+                print(f"{label:<8} {str(count['department_id'] or 'all'):<38} {truth:>8} "
+                      f"{count['distinct_patients']:>9} {error:>+8.2%} {bounds:>17} {exact_ms:>9.1f} {sketch_ms:>10.1f}")
+
+        print(f"\n{len(errors)} counts: mean |error| {statistics.fmean(map(abs, errors)):.2%}, "
+              f"worst {max(map(abs, errors)):.2%}, {covered / len(errors):.1%} within the {CONFIDENCE_Z} sigma bounds")
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HyperLogLog distinct-count precision")
+    parser.add_argument("--synthetic", action="store_true", help="Random ids, no database")
+    parser.add_argument("--database", action="store_true", help="Rebuild sketches and compare with COUNT(DISTINCT)")
+    parser.add_argument("--precisions", type=int, nargs="+", default=[10, 12, 14])
+    parser.add_argument("--cardinalities", type=int, nargs="+", default=[10, 100, 1000, 10000, 100000])
+    parser.add_argument("--trials", type=int, default=100, help="Sketches per precision and cardinality")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.synthetic or not args.database:
+        synthetic(args)
+    if args.database:
+        if args.synthetic:
+            print()
+        database(args)
+
+
+if __name__ == "__main__":
+    main()
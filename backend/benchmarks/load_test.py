@@ -0,0 +1,317 @@
+"""
+End-to-end API load-testing benchmark.
+
+Replays a realistic traffic mix (dashboard loads, patient search, list
+pagination, admissions, discharges and bed updates) against the FastAPI app,
+either in-process through httpx's ASGI transport or against a running uvicorn.
+Reports throughput and p50/p95/p99 latency per route; in-process runs also
+count the SQL statements each route issues.
+
+Results can be saved as a JSON baseline and diffed against a later run:
+
+    python -m benchmarks.load_test --requests 2000 --save benchmarks/baselines/main.json
+    python -m benchmarks.load_test --requests 2000 --compare benchmarks/baselines/main.json
+    python -m benchmarks.load_test --base-url http://127.0.0.1:8000 --concurrency 50
+
+Seed realistic data first with `python -m scripts.generate_data`.
+"""
+
+import argparse
+import asyncio
+import contextvars
+import json
+import math
+import platform
+import random
+import statistics
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import httpx
+
+# Per-request SQL statement counter, visible to the in-process app via context propagation
+_query_counter: contextvars.ContextVar = contextvars.ContextVar("query_counter", default=None)
+
+SEARCH_TERMS = ["Smi", "Joh", "Gar", "Lee", "Mar", "Dav", "Wil", "P0000", "And", "Tay"]
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class LoadTest:
+    """Drives the weighted request mix and records per-route samples"""
+
+    def __init__(self, client: httpx.AsyncClient, username: str, password: str, seed: int, count_queries: bool):
+        self.client = client
+        self.username = username
+        self.password = password
+        self.random = random.Random(seed)
+        self.count_queries = count_queries
+        self.headers = {}
+        self.latencies = defaultdict(list)
+        self.queries = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.department_ids = []
+        self.bed_ids = []
+        self.open_admission_ids = []
+        self.patient_count = 0
+
+    async def request(self, route: str, method: str, url: str, **kwargs) -> httpx.Response:
+        counter = [0]
+        token = _query_counter.set(counter)
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=self.headers, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            _query_counter.reset(token)
+        self.latencies[route].append(elapsed * 1000)
+        if self.count_queries:
+            self.queries[route].append(counter[0])
+        if response.status_code >= 400:
+            self.errors[route] += 1
+        return response
+
+    async def setup(self):
+        response = await self.client.post("/api/auth/login", data={"username": self.username, "password": self.password})
+        response.raise_for_status()
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        departments = await self.client.get("/api/resources/departments", params={"limit": 100}, headers=self.headers)
+        self.department_ids = [d["id"] for d in departments.json()]
+        beds = await self.client.get("/api/resources/beds", params={"limit": 100}, headers=self.headers)
+        self.bed_ids = [b["id"] for b in beds.json()]
+        if not self.department_ids:
+            sys.exit("No departments found; seed data with `python -m scripts.generate_data` first")
+
+    # Scenario operations
+    async def dashboard(self):
+        await asyncio.gather(
+            self.request("GET /api/analytics/dashboard", "GET", "/api/analytics/dashboard"),
+            self.request("GET /api/analytics/trends/occupancy", "GET", "/api/analytics/trends/occupancy", params={"days": 30}),
+            self.request("GET /api/analytics/trends/readmissions", "GET", "/api/analytics/trends/readmissions", params={"days": 30}),
+            self.request("GET /api/analytics/departments/performance", "GET", "/api/analytics/departments/performance"),
+            self.request("GET /api/analytics/patient-outcomes", "GET", "/api/analytics/patient-outcomes"),
+            self.request("GET /api/analytics/resource-utilization", "GET", "/api/analytics/resource-utilization"),
+        )
+
+    async def patient_search(self):
+        await self.request("GET /api/patients?search", "GET", "/api/patients/",
+                           params={"search": self.random.choice(SEARCH_TERMS), "limit": 20})
+
+    async def list_pagination(self):
+        skip = self.random.randrange(0, 2000, 20)
+        route, url = self.random.choice([
+            ("GET /api/patients", "/api/patients/"),
+            ("GET /api/resources/beds", "/api/resources/beds"),
+            ("GET /api/resources/staff", "/api/resources/staff"),
+            ("GET /api/resources/equipment", "/api/resources/equipment"),
+        ])
+        await self.request(route, "GET", url, params={"skip": skip, "limit": 20})
+
+    async def admission(self):
+        self.patient_count += 1
+        suffix = uuid.uuid4().hex[:10]
+        patient = await self.request("POST /api/patients", "POST", "/api/patients/", json={
+            "patient_id": f"BENCH-{suffix}",
+            "first_name": "Load",
+            "last_name": f"Test{self.patient_count}",
+            "date_of_birth": (date.today() - timedelta(days=self.random.randint(365, 365 * 90))).isoformat(),
+            "gender": self.random.choice(["male", "female"]),
+        })
+        if patient.status_code != 201:
+            return
+        patient_id = patient.json()["id"]
+        admission = await self.request("POST /api/patients/{patient_id}/admissions", "POST", f"/api/patients/{patient_id}/admissions", json={
+            "patient_id": patient_id,
+            "admission_number": f"BENCH-A-{suffix}",
+            "admission_date": date.today().isoformat(),
+            "admission_time": datetime.now().strftime("%H:%M"),
+            "admission_type": self.random.choice(["emergency", "elective", "urgent"]),
+            "department_id": self.random.choice(self.department_ids),
+            "primary_diagnosis": "Load test",
+        })
+        if admission.status_code == 201:
+            self.open_admission_ids.append(admission.json()["id"])
+
+    async def discharge(self):
+        if not self.open_admission_ids:
+            return await self.admission()
+        admission_id = self.open_admission_ids.pop(self.random.randrange(len(self.open_admission_ids)))
+        await self.request("POST /api/patients/admissions/{admission_id}/discharge", "POST", f"/api/patients/admissions/{admission_id}/discharge", json={
+            "admission_id": admission_id,
+            "discharge_date": date.today().isoformat(),
+            "discharge_time": datetime.now().strftime("%H:%M"),
+            "discharge_status": "home",
+            "total_cost": round(self.random.uniform(800, 20000), 2),
+        })
+
+    async def bed_update(self):
+        if not self.bed_ids:
+            return await self.list_pagination()
+        bed_id = self.random.choice(self.bed_ids)
+        await self.request("PUT /api/resources/beds/{bed_id}", "PUT", f"/api/resources/beds/{bed_id}",
+                           json={"status": self.random.choice(["available", "occupied"])})
+
+    def scenario(self, total: int) -> list:
+        """Weighted operation sequence, reproducible for a given seed"""
+        mix = [
+            (self.dashboard, 10),
+            (self.patient_search, 25),
+            (self.list_pagination, 35),
+            (self.admission, 10),
+            (self.discharge, 8),
+            (self.bed_update, 12),
+        ]
+        operations, weights = zip(*mix)
+        return self.random.choices(operations, weights=weights, k=total)
+
+    async def run(self, total: int, concurrency: int) -> float:
+        queue = asyncio.Queue()
+        for operation in self.scenario(total):
+            queue.put_nowait(operation)
+
+        async def worker():
+            while not queue.empty():
+                operation = queue.get_nowait()
+                await operation()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - started
+
+    def report(self, elapsed: float, args) -> dict:
+        requests = sum(len(samples) for samples in self.latencies.values())
+        routes = {}
+        for route in sorted(self.latencies):
+            samples = self.latencies[route]
+            routes[route] = {
+                "count": len(samples),
+                "errors": self.errors[route],
+                "mean_ms": round(statistics.fmean(samples), 2),
+                "p50_ms": round(percentile(samples, 50), 2),
+                "p95_ms": round(percentile(samples, 95), 2),
+                "p99_ms": round(percentile(samples, 99), 2),
+                "queries_per_request": round(statistics.fmean(self.queries[route]), 2) if self.queries[route] else None,
+            }
+        return {
+            "meta": {
+                "timestamp": datetime.utcnow().isoformat() + "Z",
+                "target": args.base_url or "in-process",
+                "requests": requests,
+                "concurrency": args.concurrency,
+                "seed": args.seed,
+                "python": platform.python_version(),
+            },
+            "elapsed_s": round(elapsed, 3),
+            "throughput_rps": round(requests / elapsed, 2) if elapsed else 0,
+            "routes": routes,
+        }
+
+
+def print_report(result: dict):
+    print(f"\n{result['meta']['requests']} requests in {result['elapsed_s']}s "
+          f"({result['throughput_rps']} req/s, target={result['meta']['target']})\n")
+    print(f"{'route':<56} {'count':>6} {'err':>4} {'p50':>8} {'p95':>8} {'p99':>8} {'queries':>8}")
+    for route, stats in result["routes"].items():
+        queries = "-" if stats["queries_per_request"] is None else f"{stats['queries_per_request']:.1f}"
+        print(f"{route:<56} {stats['count']:>6} {stats['errors']:>4} {stats['p50_ms']:>8.1f} "
+              f"{stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} {queries:>8}")
+
+
+def compare(result: dict, baseline: dict, threshold: float) -> int:
+    """Print per-route deltas against a baseline; returns the number of regressions"""
+    regressions = 0
+    print(f"\nComparison against baseline from {baseline['meta']['timestamp']} (regression threshold x{threshold})")
+    print(f"{'route':<56} {'p95 base':>9} {'p95 now':>9} {'ratio':>7} {'q base':>7} {'q now':>7}")
+    for route, stats in result["routes"].items():
+        base = baseline["routes"].get(route)
+        if not base:
+            print(f"{route:<56} {'new':>9}")
+            continue
+        ratio = stats["p95_ms"] / base["p95_ms"] if base["p95_ms"] else 1.0
+        query_regression = (base.get("queries_per_request") is not None and stats["queries_per_request"] is not None
+                            and stats["queries_per_request"] > base["queries_per_request"])
+        flag = ""
+        if ratio > threshold or query_regression:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(f"{route:<56} {base['p95_ms']:>9.1f} {stats['p95_ms']:>9.1f} {ratio:>7.2f} "
+              f"{str(base.get('queries_per_request')):>7} {str(stats['queries_per_request']):>7}{flag}")
+    throughput_ratio = result["throughput_rps"] / baseline["throughput_rps"] if baseline["throughput_rps"] else 1.0
+    print(f"\nThroughput: {baseline['throughput_rps']} -> {result['throughput_rps']} req/s (x{throughput_ratio:.2f})")
+    return regressions
+
+
+async def main_async(args) -> dict:
+    if args.base_url:
+        transport = None
+        base_url = args.base_url
+        count_queries = False
+    else:
+        from sqlalchemy import event
+        from app.database import engine
+        from app.main import app
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _count_query(conn, cursor, statement, parameters, context, executemany):
+            counter = _query_counter.get()
+            if counter is not None:
+                counter[0] += 1
+
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://benchmark"
+        count_queries = True
+
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60, follow_redirects=True) as client:
+        test = LoadTest(client, args.username, args.password, args.seed, count_queries)
+        await test.setup()
+        if args.warmup:
+            await test.run(args.warmup, args.concurrency)
+            test.latencies.clear()
+            test.queries.clear()
+            test.errors.clear()
+        elapsed = await test.run(args.requests, args.concurrency)
+        return test.report(elapsed, args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mediflow API load-testing benchmark")
+    parser.add_argument("--base-url", default=None, help="Target a running server instead of the in-process app")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--requests", type=int, default=1000, help="Scenario operations to replay")
+    parser.add_argument("--warmup", type=int, default=50, help="Operations to run before measuring")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent virtual clients")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--save", type=Path, default=None, help="Write results as a JSON baseline")
+    parser.add_argument("--compare", type=Path, default=None, help="Diff results against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=1.2, help="p95 ratio above which a route counts as regressed")
+    args = parser.parse_args()
+
+    result = asyncio.run(main_async(args))
+    print_report(result)
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps(result, indent=2))
+        print(f"\nBaseline written to {args.save}")
+
+    if args.compare:
+        regressions = compare(result, json.loads(args.compare.read_text()), args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
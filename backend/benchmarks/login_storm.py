@@ -0,0 +1,120 @@
+"""
+Login-storm benchmark: latency of other endpoints while many users log in.
+
+Fires concurrent logins (a shift change) at the in-process app and, at the
+same time, probes /health and /api/auth/me at a steady rate. Probe latency is
+reported idle, during the storm with bcrypt run inline on the event loop (the
+old behaviour), and during the storm with the bounded hashing pool. With the
+pool, probe latency should stay close to idle while logins queue up or get a
+503 once PASSWORD_HASH_MAX_QUEUE is exceeded.
+
+    python -m benchmarks.login_storm --logins 200 --concurrency 50
+
+Needs an existing user, e.g. the admin account used by benchmarks.load_test.
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from app.core.security import password_hasher, pwd_context
+from app.main import app
+from benchmarks.load_test import percentile
+
+
+async def _inline_run(fn, *args):
+    """Old behaviour: hash on the event loop"""
+    return fn(*args)
+
+
+async def probe(client: httpx.AsyncClient, headers: dict, stop: asyncio.Event, interval: float) -> list:
+    samples = []
+    while not stop.is_set():
+        for url, probe_headers in (("/health", {}), ("/api/auth/me", headers)):
+            started = time.perf_counter()
+            await client.get(url, headers=probe_headers)
+            samples.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(interval)
+    return samples
+
+
+async def storm(client: httpx.AsyncClient, args) -> dict:
+    semaphore = asyncio.Semaphore(args.concurrency)
+    counts = {"ok": 0, "busy": 0, "failed": 0}
+
+    async def login():
+        async with semaphore:
+            response = await client.post("/api/auth/login", data={"username": args.username, "password": args.password})
+            if response.status_code == 200:
+                counts["ok"] += 1
+            elif response.status_code == 503:
+                counts["busy"] += 1
+            else:
+                counts["failed"] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(args.logins)))
+    counts["elapsed_s"] = time.perf_counter() - started
+    return counts
+
+
+async def run_phase(client: httpx.AsyncClient, headers: dict, args, with_storm: bool) -> dict:
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(client, headers, stop, args.probe_interval))
+    if with_storm:
+        result = await storm(client, args)
+    else:
+        await asyncio.sleep(args.idle_seconds)
+        result = {}
+    stop.set()
+    samples = await probe_task
+    result.update({
+        "probes": len(samples),
+        "p50_ms": percentile(samples, 50),
+        "p95_ms": percentile(samples, 95),
+        "p99_ms": percentile(samples, 99),
+    })
+    return result
+
+
+async def main_async(args):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=120) as client:
+        response = await client.post("/api/auth/login", data={"username": args.username, "password": args.password})
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        print(f"bcrypt rounds={pwd_context.to_dict()['bcrypt__default_rounds']}, pool workers={password_hasher.workers}, "
+              f"max queue={password_hasher.max_queue}, {args.logins} logins at concurrency {args.concurrency}\n")
+        print(f"{'phase':<8} {'probes':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'logins ok':>10} {'503':>5} {'logins/s':>9}")
+
+        phases = [("idle", False, None), ("inline", True, _inline_run), ("pool", True, None)]
+        for name, with_storm, run_override in phases:
+            original = password_hasher._run
+            if run_override:
+                password_hasher._run = run_override
+            try:
+                result = await run_phase(client, headers, args, with_storm)
+            finally:
+                password_hasher._run = original
+            logins = f"{result['ok']:>10} {result['busy']:>5} {result['ok'] / result['elapsed_s']:>9.1f}" if with_storm else ""
+            print(f"{name:<8} {result['probes']:>7} {result['p50_ms']:>7.1f}ms {result['p95_ms']:>7.1f}ms "
+                  f"{result['p99_ms']:>7.1f}ms {logins}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login-storm latency benchmark")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--logins", type=int, default=200, help="Logins fired per storm")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent logins in flight")
+    parser.add_argument("--probe-interval", type=float, default=0.02, help="Seconds between probe rounds")
+    parser.add_argument("--idle-seconds", type=float, default=2.0, help="Duration of the idle baseline")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
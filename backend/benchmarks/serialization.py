@@ -0,0 +1,87 @@
+"""
+Serialization and compression benchmark for large payloads.
+
+Fetches the payloads of a 100-row patient list, a year of occupancy trends and
+the cost analysis from the in-process app, then compares:
+
+  * encode time of the stdlib-based JSONResponse against ORJSONResponse
+  * bytes on the wire (identity, gzip, brotli) and the time to compress them
+
+    python -m benchmarks.serialization --iterations 200
+
+Seed realistic data first with `python -m scripts.generate_data`.
+"""
+
+import argparse
+import asyncio
+import gzip
+import time
+from datetime import date, timedelta
+
+import httpx
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.core.responses import ORJSONResponse, brotli, orjson
+from app.main import app
+
+PAYLOADS = [
+    ("get_patients", "/api/patients/", {"limit": 100}),
+    ("get_occupancy_trends", "/api/analytics/trends/occupancy", {"days": 365}),
+    ("get_cost_analysis", "/api/analytics/cost-analysis",
+     {"start_date": (date.today() - timedelta(days=365)).isoformat(), "end_date": date.today().isoformat()}),
+]
+
+
+def timed(fn, iterations: int):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        result = fn()
+    return (time.perf_counter() - started) / iterations * 1000, result
+
+
+async def fetch_payloads(args) -> list:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60) as client:
+        response = await client.post("/api/auth/login", data={"username": args.username, "password": args.password})
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}", "Accept-Encoding": "identity"}
+        payloads = []
+        for name, url, params in PAYLOADS:
+            response = await client.get(url, params=params, headers=headers)
+            response.raise_for_status()
+            payloads.append((name, response.json()))
+        return payloads
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON encoding and compression benchmark")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--iterations", type=int, default=200, help="Repetitions per measurement")
+    args = parser.parse_args()
+
+    payloads = asyncio.run(fetch_payloads(args))
+    encoders = [("json", JSONResponse(None).render)]
+    if orjson is not None:
+        encoders.append(("orjson", ORJSONResponse(None).render))
+    else:
+        print("orjson is not installed; skipping ORJSONResponse\n")
+
+    print(f"{'payload':<22} {'encoder':<8} {'encode':>9} {'bytes':>9} {'gzip':>16} {'brotli':>16}")
+    for name, content in payloads:
+        for encoder_name, render in encoders:
+            encode_ms, body = timed(lambda: render(content), args.iterations)
+            gzip_ms, gzipped = timed(lambda: gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL),
+                                     args.iterations)
+            gzip_column = f"{len(gzipped):>7} {gzip_ms:>6.2f}ms"
+            brotli_column = "-"
+            if brotli is not None:
+                brotli_ms, compressed = timed(
+                    lambda: brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY), args.iterations)
+                brotli_column = f"{len(compressed):>7} {brotli_ms:>6.2f}ms"
+            print(f"{name:<22} {encoder_name:<8} {encode_ms:>7.3f}ms {len(body):>9} {gzip_column:>16} {brotli_column:>16}")
+
+
+if __name__ == "__main__":
+    main()
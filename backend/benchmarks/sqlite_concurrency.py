@@ -0,0 +1,127 @@
+"""
+SQLite concurrency benchmark: default engine vs. the production profile.
+
+Simulates several uvicorn workers (processes), each with a thread pool, doing
+read-then-write transactions against one SQLite file. Reports write
+throughput, read latency and "database is locked" errors for the default
+engine configuration and for the production profile (WAL, synchronous=NORMAL,
+mmap, cache_size, busy_timeout and the single-writer queue).
+
+    python -m benchmarks.sqlite_concurrency --processes 4 --threads 8 --seconds 10
+"""
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from sqlalchemy import Column, Integer, String, Float, func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from app.database import create_database_engine, SQLiteWriteQueue, SerializedWriteSession
+
+BenchBase = declarative_base()
+
+class BenchWrite(BenchBase):
+    __tablename__ = "bench_writes"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    worker = Column(String(50), nullable=False)
+    payload = Column(String(200), nullable=False)
+    created = Column(Float, nullable=False)
+
+
+def _worker(profile: str, url: str, threads: int, seconds: float, worker_id: int) -> dict:
+    production = profile == "production"
+    engine = create_database_engine(url, sqlite_production=production)
+    if production:
+        Session = sessionmaker(bind=engine, autoflush=False, class_=SerializedWriteSession, writer=SQLiteWriteQueue())
+    else:
+        Session = sessionmaker(bind=engine, autoflush=False)
+
+    results = {"writes": 0, "lock_errors": 0, "other_errors": 0, "read_ms": []}
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def run(thread_id: int):
+        writes = lock_errors = other_errors = 0
+        read_ms = []
+        while time.monotonic() < deadline:
+            db = Session()
+            try:
+                started = time.perf_counter()
+                db.execute(select(func.count()).select_from(BenchWrite)).scalar()
+                read_ms.append((time.perf_counter() - started) * 1000)
+                db.add(BenchWrite(worker=f"{worker_id}-{thread_id}", payload="x" * 120, created=time.time()))
+                db.commit()
+                writes += 1
+            except OperationalError as exc:
+                db.rollback()
+                if "locked" in str(exc) or "busy" in str(exc):
+                    lock_errors += 1
+                else:
+                    other_errors += 1
+            finally:
+                db.close()
+        with lock:
+            results["writes"] += writes
+            results["lock_errors"] += lock_errors
+            results["other_errors"] += other_errors
+            results["read_ms"].extend(read_ms)
+
+    pool = [threading.Thread(target=run, args=(i,)) for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    engine.dispose()
+    return results
+
+
+def run_profile(profile: str, args) -> dict:
+    directory = tempfile.mkdtemp(prefix="mediflow-sqlite-bench-")
+    url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+    setup_engine = create_database_engine(url, sqlite_production=profile == "production")
+    BenchBase.metadata.create_all(setup_engine)
+    setup_engine.dispose()
+
+    started = time.perf_counter()
+    with multiprocessing.get_context("spawn").Pool(args.processes) as pool:
+        parts = pool.starmap(_worker, [(profile, url, args.threads, args.seconds, i) for i in range(args.processes)])
+    elapsed = time.perf_counter() - started
+
+    read_ms = [ms for part in parts for ms in part["read_ms"]]
+    writes = sum(part["writes"] for part in parts)
+    return {
+        "profile": profile,
+        "writes": writes,
+        "writes_per_s": writes / args.seconds,
+        "lock_errors": sum(part["lock_errors"] for part in parts),
+        "other_errors": sum(part["other_errors"] for part in parts),
+        "read_p50_ms": statistics.median(read_ms) if read_ms else 0.0,
+        "read_p99_ms": sorted(read_ms)[int(len(read_ms) * 0.99) - 1] if read_ms else 0.0,
+        "elapsed_s": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite write concurrency benchmark")
+    parser.add_argument("--processes", type=int, default=4, help="Simulated uvicorn workers")
+    parser.add_argument("--threads", type=int, default=8, help="Concurrent request threads per worker")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Duration per profile")
+    args = parser.parse_args()
+
+    print(f"{args.processes} processes x {args.threads} threads, {args.seconds:.0f}s per profile\n")
+    print(f"{'profile':<12} {'writes':>8} {'writes/s':>10} {'locked':>8} {'other':>6} {'read p50':>9} {'read p99':>9}")
+    for profile in ("default", "production"):
+        result = run_profile(profile, args)
+        print(f"{result['profile']:<12} {result['writes']:>8} {result['writes_per_s']:>10.1f} {result['lock_errors']:>8} "
+              f"{result['other_errors']:>6} {result['read_p50_ms']:>8.2f}ms {result['read_p99_ms']:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
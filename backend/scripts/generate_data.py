@@ -0,0 +1,465 @@
+"""
+Synthetic hospital data generator for benchmarking.
+
+Creates departments, beds, staff, equipment, patients, admissions, discharges,
+outcomes, readmissions, satisfaction scores and monthly cost analyses with
+realistic distributions (log-normal length of stay per department, winter
+seasonality, age-dependent mortality and readmission risk).
+
+Generation is vectorized with numpy and rows are bulk-inserted in chunks, so
+a million admissions load in minutes on both SQLite and PostgreSQL.
+
+Usage (from the backend directory):
+    python -m scripts.generate_data --admissions 1000000 --departments 12
+    python -m scripts.generate_data --database-url postgresql://... --reset
+"""
+
+import argparse
+import time
+import uuid
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import create_engine, event, insert
+
+from app.core.config import settings
+from app.models import Base
+from app.models.patient import Patient, Admission, Discharge, Gender, AdmissionType, DischargeStatus
+from app.models.outcome import PatientOutcome, Readmission, SatisfactionScore, OutcomeType, ReadmissionReason
+from app.models.resource import Department, Bed, Staff, Equipment, DepartmentType, BedStatus, StaffRole, EquipmentStatus
+from app.models.analytics import CostAnalysis
+from app.services.cost_analysis import generated_id
+
+# Length of stay per department type: (median days, log-normal sigma)
+LOS_PARAMS = {
+    DepartmentType.EMERGENCY: (1.5, 0.60),
+    DepartmentType.SURGERY: (4.0, 0.60),
+    DepartmentType.CARDIOLOGY: (4.5, 0.55),
+    DepartmentType.NEUROLOGY: (5.0, 0.60),
+    DepartmentType.ONCOLOGY: (6.0, 0.70),
+    DepartmentType.PEDIATRICS: (2.5, 0.50),
+    DepartmentType.ICU: (3.5, 0.85),
+    DepartmentType.GENERAL: (3.5, 0.60),
+}
+
+# Daily bed cost per department type
+COST_PER_DAY = {
+    DepartmentType.EMERGENCY: 1500,
+    DepartmentType.SURGERY: 2500,
+    DepartmentType.CARDIOLOGY: 2000,
+    DepartmentType.NEUROLOGY: 2100,
+    DepartmentType.ONCOLOGY: 2200,
+    DepartmentType.PEDIATRICS: 1800,
+    DepartmentType.ICU: 3000,
+    DepartmentType.GENERAL: 1200,
+}
+
+# Admission type mix: emergency, elective, urgent, transfer
+ADMISSION_TYPE_MIX = {
+    DepartmentType.EMERGENCY: (0.85, 0.00, 0.12, 0.03),
+    DepartmentType.SURGERY: (0.25, 0.55, 0.15, 0.05),
+    DepartmentType.ICU: (0.55, 0.05, 0.20, 0.20),
+}
+DEFAULT_ADMISSION_TYPE_MIX = (0.45, 0.30, 0.20, 0.05)
+
+DIAGNOSES = {
+    DepartmentType.EMERGENCY: ["Chest pain", "Abdominal pain", "Fracture", "Syncope", "Sepsis"],
+    DepartmentType.SURGERY: ["Appendicitis", "Cholecystitis", "Hernia repair", "Hip replacement", "Bowel obstruction"],
+    DepartmentType.CARDIOLOGY: ["Heart failure", "Atrial fibrillation", "Myocardial infarction", "Angina", "Hypertension"],
+    DepartmentType.NEUROLOGY: ["Stroke", "Seizure", "Migraine", "Multiple sclerosis", "Transient ischemic attack"],
+    DepartmentType.ONCOLOGY: ["Lung cancer", "Breast cancer", "Lymphoma", "Leukemia", "Colorectal cancer"],
+    DepartmentType.PEDIATRICS: ["Bronchiolitis", "Asthma", "Gastroenteritis", "Pneumonia", "Febrile seizure"],
+    DepartmentType.ICU: ["Septic shock", "Respiratory failure", "Cardiac arrest", "Trauma", "Diabetic ketoacidosis"],
+    DepartmentType.GENERAL: ["Pneumonia", "Cellulitis", "Urinary tract infection", "COPD exacerbation", "Dehydration"],
+}
+
+EQUIPMENT_TYPES = ["MRI", "CT Scanner", "X-Ray", "Ultrasound", "Ventilator", "Defibrillator", "ECG Machine", "Infusion Pump"]
+FIRST_NAMES = ["James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+               "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Carlos", "Aisha"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+              "Hernandez", "Lopez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin", "Lee"]
+INSURERS = ["Medicare", "Medicaid", "Blue Cross", "Aetna", "UnitedHealth", "Cigna", None]
+
+
+def _uuids(rng: np.random.Generator, n: int) -> list:
+    """Reproducible random UUID4s"""
+    raw = rng.bytes(16 * n)
+    return [uuid.UUID(bytes=raw[i:i + 16], version=4) for i in range(0, 16 * n, 16)]
+
+
+def _dates(days: np.ndarray, epoch: date) -> list:
+    """Convert day offsets from epoch into date objects"""
+    return (np.datetime64(epoch, "D") + days.astype("timedelta64[D]")).astype(object).tolist()
+
+
+def _bulk_insert(conn, model, columns: dict, batch_size: int) -> int:
+    """Insert column arrays in chunks; every column must be declared on the model"""
+    table = model.__table__
+    unknown = [name for name in columns if name not in table.c]
+    if unknown:
+        raise ValueError(f"{table.name} has no column(s): {', '.join(unknown)}")
+    names = list(columns)
+    values = [columns[name] for name in names]
+    total = len(values[0]) if values else 0
+    for start in range(0, total, batch_size):
+        end = min(start + batch_size, total)
+        rows = [dict(zip(names, row)) for row in zip(*(v[start:end] for v in values))]
+        conn.execute(insert(table), rows)
+    return total
+
+
+def _seasonal_day_weights(n_days: int, start: date) -> np.ndarray:
+    """Admission rate per day: winter peak plus a weekend dip"""
+    offsets = np.arange(n_days)
+    day_of_year = (np.datetime64(start, "D") + offsets.astype("timedelta64[D]") - np.datetime64(f"{start.year}-01-01", "D")).astype(int) % 365
+    weekday = (np.datetime64(start, "D") + offsets.astype("timedelta64[D]")).astype("datetime64[D]").view("int64")
+    weekday = (weekday + 3) % 7  # 1970-01-01 was a Thursday; 0 = Monday
+    seasonal = 1.0 + 0.18 * np.cos(2 * np.pi * (day_of_year - 15) / 365.0)
+    weekly = np.where(weekday >= 5, 0.78, 1.0)
+    weights = seasonal * weekly
+    return weights / weights.sum()
+
+
+def generate(args) -> None:
+    rng = np.random.default_rng(args.seed)
+    engine = create_engine(args.database_url)
+
+    if engine.dialect.name == "sqlite":
+        @event.listens_for(engine, "connect")
+        def _fast_sqlite_load(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=OFF")
+            cursor.execute("PRAGMA cache_size=-200000")
+            cursor.close()
+
+    if args.reset:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    today = date.today()
+    history_start = today - timedelta(days=365 * args.years)
+    n_days = (today - history_start).days
+    timings = {}
+
+    def timed(label, fn, *fn_args):
+        started = time.perf_counter()
+        count = fn(*fn_args)
+        timings[label] = (count, time.perf_counter() - started)
+        print(f"  {label:<22} {count:>10,} rows  {timings[label][1]:7.1f}s")
+
+    # Departments
+    n_depts = args.departments
+    dept_types = [list(DepartmentType)[i % len(DepartmentType)] for i in range(n_depts)]
+    dept_ids = _uuids(rng, n_depts)
+    # Size wards for ~85% occupancy at the requested admission volume unless told otherwise
+    beds_per_department = args.beds_per_department or max(8, int(args.admissions * 4.5 / n_days / 0.85 / n_depts))
+    dept_beds = np.maximum(8, rng.normal(beds_per_department, beds_per_department * 0.3, n_depts)).astype(int)
+    dept_cost = np.array([COST_PER_DAY[t] for t in dept_types], dtype=float) * rng.uniform(0.9, 1.1, n_depts)
+
+    # Patients
+    n_admissions = args.admissions
+    n_patients = args.patients or max(1, int(n_admissions / 2.5))
+    ages = np.clip(np.concatenate([
+        rng.normal(8, 5, n_patients // 10),
+        rng.normal(45, 15, n_patients // 2),
+        rng.normal(74, 9, n_patients - n_patients // 10 - n_patients // 2),
+    ]), 0, 100)
+    rng.shuffle(ages)
+    patient_ids = _uuids(rng, n_patients)
+    birth_offsets = -(ages * 365.25).astype(int) - rng.integers(0, 365, n_patients)
+
+    # Admissions: a base population plus readmissions drawn from it below
+    expected_readmission_rate = 0.12
+    n_base = int(n_admissions / (1 + expected_readmission_rate))
+    day_weights = _seasonal_day_weights(n_days, history_start)
+    adm_day = rng.choice(n_days, size=n_base, p=day_weights)
+    # Frequent flyers: a small share of patients accounts for many admissions
+    frequent = (np.minimum(rng.zipf(1.6, n_base), n_patients) - 1) * 7919 % n_patients
+    adm_patient = np.where(rng.random(n_base) < 0.25, frequent, rng.integers(0, n_patients, n_base))
+    dept_weights = dept_beds / dept_beds.sum()
+    adm_dept = rng.choice(n_depts, size=n_base, p=dept_weights)
+    pediatric = np.array([t == DepartmentType.PEDIATRICS for t in dept_types])
+    # Children go to pediatrics, adults elsewhere, where such departments exist
+    if pediatric.any() and (~pediatric).any():
+        child = ages[adm_patient] < 16
+        adult_depts = np.flatnonzero(~pediatric)
+        child_depts = np.flatnonzero(pediatric)
+        adm_dept = np.where(child, rng.choice(child_depts, n_base), np.where(pediatric[adm_dept], rng.choice(adult_depts, n_base), adm_dept))
+
+    def length_of_stay(dept_index: np.ndarray, patient_index: np.ndarray) -> np.ndarray:
+        median = np.array([LOS_PARAMS[dept_types[d]][0] for d in range(n_depts)])[dept_index]
+        sigma = np.array([LOS_PARAMS[dept_types[d]][1] for d in range(n_depts)])[dept_index]
+        age_factor = 1.0 + np.clip(ages[patient_index] - 60, 0, None) * 0.012
+        return np.maximum(0, np.round(rng.lognormal(np.log(median * age_factor), sigma))).astype(int)
+
+    adm_los = length_of_stay(adm_dept, adm_patient)
+
+    # Readmissions within 30 days, likelier for the old, long stays and the sick
+    risk_logit = -2.6 + 0.025 * np.clip(ages[adm_patient] - 50, 0, None) + 0.06 * np.minimum(adm_los, 20)
+    readmitted = rng.random(n_base) < 1 / (1 + np.exp(-risk_logit))
+    readmitted &= adm_day + adm_los + 30 < n_days
+    orig_index = np.flatnonzero(readmitted)[: max(0, n_admissions - n_base)]
+    gap = np.clip(rng.exponential(11, orig_index.size).astype(int) + 1, 1, 30)
+    re_day = adm_day[orig_index] + adm_los[orig_index] + gap
+    re_patient = adm_patient[orig_index]
+    re_dept = np.where(rng.random(orig_index.size) < 0.8, adm_dept[orig_index], rng.integers(0, n_depts, orig_index.size))
+    re_los = length_of_stay(re_dept, re_patient)
+
+    all_day = np.concatenate([adm_day, re_day])
+    all_patient = np.concatenate([adm_patient, re_patient])
+    all_dept = np.concatenate([adm_dept, re_dept])
+    all_los = np.concatenate([adm_los, re_los])
+    total = all_day.size
+    admission_ids = _uuids(rng, total)
+
+    type_mix = np.array([ADMISSION_TYPE_MIX.get(t, DEFAULT_ADMISSION_TYPE_MIX) for t in dept_types])
+    type_cdf = np.cumsum(type_mix, axis=1)[all_dept]
+    type_index = (rng.random(total)[:, None] > type_cdf).sum(axis=1).clip(0, 3)
+    type_index[n_base:] = np.where(rng.random(total - n_base) < 0.7, 0, 2)  # readmissions are unplanned
+    admission_types = np.array(list(AdmissionType), dtype=object)[type_index]
+
+    discharge_day = all_day + all_los
+    discharged = discharge_day < n_days
+
+    # Beds: admissions still in hospital occupy a bed
+    bed_dept = np.repeat(np.arange(n_depts), dept_beds)
+    bed_ids = _uuids(rng, bed_dept.size)
+    bed_offsets = np.concatenate([[0], np.cumsum(dept_beds)[:-1]])
+    adm_bed = bed_offsets[all_dept] + (rng.random(total) * dept_beds[all_dept]).astype(int)
+    bed_status = np.full(bed_dept.size, BedStatus.AVAILABLE, dtype=object)
+    bed_status[np.unique(adm_bed[~discharged])] = BedStatus.OCCUPIED
+    bed_status[rng.random(bed_dept.size) < 0.03] = BedStatus.MAINTENANCE
+
+    print(f"Generating {n_depts} departments, {n_patients:,} patients, {total:,} admissions into {engine.url.render_as_string(hide_password=True)}")
+
+    with engine.begin() as conn:
+        timed("departments", _bulk_insert, conn, Department, {
+            "id": dept_ids,
+            "name": [f"{t.value.title()} {i // len(DepartmentType) + 1}" for i, t in enumerate(dept_types)],
+            "department_type": dept_types,
+            "head_of_department": [f"Dr. {LAST_NAMES[i % len(LAST_NAMES)]}" for i in range(n_depts)],
+            "total_beds": dept_beds.tolist(),
+            "available_beds": [int(((bed_dept == d) & (bed_status == BedStatus.AVAILABLE)).sum()) for d in range(n_depts)],
+            "cost_per_day": np.round(dept_cost, 2).tolist(),
+        }, args.batch_size)
+
+        timed("beds", _bulk_insert, conn, Bed, {
+            "id": bed_ids,
+            "bed_number": [f"B{d:03d}-{i:04d}" for i, d in enumerate(bed_dept.tolist())],
+            "department_id": [dept_ids[d] for d in bed_dept.tolist()],
+            "room_number": [f"R{i // 2:04d}" for i in range(bed_dept.size)],
+            "bed_type": ["ICU" if dept_types[d] == DepartmentType.ICU else "Standard" for d in bed_dept.tolist()],
+            "status": bed_status.tolist(),
+        }, args.batch_size)
+
+        # Staff: roughly one nurse per 1.5 beds and one doctor per 5 beds, across shifts
+        staff_per_dept = np.maximum(4, (dept_beds * 1.2).astype(int))
+        staff_dept = np.repeat(np.arange(n_depts), staff_per_dept)
+        n_staff = staff_dept.size
+        roles = np.array([StaffRole.NURSE, StaffRole.DOCTOR, StaffRole.TECHNICIAN, StaffRole.ADMINISTRATOR, StaffRole.SUPPORT], dtype=object)
+        role_index = rng.choice(5, size=n_staff, p=[0.55, 0.2, 0.1, 0.05, 0.1])
+        base_salary = np.array([78000, 240000, 62000, 70000, 42000])[role_index]
+        first = rng.integers(0, len(FIRST_NAMES), n_staff)
+        last = rng.integers(0, len(LAST_NAMES), n_staff)
+        timed("staff", _bulk_insert, conn, Staff, {
+            "id": _uuids(rng, n_staff),
+            "employee_id": [f"EMP{i:07d}" for i in range(n_staff)],
+            "first_name": [FIRST_NAMES[i] for i in first.tolist()],
+            "last_name": [LAST_NAMES[i] for i in last.tolist()],
+            "email": [f"staff{i:07d}@mediflow.example" for i in range(n_staff)],
+            "department_id": [dept_ids[d] for d in staff_dept.tolist()],
+            "role": roles[role_index].tolist(),
+            "hire_date": _dates(-rng.integers(30, 365 * 20, n_staff), today),
+            "salary": np.round(base_salary * rng.lognormal(0, 0.15, n_staff), 2).tolist(),
+            "shift_pattern": rng.choice(["Day", "Night", "Rotating"], n_staff, p=[0.5, 0.25, 0.25]).tolist(),
+            "is_active": (rng.random(n_staff) > 0.04).tolist(),
+        }, args.batch_size)
+
+        # Equipment
+        equipment_per_dept = np.maximum(3, (dept_beds / 4).astype(int))
+        equipment_dept = np.repeat(np.arange(n_depts), equipment_per_dept)
+        n_equipment = equipment_dept.size
+        equipment_type = rng.integers(0, len(EQUIPMENT_TYPES), n_equipment)
+        max_hours = rng.choice([5000, 8000, 10000, 20000], n_equipment)
+        usage = (max_hours * rng.beta(2, 2, n_equipment)).astype(int)
+        last_maintenance = -rng.integers(1, 365, n_equipment)
+        equipment_status = np.where(rng.random(n_equipment) < 0.35, EquipmentStatus.IN_USE, EquipmentStatus.AVAILABLE)
+        equipment_status[rng.random(n_equipment) < 0.04] = EquipmentStatus.MAINTENANCE
+        equipment_status[rng.random(n_equipment) < 0.02] = EquipmentStatus.OUT_OF_ORDER
+        timed("equipment", _bulk_insert, conn, Equipment, {
+            "id": _uuids(rng, n_equipment),
+            "equipment_id": [f"EQ{i:07d}" for i in range(n_equipment)],
+            "name": [EQUIPMENT_TYPES[i] for i in equipment_type.tolist()],
+            "manufacturer": rng.choice(["MedTech Corp", "Philips", "Siemens", "GE Healthcare"], n_equipment).tolist(),
+            "department_id": [dept_ids[d] for d in equipment_dept.tolist()],
+            "equipment_type": [EQUIPMENT_TYPES[i] for i in equipment_type.tolist()],
+            "status": equipment_status.tolist(),
+            "purchase_date": _dates(-rng.integers(365, 365 * 10, n_equipment), today),
+            "last_maintenance": _dates(last_maintenance, today),
+            "next_maintenance_due": _dates(last_maintenance + rng.choice([90, 180, 365], n_equipment), today),
+            "maintenance_cost": np.round(rng.lognormal(np.log(800), 0.6, n_equipment), 2).tolist(),
+            "usage_hours": usage.tolist(),
+            "max_usage_hours": max_hours.tolist(),
+        }, args.batch_size)
+
+        genders = np.array([Gender.FEMALE, Gender.MALE, Gender.OTHER, Gender.UNKNOWN], dtype=object)
+        first = rng.integers(0, len(FIRST_NAMES), n_patients)
+        last = rng.integers(0, len(LAST_NAMES), n_patients)
+        timed("patients", _bulk_insert, conn, Patient, {
+            "id": patient_ids,
+            "patient_id": [f"P{i:09d}" for i in range(n_patients)],
+            "first_name": [FIRST_NAMES[i] for i in first.tolist()],
+            "last_name": [LAST_NAMES[i] for i in last.tolist()],
+            "date_of_birth": _dates(birth_offsets, today),
+            "gender": genders[rng.choice(4, n_patients, p=[0.51, 0.47, 0.01, 0.01])].tolist(),
+            "phone": [f"+1-555-{i % 10000:04d}" for i in range(n_patients)],
+            "insurance_provider": [INSURERS[i] for i in rng.integers(0, len(INSURERS), n_patients).tolist()],
+            "medical_record_number": [f"MRN{i:09d}" for i in range(n_patients)],
+        }, args.batch_size)
+
+        diagnosis_pick = rng.integers(0, 5, total)
+        timed("admissions", _bulk_insert, conn, Admission, {
+            "id": admission_ids,
+            "patient_id": [patient_ids[p] for p in all_patient.tolist()],
+            "admission_number": [f"A{i:010d}" for i in range(total)],
+            "admission_date": _dates(all_day, history_start),
+            "admission_time": [f"{h:02d}:{m:02d}" for h, m in zip(rng.integers(0, 24, total).tolist(), rng.integers(0, 60, total).tolist())],
+            "admission_type": admission_types.tolist(),
+            "department_id": [dept_ids[d] for d in all_dept.tolist()],
+            "bed_id": [bed_ids[b] for b in adm_bed.tolist()],
+            "primary_diagnosis": [DIAGNOSES[dept_types[d]][k] for d, k in zip(all_dept.tolist(), diagnosis_pick.tolist())],
+            "expected_length_of_stay": np.maximum(1, np.round(all_los * rng.uniform(0.7, 1.2, total))).astype(int).tolist(),
+        }, args.batch_size)
+
+        # Discharges, outcomes and satisfaction surveys for completed stays
+        d_index = np.flatnonzero(discharged)
+        n_discharged = d_index.size
+        d_ages = ages[all_patient[d_index]]
+        icu = np.array([t == DepartmentType.ICU for t in dept_types])[all_dept[d_index]]
+        death_p = 0.004 + 0.0004 * np.clip(d_ages - 50, 0, None) + np.where(icu, 0.08, 0.0)
+        deceased = rng.random(n_discharged) < death_p
+        status_index = np.where(deceased, 3, rng.choice([0, 1, 2, 4], n_discharged, p=[0.86, 0.08, 0.02, 0.04]))
+        statuses = np.array(list(DischargeStatus), dtype=object)[status_index]
+        d_los = all_los[d_index]
+        total_cost = np.round((np.maximum(d_los, 1) * dept_cost[all_dept[d_index]]) * rng.uniform(0.9, 1.4, n_discharged)
+                              + rng.lognormal(np.log(600), 0.8, n_discharged), 2)
+        coverage = np.round(total_cost * rng.uniform(0.6, 0.95, n_discharged), 2)
+        payment = np.round((total_cost - coverage) * rng.uniform(0.3, 1.0, n_discharged), 2)
+        timed("discharges", _bulk_insert, conn, Discharge, {
+            "id": _uuids(rng, n_discharged),
+            "admission_id": [admission_ids[i] for i in d_index.tolist()],
+            "discharge_date": _dates(discharge_day[d_index], history_start),
+            "discharge_time": [f"{h:02d}:00" for h in rng.integers(8, 20, n_discharged).tolist()],
+            "discharge_status": statuses.tolist(),
+            "discharge_diagnosis": [DIAGNOSES[dept_types[d]][k] for d, k in zip(all_dept[d_index].tolist(), diagnosis_pick[d_index].tolist())],
+            "length_of_stay": d_los.tolist(),
+            "total_cost": total_cost.tolist(),
+            "insurance_coverage": coverage.tolist(),
+            "patient_payment": payment.tolist(),
+        }, args.batch_size)
+
+        outcome_index = np.where(deceased, 4, rng.choice(4, n_discharged, p=[0.62, 0.28, 0.07, 0.03]))
+        outcome_types = np.array([OutcomeType.RECOVERED, OutcomeType.IMPROVED, OutcomeType.UNCHANGED, OutcomeType.WORSENED, OutcomeType.DECEASED], dtype=object)
+        timed("patient_outcomes", _bulk_insert, conn, PatientOutcome, {
+            "id": _uuids(rng, n_discharged),
+            "patient_id": [patient_ids[p] for p in all_patient[d_index].tolist()],
+            "admission_id": [admission_ids[i] for i in d_index.tolist()],
+            "outcome_type": outcome_types[outcome_index].tolist(),
+            "outcome_date": _dates(discharge_day[d_index], history_start),
+            "recovery_time_days": (d_los + rng.integers(0, 30, n_discharged)).tolist(),
+            "treatment_success": (outcome_index <= 1).tolist(),
+            "follow_up_required": (rng.random(n_discharged) < 0.4).tolist(),
+        }, args.batch_size)
+
+        surveyed = d_index[(rng.random(n_discharged) < 0.35) & ~deceased]
+        n_surveys = surveyed.size
+        mean_score = 4.3 - 0.04 * np.minimum(all_los[surveyed], 20)
+        overall = np.clip(np.round(rng.normal(mean_score, 0.8)), 1, 5).astype(int)
+        timed("satisfaction_scores", _bulk_insert, conn, SatisfactionScore, {
+            "id": _uuids(rng, n_surveys),
+            "patient_id": [patient_ids[p] for p in all_patient[surveyed].tolist()],
+            "admission_id": [admission_ids[i] for i in surveyed.tolist()],
+            "survey_date": _dates(discharge_day[surveyed] + rng.integers(1, 14, n_surveys), history_start),
+            "overall_satisfaction": overall.tolist(),
+            "care_quality": np.clip(overall + rng.integers(-1, 2, n_surveys), 1, 5).tolist(),
+            "communication": np.clip(overall + rng.integers(-1, 2, n_surveys), 1, 5).tolist(),
+            "would_recommend": (overall >= 4).tolist(),
+        }, args.batch_size)
+
+        n_readmissions = orig_index.size
+        reasons = np.array(list(ReadmissionReason), dtype=object)
+        timed("readmissions", _bulk_insert, conn, Readmission, {
+            "id": _uuids(rng, n_readmissions),
+            "patient_id": [patient_ids[p] for p in re_patient.tolist()],
+            "original_admission_id": [admission_ids[i] for i in orig_index.tolist()],
+            "readmission_date": _dates(re_day, history_start),
+            "days_since_discharge": gap.tolist(),
+            "readmission_reason": reasons[rng.choice(len(reasons), n_readmissions, p=[0.3, 0.35, 0.25, 0.1])].tolist(),
+            "readmission_department_id": [dept_ids[d] for d in re_dept.tolist()],
+            "severity_score": rng.integers(1, 11, n_readmissions).tolist(),
+            "preventable": (rng.random(n_readmissions) < 0.27).tolist(),
+        }, args.batch_size)
+
+        # Monthly cost analyses per department, attributing each stay to its admission month
+        month = (np.datetime64(history_start, "D") + all_day.astype("timedelta64[D]")).astype("datetime64[M]")
+        month_index = (month - month.min()).astype(int)
+        n_months = int(month_index.max()) + 1
+        patient_days = np.zeros((n_depts, n_months))
+        patient_count = np.zeros((n_depts, n_months))
+        revenue = np.zeros((n_depts, n_months))
+        np.add.at(patient_days, (all_dept, month_index), np.maximum(all_los, 1))
+        np.add.at(patient_count, (all_dept, month_index), 1)
+        np.add.at(revenue, (all_dept[d_index], month_index[d_index]), coverage + payment)
+        monthly_staff = np.bincount(staff_dept, weights=base_salary, minlength=n_depts) / 12.0
+        monthly_equipment = np.bincount(equipment_dept, minlength=n_depts) * 800 / 12.0
+        depts, months = np.nonzero(patient_count)
+        facility = patient_days[depts, months] * dept_cost[depts]
+        staff_cost = monthly_staff[depts]
+        equipment_cost = monthly_equipment[depts]
+        medication = patient_days[depts, months] * rng.uniform(80, 160, depts.size)
+        total_costs = facility + staff_cost + equipment_cost + medication
+        month_start = month.min() + months.astype("timedelta64[M]")
+        month_end = (month_start + np.timedelta64(1, "M")).astype("datetime64[D]") - np.timedelta64(1, "D")
+        period_start = month_start.astype("datetime64[D]").astype(object).tolist()
+        margin = np.where(revenue[depts, months] > 0, (revenue[depts, months] - total_costs) / np.maximum(revenue[depts, months], 1) * 100, 0)
+        timed("cost_analyses", _bulk_insert, conn, CostAnalysis, {
+            # The ids generate_cost_analyses uses, so regenerating a month replaces the seeded row
+            "id": [generated_id(dept_ids[d], start) for d, start in zip(depts.tolist(), period_start)],
+            "analysis_date": month_end.astype(object).tolist(),
+            "department_id": [dept_ids[d] for d in depts.tolist()],
+            "total_cost": np.round(total_costs, 2).tolist(),
+            "staff_cost": np.round(staff_cost, 2).tolist(),
+            "equipment_cost": np.round(equipment_cost, 2).tolist(),
+            "medication_cost": np.round(medication, 2).tolist(),
+            "facility_cost": np.round(facility, 2).tolist(),
+            "total_revenue": np.round(revenue[depts, months], 2).tolist(),
+            "profit_margin": np.round(np.clip(margin, -100, 100), 2).tolist(),
+            "cost_per_patient_day": np.round(total_costs / np.maximum(patient_days[depts, months], 1), 2).tolist(),
+            "period_start": period_start,
+            "period_end": month_end.astype(object).tolist(),
+            "patient_count": patient_count[depts, months].astype(int).tolist(),
+            "average_length_of_stay": np.round(patient_days[depts, months] / patient_count[depts, months], 2).tolist(),
+        }, args.batch_size)
+
+    elapsed = sum(seconds for _, seconds in timings.values())
+    rows = sum(count for count, _ in timings.values())
+    print(f"Inserted {rows:,} rows in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic hospital data for benchmarking")
+    parser.add_argument("--database-url", default=settings.DATABASE_URL, help="Target database (defaults to DATABASE_URL)")
+    parser.add_argument("--departments", type=int, default=8, help="Number of departments")
+    parser.add_argument("--beds-per-department", type=int, default=None, help="Average beds per department (default: sized for ~85%% occupancy)")
+    parser.add_argument("--patients", type=int, default=None, help="Number of patients (default: admissions / 2.5)")
+    parser.add_argument("--admissions", type=int, default=100_000, help="Total admissions, including readmissions")
+    parser.add_argument("--years", type=int, default=3, help="Years of admission history ending today")
+    parser.add_argument("--batch-size", type=int, default=20_000, help="Rows per bulk insert statement")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for reproducible datasets")
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate all tables first")
+    generate(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
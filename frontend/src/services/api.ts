@@ -111,12 +111,18 @@ export const doctorsApi = {
 };
 
 // Request interceptor to add auth token
+// Time of this client's last write, echoed back so reads skip a lagging replica
+let lastWrite: string | null = null;
+
 api.interceptors.request.use(
   (config) => {
     const token = localStorage.getItem('token');
     if (token) {
       config.headers.Authorization = `Bearer ${token}`;
     }
+    if (lastWrite) {
+      config.headers['X-Last-Write'] = lastWrite;
+    }
     return config;
   },
   (error) => {
@@ -126,7 +132,13 @@ api.interceptors.request.use(
 
 // Response interceptor to handle auth errors
 api.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    const written = response.headers['x-last-write'];
+    if (written) {
+      lastWrite = written;
+    }
+    return response;
+  },
   (error) => {
     if (error.response?.status === 401) {
       localStorage.removeItem('token');